@@ -0,0 +1,118 @@
+import sys
+import time
+from bisect import bisect_left
+from types import FrameType
+from typing import Dict, Tuple, List, Optional, Callable, Any
+
+from gi.repository import Gio, GLib
+
+# Upper bounds of the latency buckets in milliseconds, the last bucket counts all slower calls
+BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+SYNC = "sync"
+ASYNC = "async"
+DISPATCH = "dispatch"
+
+# Frames of these modules are skipped to find the module that made a call
+_plumbing = ("blueman.DBusStats", "blueman.bluez.", "blueman.main.DBusProxies", "gi.")
+
+StatsRow = Tuple[str, str, str, str, int, float, float, List[int]]
+
+
+class CallStats:
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+
+    def record(self, milliseconds: float) -> None:
+        self.count += 1
+        self.total += milliseconds
+        self.max = max(self.max, milliseconds)
+        self.histogram[bisect_left(BUCKETS, milliseconds)] += 1
+
+
+# (interface, member, calling module, sync, async or dispatch) -> stats
+_stats: Dict[Tuple[str, str, str, str], CallStats] = {}
+
+
+def caller_module() -> str:
+    frame: Optional[FrameType] = sys._getframe(1)
+    while frame is not None:
+        name = frame.f_globals.get("__name__", "")
+        if not name.startswith(_plumbing):
+            return str(name)
+        frame = frame.f_back
+    return "?"
+
+
+def record(interface: str, member: str, kind: str, seconds: float, module: Optional[str] = None) -> None:
+    key = (interface, member, caller_module() if module is None else module, kind)
+    stats = _stats.get(key)
+    if stats is None:
+        stats = _stats[key] = CallStats()
+    stats.record(seconds * 1000)
+
+
+def reset() -> None:
+    _stats.clear()
+
+
+def snapshot() -> List[StatsRow]:
+    """(interface, member, module, kind, count, total ms, max ms, histogram) per call site"""
+    return [(interface, member, module, kind, stats.count, stats.total, stats.max, list(stats.histogram))
+            for (interface, member, module, kind), stats in _stats.items()]
+
+
+def format_stats(rows: Optional[List[StatsRow]] = None) -> str:
+    rows = sorted(snapshot() if rows is None else rows, key=lambda row: row[5], reverse=True)
+    buckets = " ".join(f"{f'<{bound}':>6}" for bound in BUCKETS) + f" {f'>{BUCKETS[-1]}':>6}"
+    lines = [f"{'calls':>6} {'total ms':>9} {'max ms':>8} {'kind':<8} {buckets}  call site"]
+    for interface, member, module, kind, count, total, maximum, histogram in rows:
+        counts = " ".join(f"{n:>6}" for n in histogram)
+        lines.append(f"{count:>6} {total:>9.1f} {maximum:>8.1f} {kind:<8} {counts}  {interface}.{member} ({module})")
+    return "\n".join(lines)
+
+
+class InstrumentedProxy(Gio.DBusProxy):
+    """DBusProxy recording the latency of every method call it makes"""
+
+    def __split(self, method_name: str) -> Tuple[str, str]:
+        if method_name.startswith("org.freedesktop.DBus.Properties."):
+            return self.get_interface_name(), "Properties." + method_name.rsplit(".", 1)[1]
+        elif "." in method_name:
+            interface, member = method_name.rsplit(".", 1)
+            return interface, member
+        else:
+            return self.get_interface_name(), method_name
+
+    def call_sync(self, method_name: str, parameters: Optional[GLib.Variant], flags: Gio.DBusCallFlags,
+                  timeout_msec: int, cancellable: Optional[Gio.Cancellable]) -> GLib.Variant:
+        interface, member = self.__split(method_name)
+        start = time.monotonic()
+        try:
+            return super().call_sync(method_name, parameters, flags, timeout_msec, cancellable)
+        finally:
+            record(interface, member, SYNC, time.monotonic() - start)
+
+    def call(
+        self,
+        method_name: str,
+        parameters: Optional[GLib.Variant],
+        flags: Gio.DBusCallFlags,
+        timeout_msec: int,
+        cancellable: Optional[Gio.Cancellable] = None,
+        callback: Optional[Callable[..., None]] = None,
+        *user_data: Any,
+    ) -> None:
+        interface, member = self.__split(method_name)
+        module = caller_module()
+        start = time.monotonic()
+
+        def on_finish(proxy: Gio.DBusProxy, result: Gio.AsyncResult, *data: Any) -> None:
+            record(interface, member, ASYNC, time.monotonic() - start, module)
+            if callback is not None:
+                callback(proxy, result, *data)
+
+        super().call(method_name, parameters, flags, timeout_msec, cancellable, on_finish, *user_data)
@@ -1,6 +1,6 @@
-from typing import Optional, Callable
+from typing import Optional, Callable, Collection, Dict, Any
 
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 
 from blueman.bluez.AnyBase import AnyBase
 from blueman.bluez.Base import Base
@@ -11,11 +11,38 @@ from blueman.bluez.errors import BluezDBusException
 class Adapter(Base):
     _interface_name = 'org.bluez.Adapter1'
 
+    _discovery_filter_signatures = {
+        'UUIDs': 'as',
+        'RSSI': 'n',
+        'Pathloss': 'q',
+        'Transport': 's',
+        'DuplicateData': 'b',
+        'Discoverable': 'b',
+        'Pattern': 's',
+    }
+
     def __init__(self, obj_path: str):
         super().__init__(obj_path=obj_path)
 
-    def start_discovery(self, error_handler: Optional[Callable[[BluezDBusException], None]] = None) -> None:
-        self._call('StartDiscovery', error_handler=error_handler)
+    def start_discovery(self, error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+                        cancellable: Optional[Gio.Cancellable] = None) -> None:
+        self._call('StartDiscovery', error_handler=error_handler, cancellable=cancellable)
+
+    def set_discovery_filter(
+        self,
+        discovery_filter: Dict[str, Any],
+        error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+    ) -> None:
+        """Limit the devices reported by our discovery sessions, an empty filter clears it.
+
+        Keys and values are those of SetDiscoveryFilter in the BlueZ adapter API, e.g.
+        {"Transport": "le", "RSSI": -70, "UUIDs": ["00001105-0000-1000-8000-00805f9b34fb"]}.
+        """
+        variants = {key: GLib.Variant(self._discovery_filter_signatures[key], value)
+                    for key, value in discovery_filter.items()}
+        param = GLib.Variant('(a{sv})', (variants,))
+        self._call('SetDiscoveryFilter', param, error_handler=error_handler, cancellable=cancellable)
 
     def stop_discovery(self) -> None:
         self._call('StopDiscovery')
@@ -33,5 +60,5 @@ class Adapter(Base):
 
 
 class AnyAdapter(AnyBase):
-    def __init__(self) -> None:
-        super().__init__('org.bluez.Adapter1')
+    def __init__(self, path_prefix: Optional[str] = None, properties: Optional[Collection[str]] = None) -> None:
+        super().__init__('org.bluez.Adapter1', path_prefix, properties)
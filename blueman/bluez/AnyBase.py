@@ -1,55 +1,61 @@
-from typing import Dict, List, Optional
+import weakref
+from typing import Dict, List, Optional, Collection, Any
 
-from gi.repository import GObject, GLib
+from gi.repository import GObject
 from gi.repository import Gio
 
+from blueman.bluez.PropertiesCoalescer import PropertiesCoalescer
+from blueman.bluez.PropertiesDispatcher import PropertiesDispatcher
+from blueman.bluez.PropertyMirror import PropertyMirror
 from blueman.bluemantyping import GSignals
 
 
 class AnyBase(GObject.GObject):
     __gsignals__: GSignals = {
-        'property-changed': (GObject.SignalFlags.NO_HOOKS, None, (str, object, str))
+        # Every single change, in order
+        'property-changed': (GObject.SignalFlags.NO_HOOKS, None, (str, object, str)),
+        # Changes per object merged over one main loop iteration, only the final values
+        'properties-changed': (GObject.SignalFlags.NO_HOOKS, None, (object, str)),
     }
 
     connect_signal = GObject.GObject.connect
     disconnect_signal = GObject.GObject.disconnect
 
     __bus_name = 'org.bluez'
-    __bus_interface_name = 'org.freedesktop.DBus.Properties'
+    __bus_type = Gio.BusType.SYSTEM
 
-    def __init__(self, interface_name: str):
+    def __init__(self, interface_name: str, path_prefix: Optional[str] = None,
+                 properties: Optional[Collection[str]] = None):
         super().__init__()
 
-        self.__bus: Optional[Gio.DBusConnection] = Gio.bus_get_sync(Gio.BusType.SYSTEM)
+        self.__coalescer = PropertiesCoalescer(self.__emit_properties_changed)
 
-        self.__interface_name = interface_name
-        self.__signal = None
+        # Register the mirror first so handlers reading properties see the new values
+        PropertyMirror.get_instance(self.__bus_type, self.__bus_name).watch_interface(interface_name)
 
-        def on_signal(
-            _connection: Gio.DBusConnection,
-            _sender_name: str,
-            object_path: str,
-            _interface_name: str,
-            _signal_name: str,
-            param: GLib.Variant,
-        ) -> None:
-            iface_name, changed, invalidated = param.unpack()
-            if iface_name == self.__interface_name:
-                self._on_properties_changed(object_path, changed, invalidated)
+        dispatcher = PropertiesDispatcher.get_instance(self.__bus_type, self.__bus_name)
 
-        self.__signal = self.__bus.signal_subscribe(
-            self.__bus_name, self.__bus_interface_name, 'PropertiesChanged', None, None,
-            Gio.DBusSignalFlags.NONE, on_signal)
+        ref = weakref.WeakMethod(self._on_properties_changed)
+
+        def on_properties_changed(object_path: str, _interface_name: str, changed: Dict[str, Any],
+                                  invalidated: List[str]) -> None:
+            method = ref()
+            if method is not None:
+                method(object_path, changed, invalidated)
+
+        listener = dispatcher.add_listener(interface_name, on_properties_changed, path_prefix, properties)
+        self.__finalizer = weakref.finalize(self, dispatcher.remove_listener, listener)
 
     def _on_properties_changed(
-        self, object_path: str, changed_properties: Dict[str, object], _invalidated: List[str]
+        self, object_path: str, changed_properties: Dict[str, object], invalidated: List[str]
     ) -> None:
         for name, value in changed_properties.items():
             self.emit('property-changed', name, value, object_path)
+        self.__coalescer.add(object_path, changed_properties, invalidated)
+
+    def __emit_properties_changed(self, object_path: str, changed: Dict[str, Any]) -> None:
+        self.emit('properties-changed', changed, object_path)
 
     def close(self) -> None:
-        if self.__signal:
-            if self.__bus is not None:
-                self.__bus.signal_unsubscribe(self.__signal)
-            self.__signal = None
-        self.__bus = None
+        self.__coalescer.clear()
+        self.__finalizer()
@@ -2,7 +2,11 @@ from typing import List, Callable, Optional, Any, Union, Dict
 
 from gi.repository import Gio, GLib, GObject
 from gi.types import GObjectMeta
+from blueman.DBusStats import InstrumentedProxy
 from blueman.bluez.errors import parse_dbus_error, BluezDBusException
+from blueman.bluez.InstanceRegistry import InstanceRegistry
+from blueman.bluez.PropertiesCoalescer import PropertiesCoalescer
+from blueman.bluez.PropertyMirror import PropertyMirror
 import logging
 
 from blueman.bluemantyping import GSignals
@@ -10,33 +14,40 @@ from blueman.bluemantyping import GSignals
 
 class BaseMeta(GObjectMeta):
     def __call__(cls, *args: object, **kwargs: str) -> "Base":
-        if not hasattr(cls, "__instances__"):
-            cls.__instances__: Dict[str, "Base"] = {}
+        if "__instances__" not in cls.__dict__:
+            cls.__instances__: InstanceRegistry["Base"] = InstanceRegistry(getattr(cls, "_interface_name"))
 
         path = kwargs.get('obj_path')
         if path is None:
             path = getattr(cls, "_obj_path")
 
-        if path in cls.__instances__:
-            return cls.__instances__[path]
+        existing = cls.__instances__.get(path)
+        if existing is not None:
+            return existing
 
         instance: "Base" = super().__call__(*args, **kwargs)
-        cls.__instances__[path] = instance
+        cls.__instances__.add(path, instance)
 
         return instance
 
+    def registry_stats(cls) -> Dict[str, int]:
+        """Number of live, evicted and the peak number of live proxies of this class"""
+        if "__instances__" not in cls.__dict__:
+            return {"live": 0, "evicted": 0, "peak": 0}
+        return cls.__instances__.stats()
 
-class Base(Gio.DBusProxy, metaclass=BaseMeta):
-    connect_signal = GObject.GObject.connect
-    disconnect_signal = GObject.GObject.disconnect
 
+class Base(InstrumentedProxy, metaclass=BaseMeta):
     __name = 'org.bluez'
     __bus_type = Gio.BusType.SYSTEM
 
     __gsignals__: GSignals = {
-        'property-changed': (GObject.SignalFlags.NO_HOOKS, None, (str, object, str))
+        # Every single change, in order
+        'property-changed': (GObject.SignalFlags.NO_HOOKS, None, (str, object, str)),
+        # Changes merged over one main loop iteration, only the final values
+        'properties-changed': (GObject.SignalFlags.NO_HOOKS, None, (object, str)),
     }
-    __instances__: Dict[str, "Base"]
+    __instances__: InstanceRegistry["Base"]
 
     _interface_name: str
 
@@ -47,19 +58,41 @@ class Base(Gio.DBusProxy, metaclass=BaseMeta):
             g_object_path=obj_path,
             g_bus_type=self.__bus_type,
             # FIXME See issue 620
-            g_flags=Gio.DBusProxyFlags.GET_INVALIDATED_PROPERTIES)
+            # Properties are read from the mirror, so the proxy does not need to GetAll them on its own
+            g_flags=Gio.DBusProxyFlags.GET_INVALIDATED_PROPERTIES | Gio.DBusProxyFlags.DO_NOT_LOAD_PROPERTIES)
 
-        self.init()
+        # Changes can already arrive while the proxy initializes
+        self.__mirror = PropertyMirror.get_instance(self.__bus_type, self.__name)
+        self.__mirror.connect_interfaces_removed(self.__instances__.on_interfaces_removed)
         self.__fallback = {'Icon': 'blueman', 'Class': 0, 'Appearance': 0}
+        self.__coalescer = PropertiesCoalescer(self.__emit_properties_changed)
 
         self.__variant_map = {str: 's', int: 'u', bool: 'b'}
 
+        self.init()
+
+    def connect_signal(self, signal: str, callback: Callable[..., None], *args: Any) -> int:
+        handler_id: int = GObject.GObject.connect(self, signal, callback, *args)
+        # Keep proxies alive while somebody listens to them
+        self.__instances__.pin(self.get_object_path())
+        return handler_id
+
+    def disconnect_signal(self, handler_id: int) -> None:
+        GObject.GObject.disconnect(self, handler_id)
+        self.__instances__.unpin(self.get_object_path())
+
     def do_g_properties_changed(self, changed_properties: GLib.Variant, _invalidated_properties: List[str]) -> None:
         changed = changed_properties.unpack()
         object_path = self.get_object_path()
         logging.debug(f"{object_path} {changed}")
+        # Make sure handlers reading properties see the new values
+        self.__mirror.update(object_path, self._interface_name, changed, _invalidated_properties)
         for key, value in changed.items():
             self.emit("property-changed", key, value, object_path)
+        self.__coalescer.add(object_path, changed, _invalidated_properties)
+
+    def __emit_properties_changed(self, object_path: str, changed: Dict[str, Any]) -> None:
+        self.emit("properties-changed", changed, object_path)
 
     def _call(
         self,
@@ -67,6 +100,8 @@ class Base(Gio.DBusProxy, metaclass=BaseMeta):
         param: Optional[GLib.Variant] = None,
         reply_handler: Optional[Callable[..., None]] = None,
         error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+        timeout: int = GLib.MAXINT,
     ) -> None:
         def callback(
             proxy: Base,
@@ -79,15 +114,38 @@ class Base(Gio.DBusProxy, metaclass=BaseMeta):
                 if reply:
                     reply(*value)
             except GLib.Error as e:
-                if error:
+                if e.matches(Gio.io_error_quark(), Gio.IOErrorEnum.CANCELLED):
+                    # Whoever cancelled the call is not interested in the result anymore
+                    logging.debug(f"{self.get_interface_name()}.{method} cancelled")
+                elif error:
                     error(parse_dbus_error(e))
                 else:
                     logging.error(f"Unhandled error for {self.get_interface_name()}.{method}", exc_info=True)
 
-        self.call(method, param, Gio.DBusCallFlags.NONE, GLib.MAXINT, None,
+        self.call(method, param, Gio.DBusCallFlags.NONE, timeout, cancellable,
                   callback, reply_handler, error_handler)
 
+    @staticmethod
+    def _reply_idle(reply_handler: Callable[..., None], cancellable: Optional[Gio.Cancellable],
+                    *args: Any) -> None:
+        def reply() -> bool:
+            if cancellable is None or not cancellable.is_cancelled():
+                reply_handler(*args)
+            return False
+
+        GLib.idle_add(reply)
+
+    def _get_mirrored(self) -> Optional[Dict[str, Any]]:
+        return self.__mirror.get_interface_properties(self.get_object_path(), self._interface_name)
+
     def get(self, name: str) -> Any:
+        props = self._get_mirrored()
+        if props is not None:
+            if name in props:
+                return props[name]
+            elif name in self.__fallback:
+                return self.__fallback[name]
+
         try:
             prop = self.call_sync(
                 'org.freedesktop.DBus.Properties.Get',
@@ -105,16 +163,74 @@ class Base(Gio.DBusProxy, metaclass=BaseMeta):
             else:
                 raise parse_dbus_error(e)
 
-    def set(self, name: str, value: Union[str, int, bool]) -> None:
+    def get_async(
+        self,
+        name: str,
+        reply_handler: Callable[[Any], None],
+        error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+        timeout: int = -1,
+    ) -> None:
+        """Non-blocking get, the handlers are never called from within this method or after cancellation.
+
+        timeout is in milliseconds, -1 uses the D-Bus default."""
+        props = self.__mirror.peek_interface_properties(self.get_object_path(), self._interface_name)
+        if props is not None and (name in props or name in self.__fallback):
+            self._reply_idle(reply_handler, cancellable, props.get(name, self.__fallback.get(name)))
+            return
+
+        def on_error(error: BluezDBusException) -> None:
+            if name in self.__fallback:
+                reply_handler(self.__fallback[name])
+            elif error_handler:
+                error_handler(error)
+            else:
+                logging.error(f"Failed to get {self._interface_name}.{name}: {error}")
+
+        param = GLib.Variant('(ss)', (self._interface_name, name))
+        self._call('org.freedesktop.DBus.Properties.Get', param, reply_handler, on_error, cancellable, timeout)
+
+    def get_all_async(
+        self,
+        reply_handler: Callable[[Dict[str, Any]], None],
+        error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+        timeout: int = -1,
+    ) -> None:
+        """Non-blocking get_properties, see get_async"""
+        props = self.__mirror.peek_interface_properties(self.get_object_path(), self._interface_name)
+        if props is not None:
+            self._reply_idle(reply_handler, cancellable, dict(self.__fallback, **props))
+            return
+
+        def on_reply(props: Dict[str, Any]) -> None:
+            reply_handler(dict(self.__fallback, **props))
+
+        param = GLib.Variant('(s)', (self._interface_name,))
+        self._call('org.freedesktop.DBus.Properties.GetAll', param, on_reply, error_handler, cancellable, timeout)
+
+    def set_async(
+        self,
+        name: str,
+        value: Union[str, int, bool],
+        reply_handler: Optional[Callable[[], None]] = None,
+        error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
+        timeout: int = -1,
+    ) -> None:
+        """Non-blocking set, see get_async"""
         v = GLib.Variant(self.__variant_map[type(value)], value)
         param = GLib.Variant('(ssv)', (self._interface_name, name, v))
-        self.call('org.freedesktop.DBus.Properties.Set',
-                  param,
-                  Gio.DBusCallFlags.NONE,
-                  GLib.MAXINT,
-                  None)
+        self._call('org.freedesktop.DBus.Properties.Set', param, reply_handler, error_handler, cancellable, timeout)
+
+    def set(self, name: str, value: Union[str, int, bool]) -> None:
+        self.set_async(name, value)
 
     def get_properties(self) -> Dict[str, Any]:
+        mirrored = self._get_mirrored()
+        if mirrored is not None:
+            return dict(self.__fallback, **mirrored)
+
         param = GLib.Variant('(s)', (self._interface_name,))
         res = self.call_sync('org.freedesktop.DBus.Properties.GetAll',
                              param,
@@ -138,4 +254,7 @@ class Base(Gio.DBusProxy, metaclass=BaseMeta):
         self.set(key, value)
 
     def __contains__(self, key: str) -> bool:
+        props = self._get_mirrored()
+        if props is not None:
+            return key in props or key in self.__fallback
         return key in self.get_properties()
@@ -1,4 +1,6 @@
-from typing import Optional, Callable
+from typing import Optional, Callable, Collection
+
+from gi.repository import Gio
 
 from blueman.bluez.Base import Base
 from blueman.bluez.AnyBase import AnyBase
@@ -15,24 +17,27 @@ class Device(Base):
         self,
         reply_handler: Optional[Callable[[], None]] = None,
         error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
     ) -> None:
-        self._call('Pair', reply_handler=reply_handler, error_handler=error_handler)
+        self._call('Pair', reply_handler=reply_handler, error_handler=error_handler, cancellable=cancellable)
 
     def connect(  # type: ignore
         self,
         reply_handler: Optional[Callable[[], None]] = None,
         error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
     ) -> None:
-        self._call('Connect', reply_handler=reply_handler, error_handler=error_handler)
+        self._call('Connect', reply_handler=reply_handler, error_handler=error_handler, cancellable=cancellable)
 
     def disconnect(  # type: ignore
         self,
         reply_handler: Optional[Callable[[], None]] = None,
         error_handler: Optional[Callable[[BluezDBusException], None]] = None,
+        cancellable: Optional[Gio.Cancellable] = None,
     ) -> None:
-        self._call('Disconnect', reply_handler=reply_handler, error_handler=error_handler)
+        self._call('Disconnect', reply_handler=reply_handler, error_handler=error_handler, cancellable=cancellable)
 
 
 class AnyDevice(AnyBase):
-    def __init__(self) -> None:
-        super().__init__('org.bluez.Device1')
+    def __init__(self, path_prefix: Optional[str] = None, properties: Optional[Collection[str]] = None) -> None:
+        super().__init__('org.bluez.Device1', path_prefix, properties)
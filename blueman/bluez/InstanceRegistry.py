@@ -0,0 +1,87 @@
+import weakref
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple, Iterable, TypeVar, Generic
+
+_T = TypeVar("_T")
+
+
+class InstanceRegistry(Generic[_T]):
+    """Proxy instances of one interface by object path.
+
+    Proxies with signal handlers connected are pinned, of the idle ones only the most recently used are kept
+    alive and all others are held weakly. Entries are evicted as soon as the service reports the object (or the
+    interface on it) removed.
+    """
+
+    def __init__(self, interface_name: str, idle_limit: int = 64) -> None:
+        self.__interface_name = interface_name
+        self.__idle_limit = idle_limit
+
+        self.__instances: "weakref.WeakValueDictionary[str, _T]" = weakref.WeakValueDictionary()
+        self.__pinned: Dict[str, Tuple[_T, int]] = {}
+        self.__recent: "OrderedDict[str, _T]" = OrderedDict()
+
+        self.__evicted = 0
+        self.__peak = 0
+
+    def get(self, object_path: str) -> Optional[_T]:
+        instance = self.__instances.get(object_path)
+        if instance is not None and object_path not in self.__pinned:
+            self.__remember(object_path, instance)
+        return instance
+
+    def add(self, object_path: str, instance: _T) -> None:
+        self.__instances[object_path] = instance
+        self.__remember(object_path, instance)
+        self.__peak = max(self.__peak, len(self.__instances))
+
+    def __remember(self, object_path: str, instance: _T) -> None:
+        self.__recent[object_path] = instance
+        self.__recent.move_to_end(object_path)
+        while len(self.__recent) > self.__idle_limit:
+            self.__recent.popitem(last=False)
+
+    def pin(self, object_path: str) -> None:
+        instance = self.__instances.get(object_path)
+        if instance is None:
+            return
+
+        _instance, count = self.__pinned.get(object_path, (instance, 0))
+        self.__pinned[object_path] = (instance, count + 1)
+        self.__recent.pop(object_path, None)
+
+    def unpin(self, object_path: str) -> None:
+        if object_path not in self.__pinned:
+            return
+
+        instance, count = self.__pinned[object_path]
+        if count > 1:
+            self.__pinned[object_path] = (instance, count - 1)
+        else:
+            del self.__pinned[object_path]
+            self.__remember(object_path, instance)
+
+    def evict(self, object_path: str) -> None:
+        self.__pinned.pop(object_path, None)
+        self.__recent.pop(object_path, None)
+        if self.__instances.pop(object_path, None) is not None:
+            self.__evicted += 1
+
+    def on_interfaces_removed(self, object_path: str, interface_names: Iterable[str]) -> None:
+        if self.__interface_name in interface_names:
+            self.evict(object_path)
+
+    @property
+    def live(self) -> int:
+        return len(self.__instances)
+
+    @property
+    def evicted(self) -> int:
+        return self.__evicted
+
+    @property
+    def peak(self) -> int:
+        return self.__peak
+
+    def stats(self) -> Dict[str, int]:
+        return {"live": self.live, "evicted": self.evicted, "peak": self.peak}
@@ -1,11 +1,12 @@
 import logging
-from typing import List, Optional, Callable
+from typing import List, Optional, Callable, Dict, Iterable, Tuple, Any
 
 from gi.repository import GObject, Gio
 
 from blueman.bluez.Adapter import Adapter
 from blueman.bluez.Device import Device
 from blueman.bluez.errors import DBusNoSuchAdapterError
+from blueman.bluez.PropertiesDispatcher import PropertiesDispatcher
 from blueman.gobject import SingletonGObjectMeta
 from blueman.bluemantyping import GSignals
 
@@ -29,13 +30,61 @@ class Manager(GObject.GObject, metaclass=SingletonGObjectMeta):
             Gio.BusType.SYSTEM, Gio.DBusObjectManagerClientFlags.DO_NOT_AUTO_START,
             self.__bus_name, '/', None, None, None)
 
+        # Indices so device lookups never need to go over the bus
+        self.__devices: Dict[str, Tuple[str, str]] = {}
+        # Paths are dict keys rather than a set to keep them in the order they were added
+        self.__address_index: Dict[str, Dict[str, None]] = {}
+        self.__adapter_index: Dict[str, Dict[str, None]] = {}
+        for dbus_object in self._object_manager.get_objects():
+            self.__index_device(dbus_object.get_interface('org.bluez.Device1'))
+
         self._object_manager.connect("object-added", self._on_object_added)
         self._object_manager.connect("object-removed", self._on_object_removed)
 
+        PropertiesDispatcher.get_instance(Gio.BusType.SYSTEM, self.__bus_name).add_listener(
+            'org.bluez.Device1', self._on_device_address_changed, properties=('Address',))
+
+    def __index_device(self, proxy: Optional[Gio.DBusInterface]) -> None:
+        if not proxy:
+            return
+
+        assert isinstance(proxy, Gio.DBusProxy)
+        address = proxy.get_cached_property('Address')
+        adapter = proxy.get_cached_property('Adapter')
+        if address is None or adapter is None:
+            logging.warning(f"Not indexing {proxy.get_object_path()}, Address or Adapter unknown")
+            return
+
+        self.__add_to_index(proxy.get_object_path(), address.unpack(), adapter.unpack())
+
+    def __add_to_index(self, object_path: str, address: str, adapter_path: str) -> None:
+        self.__remove_from_index(object_path)
+        self.__devices[object_path] = (address, adapter_path)
+        self.__address_index.setdefault(address, {})[object_path] = None
+        self.__adapter_index.setdefault(adapter_path, {})[object_path] = None
+
+    def __remove_from_index(self, object_path: str) -> None:
+        if object_path not in self.__devices:
+            return
+
+        address, adapter_path = self.__devices.pop(object_path)
+        for index, key in ((self.__address_index, address), (self.__adapter_index, adapter_path)):
+            paths = index[key]
+            paths.pop(object_path, None)
+            if not paths:
+                del index[key]
+
+    def _on_device_address_changed(self, object_path: str, _interface_name: str, changed: Dict[str, Any],
+                                   _invalidated: List[str]) -> None:
+        if object_path in self.__devices and 'Address' in changed:
+            self.__add_to_index(object_path, changed['Address'], self.__devices[object_path][1])
+
     def _on_object_added(self, _object_manager: Gio.DBusObjectManager, dbus_object: Gio.DBusObject) -> None:
         device_proxy = dbus_object.get_interface('org.bluez.Device1')
         adapter_proxy = dbus_object.get_interface('org.bluez.Adapter1')
 
+        self.__index_device(device_proxy)
+
         if adapter_proxy:
             assert isinstance(adapter_proxy, Gio.DBusProxy)
             object_path = adapter_proxy.get_object_path()
@@ -51,6 +100,8 @@ class Manager(GObject.GObject, metaclass=SingletonGObjectMeta):
         device_proxy = dbus_object.get_interface('org.bluez.Device1')
         adapter_proxy = dbus_object.get_interface('org.bluez.Adapter1')
 
+        self.__remove_from_index(dbus_object.get_object_path())
+
         if adapter_proxy:
             assert isinstance(adapter_proxy, Gio.DBusProxy)
             object_path = adapter_proxy.get_object_path()
@@ -88,22 +139,17 @@ class Manager(GObject.GObject, metaclass=SingletonGObjectMeta):
             raise DBusNoSuchAdapterError(f"No adapters found with pattern: {pattern}")
 
     def get_devices(self, adapter_path: str = "/") -> List[Device]:
-        paths = []
-        for obj_proxy in self._object_manager.get_objects():
-            proxy = obj_proxy.get_interface('org.bluez.Device1')
-
-            if proxy:
-                assert isinstance(proxy, Gio.DBusProxy)
-                object_path = proxy.get_object_path()
-                if object_path.startswith(adapter_path):
-                    paths.append(object_path)
+        if adapter_path in self.__adapter_index:
+            paths: Iterable[str] = self.__adapter_index[adapter_path]
+        else:
+            paths = {path for path in self.__devices if path.startswith(adapter_path)}
 
-        return [Device(obj_path=path) for path in paths]
+        return [Device(obj_path=path) for path in sorted(paths)]
 
     def find_device(self, address: str, adapter_path: str = "/") -> Optional[Device]:
-        for device in self.get_devices(adapter_path):
-            if device['Address'] == address:
-                return device
+        for path in self.__address_index.get(address, ()):
+            if path.startswith(adapter_path):
+                return Device(obj_path=path)
         return None
 
     @classmethod
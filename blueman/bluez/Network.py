@@ -1,4 +1,4 @@
-from typing import Optional, Callable
+from typing import Optional, Callable, Collection
 
 from blueman.bluez.Base import Base
 from blueman.bluez.AnyBase import AnyBase
@@ -31,5 +31,5 @@ class Network(Base):
 
 
 class AnyNetwork(AnyBase):
-    def __init__(self) -> None:
-        super().__init__('org.bluez.Network1')
+    def __init__(self, path_prefix: Optional[str] = None, properties: Optional[Collection[str]] = None) -> None:
+        super().__init__('org.bluez.Network1', path_prefix, properties)
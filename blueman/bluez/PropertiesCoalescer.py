@@ -0,0 +1,47 @@
+from typing import Dict, Any, Optional, Callable, Iterable
+
+from gi.repository import GLib
+
+
+class PropertiesCoalescer:
+    """Merge property changes per object path and hand them out once per main loop iteration.
+
+    The flush runs before redrawing, so a burst of changes queued in one iteration ends up
+    as a single callback per object carrying only the final values.
+    """
+
+    def __init__(self, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        self.__callback = callback
+        self.__pending: Dict[str, Dict[str, Any]] = {}
+        self.__source: Optional[int] = None
+
+    def add(self, object_path: str, changed: Dict[str, Any], invalidated: Iterable[str] = ()) -> None:
+        pending = self.__pending.setdefault(object_path, {})
+        pending.update(changed)
+        for name in invalidated:
+            pending.pop(name, None)
+
+        if not pending:
+            del self.__pending[object_path]
+        elif self.__source is None:
+            self.__source = GLib.idle_add(self._on_idle, priority=GLib.PRIORITY_HIGH_IDLE)
+
+    def _on_idle(self) -> bool:
+        self.__source = None
+        self.flush()
+        return False
+
+    def flush(self) -> None:
+        self.cancel_idle()
+        pending, self.__pending = self.__pending, {}
+        for object_path, changed in pending.items():
+            self.__callback(object_path, changed)
+
+    def cancel_idle(self) -> None:
+        if self.__source is not None:
+            GLib.source_remove(self.__source)
+            self.__source = None
+
+    def clear(self) -> None:
+        self.cancel_idle()
+        self.__pending = {}
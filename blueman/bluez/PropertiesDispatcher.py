@@ -0,0 +1,88 @@
+from typing import Dict, Any, Optional, List, Tuple, Callable, Collection, FrozenSet
+
+from gi.repository import Gio, GLib
+
+Listener = Callable[[str, str, Dict[str, Any], List[str]], None]
+
+
+class _Registration:
+    def __init__(self, callback: Listener, path_prefix: Optional[str], properties: Optional[FrozenSet[str]]):
+        self.callback = callback
+        self.path_prefix = path_prefix
+        self.properties = properties
+
+    def dispatch(self, object_path: str, interface_name: str, changed: Dict[str, Any], invalidated: List[str]) -> None:
+        if self.path_prefix is not None and not object_path.startswith(self.path_prefix):
+            return
+
+        if self.properties is not None:
+            changed = {key: value for key, value in changed.items() if key in self.properties}
+            invalidated = [name for name in invalidated if name in self.properties]
+            if not changed and not invalidated:
+                return
+
+        self.callback(object_path, interface_name, changed, invalidated)
+
+
+class PropertiesDispatcher:
+    """Process-wide fan-out of PropertiesChanged signals of a D-Bus service.
+
+    There is one bus match per interface that has listeners, each signal gets unpacked once and handed to the
+    listeners registered for its interface. Listeners may restrict themselves to object paths starting with a
+    prefix and to a set of property names. The changed dict is shared between listeners and must not be modified.
+    """
+
+    __instances: Dict[Tuple[Gio.BusType, str], "PropertiesDispatcher"] = {}
+
+    __properties_interface = 'org.freedesktop.DBus.Properties'
+
+    @classmethod
+    def get_instance(cls, bus_type: Gio.BusType, bus_name: str) -> "PropertiesDispatcher":
+        key = (bus_type, bus_name)
+        if key not in cls.__instances:
+            cls.__instances[key] = cls(bus_type, bus_name)
+        return cls.__instances[key]
+
+    def __init__(self, bus_type: Gio.BusType, bus_name: str) -> None:
+        self.__bus = Gio.bus_get_sync(bus_type)
+        self.__bus_name = bus_name
+
+        # interface name -> listener id -> registration, ordered by registration
+        self.__listeners: Dict[str, Dict[int, _Registration]] = {}
+        self.__interfaces: Dict[int, str] = {}
+        self.__signals: Dict[str, int] = {}
+        self.__next_id = 1
+
+    def add_listener(self, interface_name: str, callback: Listener, path_prefix: Optional[str] = None,
+                     properties: Optional[Collection[str]] = None) -> int:
+        if interface_name not in self.__signals:
+            self.__signals[interface_name] = self.__bus.signal_subscribe(
+                self.__bus_name, self.__properties_interface, 'PropertiesChanged', None, interface_name,
+                Gio.DBusSignalFlags.NONE, self._on_signal)
+
+        listener_id = self.__next_id
+        self.__next_id += 1
+
+        allowed = None if properties is None else frozenset(properties)
+        self.__listeners.setdefault(interface_name, {})[listener_id] = _Registration(callback, path_prefix, allowed)
+        self.__interfaces[listener_id] = interface_name
+
+        return listener_id
+
+    def remove_listener(self, listener_id: int) -> None:
+        interface_name = self.__interfaces.pop(listener_id)
+        listeners = self.__listeners[interface_name]
+        del listeners[listener_id]
+
+        if not listeners:
+            del self.__listeners[interface_name]
+            self.__bus.signal_unsubscribe(self.__signals.pop(interface_name))
+
+    def _on_signal(self, _connection: Gio.DBusConnection, _sender_name: str, object_path: str,
+                   _interface_name: str, _signal_name: str, param: GLib.Variant) -> None:
+        interface_name, changed, invalidated = param.unpack()
+        listeners = self.__listeners.get(interface_name, {})
+        # Listeners may remove themselves or others while being called
+        for listener_id, registration in list(listeners.items()):
+            if listener_id in listeners:
+                registration.dispatch(object_path, interface_name, changed, invalidated)
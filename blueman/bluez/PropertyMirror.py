@@ -0,0 +1,186 @@
+import logging
+import time
+from typing import Dict, Any, Optional, List, Tuple, Callable, Iterable
+
+from gi.repository import Gio, GLib, GObject
+
+from blueman import DBusStats
+from blueman.bluez.PropertiesDispatcher import PropertiesDispatcher
+
+
+class PropertyMirror:
+    """Local copy of the properties of all objects exported by an ObjectManager service.
+
+    The mirror is seeded from a single GetManagedObjects call and kept current from
+    InterfacesAdded, InterfacesRemoved and PropertiesChanged, so reading a property
+    does not need a round trip to the service.
+    """
+
+    __instances: Dict[Tuple[Gio.BusType, str], "PropertyMirror"] = {}
+
+    __object_manager_interface = 'org.freedesktop.DBus.ObjectManager'
+
+    @classmethod
+    def get_instance(cls, bus_type: Gio.BusType, bus_name: str) -> "PropertyMirror":
+        key = (bus_type, bus_name)
+        if key not in cls.__instances:
+            cls.__instances[key] = cls(bus_type, bus_name)
+        return cls.__instances[key]
+
+    def __init__(self, bus_type: Gio.BusType, bus_name: str) -> None:
+        self.__bus = Gio.bus_get_sync(bus_type)
+        self.__bus_name = bus_name
+
+        # object path -> interface name -> property name -> value
+        self.__objects: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        self.__seeded = False
+        # Set when GetManagedObjects failed, no snapshot is tried again until the name owner changes
+        self.__seed_failed = False
+        self.__seeding: Optional[Gio.Cancellable] = None
+        self.__watched: Dict[str, int] = {}
+        self.__dispatcher = PropertiesDispatcher.get_instance(bus_type, bus_name)
+        self.__removed_handlers: List[Callable[[str, Iterable[str]], None]] = []
+
+        self.__bus.signal_subscribe(
+            bus_name, self.__object_manager_interface, 'InterfacesAdded', None, None,
+            Gio.DBusSignalFlags.NONE, self._on_interfaces_added)
+        self.__bus.signal_subscribe(
+            bus_name, self.__object_manager_interface, 'InterfacesRemoved', None, None,
+            Gio.DBusSignalFlags.NONE, self._on_interfaces_removed)
+
+        self.__owner: Optional[str] = None
+        Gio.bus_watch_name_on_connection(self.__bus, bus_name, Gio.BusNameWatcherFlags.NONE,
+                                         self._on_name_appeared, self._on_name_vanished)
+
+    def connect_interfaces_removed(self, handler: Callable[[str, Iterable[str]], None]) -> None:
+        """Call handler with object path and interface names whenever interfaces go away, connecting twice is a noop"""
+        if handler not in self.__removed_handlers:
+            self.__removed_handlers.append(handler)
+
+    def watch_interface(self, interface_name: str) -> None:
+        """Start mirroring property changes of interface_name, objects are always tracked"""
+        if interface_name in self.__watched:
+            return
+
+        self.__watched[interface_name] = self.__dispatcher.add_listener(interface_name, self.update)
+
+        # Values of an interface that was not watched may have gone stale since the last snapshot
+        self.__seeded = False
+
+    def seed(self) -> None:
+        start = time.monotonic()
+        try:
+            reply = self.__bus.call_sync(self.__bus_name, '/', self.__object_manager_interface, 'GetManagedObjects',
+                                         None, GLib.VariantType.new('(a{oa{sa{sv}}})'), Gio.DBusCallFlags.NONE,
+                                         -1, None)
+        except GLib.Error as e:
+            self.__on_seed_error(e)
+            return
+        finally:
+            DBusStats.record(self.__object_manager_interface, 'GetManagedObjects', DBusStats.SYNC,
+                             time.monotonic() - start)
+
+        self.__set_snapshot(reply)
+
+    def seed_async(self) -> None:
+        """Take the initial snapshot in the background, does nothing if one is already pending"""
+        if self.__seeding is not None:
+            return
+
+        def on_reply(_bus: Optional[GObject.Object], result: Gio.AsyncResult, _user_data: Optional[object]) -> None:
+            if cancellable.is_cancelled():
+                return
+            self.__seeding = None
+            try:
+                self.__set_snapshot(self.__bus.call_finish(result))
+            except GLib.Error as e:
+                self.__on_seed_error(e)
+
+        cancellable = Gio.Cancellable()
+        self.__seeding = cancellable
+        self.__bus.call(self.__bus_name, '/', self.__object_manager_interface, 'GetManagedObjects', None,
+                        GLib.VariantType.new('(a{oa{sa{sv}}})'), Gio.DBusCallFlags.NONE, -1, cancellable,
+                        on_reply, None)
+
+    def __on_seed_error(self, error: GLib.Error) -> None:
+        logging.warning(f"Failed to get managed objects of {self.__bus_name}: {error.message}")
+        self.__seed_failed = True
+
+    def __set_snapshot(self, reply: GLib.Variant) -> None:
+        if self.__seeding is not None:
+            self.__seeding.cancel()
+            self.__seeding = None
+        self.__objects = reply.unpack()[0]
+        self.__seeded = True
+
+    def get_interface_properties(self, object_path: str, interface_name: str) -> Optional[Dict[str, Any]]:
+        """Return the mirrored properties or None if the object or interface is not known"""
+        self.watch_interface(interface_name)
+        if not self.__seeded and not self.__seed_failed:
+            self.seed()
+        return self.__objects.get(object_path, {}).get(interface_name)
+
+    def peek_interface_properties(self, object_path: str, interface_name: str) -> Optional[Dict[str, Any]]:
+        """Like get_interface_properties, but return None instead of blocking on the initial snapshot"""
+        self.watch_interface(interface_name)
+        if not self.__seeded:
+            if not self.__seed_failed:
+                self.seed_async()
+            return None
+        return self.__objects.get(object_path, {}).get(interface_name)
+
+    def update(self, object_path: str, interface_name: str, changed: Dict[str, Any],
+               invalidated: List[str]) -> None:
+        props = self.__objects.get(object_path, {}).get(interface_name)
+        if props is None:
+            return
+
+        props.update(changed)
+        for name in invalidated:
+            props.pop(name, None)
+
+    def clear(self) -> None:
+        if self.__seeding is not None:
+            self.__seeding.cancel()
+            self.__seeding = None
+        self.__objects = {}
+        self.__seeded = False
+        self.__seed_failed = False
+
+    def _on_interfaces_added(self, _connection: Gio.DBusConnection, _sender_name: str, _object_path: str,
+                             _interface_name: str, _signal_name: str, param: GLib.Variant) -> None:
+        object_path, interfaces = param.unpack()
+        self.__objects.setdefault(object_path, {}).update(interfaces)
+
+    def _on_interfaces_removed(self, _connection: Gio.DBusConnection, _sender_name: str, _object_path: str,
+                               _interface_name: str, _signal_name: str, param: GLib.Variant) -> None:
+        object_path, interface_names = param.unpack()
+        interfaces = self.__objects.get(object_path, {})
+
+        for name in interface_names:
+            interfaces.pop(name, None)
+
+        if not interfaces:
+            self.__objects.pop(object_path, None)
+
+        for handler in self.__removed_handlers:
+            handler(object_path, interface_names)
+
+    def _on_name_appeared(self, _connection: Gio.DBusConnection, name: str, owner: str) -> None:
+        if self.__owner is not None and self.__owner != owner:
+            logging.debug(f"{name} changed owner, dropping mirrored properties")
+            self.clear()
+        elif self.__owner is None:
+            # The service may have just started, after a snapshot failed because it was not running
+            self.__seed_failed = False
+        self.__owner = owner
+
+    def _on_name_vanished(self, _connection: Gio.DBusConnection, name: str) -> None:
+        logging.debug(f"{name} vanished, dropping mirrored properties")
+        self.__owner = None
+        objects = self.__objects
+        self.clear()
+
+        for object_path, interfaces in objects.items():
+            for handler in self.__removed_handlers:
+                handler(object_path, list(interfaces))
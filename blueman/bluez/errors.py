@@ -1,4 +1,4 @@
-from gi.repository import GLib
+from gi.repository import Gio, GLib
 
 
 class BluezDBusException(Exception):
@@ -97,6 +97,10 @@ class DBusMainLoopModuleNotFoundError(BluezDBusException):
     pass
 
 
+class DBusTimeoutError(BluezDBusException):
+    pass
+
+
 class BluezUnavailableAgentMethodError(BluezDBusException):
     pass
 
@@ -121,13 +125,23 @@ __DICT_ERROR__ = {'org.bluez.Error.Failed': DBusFailedError,
                   'org.bluez.Error.AuthenticationCanceled': DBusAuthenticationCanceledError,
                   'org.bluez.serial.Error.NotSupported': DBusNotSupportedError,
                   'org.bluez.Error.UnsupportedMajorClass': DBusUnsupportedMajorClassError,
-                  'org.freedesktop.DBus.Error.ServiceUnknown': DBusServiceUnknownError}
+                  'org.freedesktop.DBus.Error.ServiceUnknown': DBusServiceUnknownError,
+                  'org.freedesktop.DBus.Error.NoReply': DBusTimeoutError,
+                  'org.freedesktop.DBus.Error.Timeout': DBusTimeoutError}
 
 
 def parse_dbus_error(exception: GLib.Error) -> BluezDBusException:
     global __DICT_ERROR__
 
-    gerror, dbus_error, message = exception.message.split(':', 2)
+    if exception.matches(Gio.io_error_quark(), Gio.IOErrorEnum.TIMED_OUT):
+        return DBusTimeoutError(exception.message)
+
+    try:
+        gerror, dbus_error, message = exception.message.split(':', 2)
+    except ValueError:
+        # Local errors like a closed connection do not carry a D-Bus error name
+        return BluezDBusException(exception.message)
+
     try:
         return __DICT_ERROR__[dbus_error](message)
     except KeyError:
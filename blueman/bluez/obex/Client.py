@@ -1,8 +1,9 @@
 import logging
+from typing import Optional
 
 from blueman.bluez.errors import BluezDBusException
 from blueman.bluez.obex.Base import Base
-from gi.repository import GObject, GLib
+from gi.repository import GObject, GLib, Gio
 
 from blueman.bluemantyping import GSignals
 
@@ -18,7 +19,8 @@ class Client(Base):
     def __init__(self) -> None:
         super().__init__(obj_path=self._obj_path)
 
-    def create_session(self, dest_addr: str, source_addr: str = "00:00:00:00:00:00", pattern: str = "opp") -> None:
+    def create_session(self, dest_addr: str, source_addr: str = "00:00:00:00:00:00", pattern: str = "opp",
+                       cancellable: Optional[Gio.Cancellable] = None) -> None:
         def on_session_created(session_path: str) -> None:
             logging.info(f"{dest_addr} {source_addr} {pattern} {session_path}")
 
@@ -29,7 +31,8 @@ class Client(Base):
         v_source_addr = GLib.Variant('s', source_addr)
         v_pattern = GLib.Variant('s', pattern)
         param = GLib.Variant('(sa{sv})', (dest_addr, {"Source": v_source_addr, "Target": v_pattern}))
-        self._call('CreateSession', param, reply_handler=on_session_created, error_handler=on_session_failed)
+        self._call('CreateSession', param, reply_handler=on_session_created, error_handler=on_session_failed,
+                   cancellable=cancellable)
 
     def remove_session(self, session_path: str) -> None:
         def on_session_removed() -> None:
@@ -1,9 +1,9 @@
 import logging
-from typing import Dict
+from typing import Dict, Optional
 
 from blueman.bluez.errors import BluezDBusException
 from blueman.bluez.obex.Base import Base
-from gi.repository import GObject, GLib
+from gi.repository import GObject, GLib, Gio
 
 from blueman.bluemantyping import GSignals
 
@@ -19,7 +19,7 @@ class ObjectPush(Base):
     def __init__(self, obj_path: str):
         super().__init__(obj_path=obj_path)
 
-    def send_file(self, file_path: str) -> None:
+    def send_file(self, file_path: str, cancellable: Optional[Gio.Cancellable] = None) -> None:
         def on_transfer_started(transfer_path: str, props: Dict[str, str]) -> None:
             logging.info(" ".join((self.get_object_path(), file_path, transfer_path)))
             self.emit('transfer-started', transfer_path, props['Filename'])
@@ -29,7 +29,8 @@ class ObjectPush(Base):
             self.emit('transfer-failed', error)
 
         param = GLib.Variant('(s)', (file_path,))
-        self._call('SendFile', param, reply_handler=on_transfer_started, error_handler=on_transfer_error)
+        self._call('SendFile', param, reply_handler=on_transfer_started, error_handler=on_transfer_error,
+                   cancellable=cancellable)
 
     def get_session_path(self) -> str:
         path: str = self.get_object_path()
@@ -9,9 +9,11 @@ from blueman.bluez.Manager import Manager
 from blueman.bluez.Device import Device, AnyDevice
 from blueman.bluez.Adapter import Adapter, AnyAdapter
 from blueman.bluez.errors import DBusNoSuchAdapterError, BluezDBusException
+from blueman.main.Config import Config
 
 from gi.repository import GObject
 from gi.repository import GLib
+from gi.repository import Gio
 
 import gi
 
@@ -28,6 +30,8 @@ class DeviceList(GenericList):
         'device-selected': (GObject.SignalFlags.RUN_LAST, None, (Device, Gtk.TreeIter,)),
         # @param: device, TreeIter, (key, value)
         'device-property-changed': (GObject.SignalFlags.RUN_LAST, None, (Device, Gtk.TreeIter, object,)),
+        # @param: device, TreeIter, {key: value}, emitted once after the device-property-changed of a batch
+        'device-properties-changed': (GObject.SignalFlags.RUN_LAST, None, (Device, Gtk.TreeIter, object,)),
         # @param: adapter, (key, value)
         'adapter-property-changed': (GObject.SignalFlags.RUN_LAST, None, (Adapter, object,)),
         # @param: progress (0 to 1)
@@ -42,12 +46,12 @@ class DeviceList(GenericList):
     }
 
     def __init__(self, adapter_name: Optional[str] = None, tabledata: Optional[List[ListDataDict]] = None,
-                 headers_visible: bool = True) -> None:
+                 headers_visible: bool = True, discovery_filter_key: str = "discovery-filter") -> None:
         if not tabledata:
             tabledata = []
 
-        # cache for fast lookup in the list
-        self.path_to_row: Dict[str, Gtk.TreeRowReference] = {}
+        self._config = Config("org.blueman.general")
+        self._discovery_filter_key = discovery_filter_key
 
         self.manager = Manager()
         self._managerhandlers: List[int] = []
@@ -61,16 +65,21 @@ class DeviceList(GenericList):
                                                                  'device-removed'))
 
         self.any_device = AnyDevice()
-        self._anydevhandler = self.any_device.connect_signal("property-changed", self._on_device_property_changed)
+        self._anydevhandler = self.any_device.connect_signal(
+            "properties-changed", self._on_device_properties_changed)
 
         self.__discovery_time: float = 0
         self.__adapter_path: Optional[str] = None
         self.Adapter: Optional[Adapter] = None
         self.discovering = False
+        # True while display_known_devices fills the detached model
+        self.populating = False
+        # Cancelled on destroy so pending calls do not report back to a closed window
+        self.cancellable = Gio.Cancellable()
 
         data = tabledata + [
             {"id": "device", "type": object},
-            {"id": "dbus_path", "type": str},
+            {"id": "dbus_path", "type": str, "indexed": True},
             {"id": "timestamp", "type": float}
         ]
 
@@ -89,6 +98,7 @@ class DeviceList(GenericList):
         self.icon_theme.connect("changed", self.on_icon_theme_changed)
 
     def destroy(self) -> None:
+        self.cancellable.cancel()
         self.any_device.disconnect(self._anydevhandler)
         self._any_adapter.disconnect(self._anyadapterhandler)
         self.selection.disconnect(self._selectionhandler)
@@ -140,14 +150,16 @@ class DeviceList(GenericList):
 
         self.emit("adapter-property-changed", self.Adapter, (key, value))
 
-    def _on_device_property_changed(self, _device: AnyDevice, key: str, value: object, path: str) -> None:
+    def _on_device_properties_changed(self, _device: AnyDevice, changed: Dict[str, object], path: str) -> None:
         tree_iter = self.find_device_by_path(path)
 
         if tree_iter is not None:
             dev = self.get(tree_iter, "device")["device"]
-            self.row_update_event(tree_iter, key, value)
+            for key, value in changed.items():
+                self.row_update_event(tree_iter, key, value)
+                self.emit("device-property-changed", dev, tree_iter, (key, value))
 
-            self.emit("device-property-changed", dev, tree_iter, (key, value))
+            self.emit("device-properties-changed", dev, tree_iter, changed)
 
     # Override when subclassing
     def on_icon_theme_changed(self, _icon_them: Gtk.IconTheme) -> None:
@@ -225,36 +237,83 @@ class DeviceList(GenericList):
         return True
 
     def add_device(self, device: Device) -> None:
-        # device belongs to another adapter
-        if not self.Adapter or not device['Adapter'] == self.Adapter.get_object_path():
+        # device belongs to another adapter, known devices are already picked by adapter
+        if not self.Adapter or (not self.populating and device['Adapter'] != self.Adapter.get_object_path()):
             return
 
         logging.info("adding new device")
-        tree_iter = self.liststore.append()
-
-        self.set(tree_iter, device=device)
+        tree_iter = self.append(device=device, dbus_path=device.get_object_path())
         self.row_setup_event(tree_iter, device)
 
-        object_path = device.get_object_path()
         timestamp = datetime.strftime(datetime.now(), '%Y%m%d%H%M%S%f')
-        self.set(tree_iter, dbus_path=object_path, timestamp=float(timestamp))
+        self.set(tree_iter, timestamp=float(timestamp))
 
     def display_known_devices(self, autoselect: bool = False) -> None:
+        # Rows left in the list belong to the current adapter, set_adapter clears the list
+        refresh = len(self.liststore) > 0
+        selected = self.get_selected_device()
+        selected_path = selected.get_object_path() if selected is not None else None
+        vadjustment = self.get_vadjustment()
+        scroll = vadjustment.get_value()
+
         self.clear()
         if self.Adapter:
             devices = self.manager.get_devices(self.Adapter.get_object_path())
+            self._populate(devices)
+
+        tree_iter = self.find_device_by_path(selected_path) if selected_path is not None else None
+        if tree_iter is not None:
+            self.selection.select_iter(tree_iter)
+        elif autoselect:
+            self.selection.select_path(0)
+
+        if refresh:
+            def restore_scroll() -> bool:
+                vadjustment.set_value(scroll)
+                return False
+
+            # The adjustment only gets its new range once the view is allocated again
+            GLib.idle_add(restore_scroll)
+
+    def _populate(self, devices: List[Device]) -> None:
+        # Fill the model without the view, sorting and selection handling reacting to every single row
+        self.populating = True
+        sort_column, sort_type = self.liststore.get_sort_column_id()
+        self.liststore.set_sort_column_id(Gtk.TREE_SORTABLE_UNSORTED_SORT_COLUMN_ID, Gtk.SortType.ASCENDING)
+        self.selection.handler_block(self._selectionhandler)
+        self.set_model(None)
+        try:
             for device in devices:
                 self.device_add_event(device)
+        finally:
+            self.set_model(self.liststore)
+            self.selection.handler_unblock(self._selectionhandler)
+            if sort_column is not None and sort_type is not None:
+                self.liststore.set_sort_column_id(sort_column, sort_type)
+            self.populating = False
 
-        if autoselect:
-            self.selection.select_path(0)
+    def get_discovery_filter(self) -> Dict[str, Any]:
+        preset = self._config[self._discovery_filter_key]
+        discovery_filter: Dict[str, Any] = {}
+
+        # BlueZ reports repeated advertisements unless told otherwise
+        if not self._config["discovery-duplicate-data"]:
+            discovery_filter["DuplicateData"] = False
+
+        if preset in ("bredr", "le"):
+            discovery_filter["Transport"] = preset
+        elif preset == "nearby":
+            discovery_filter["RSSI"] = self._config["discovery-rssi-threshold"]
+
+        return discovery_filter
 
     def discover_devices(self, time: float = 10.24,
                          error_handler: Optional[Callable[[BluezDBusException], None]] = None) -> None:
         if not self.discovering:
             self.__discovery_time = 0
             if self.Adapter is not None:
-                self.Adapter.start_discovery(error_handler=error_handler)
+                self.Adapter.set_discovery_filter(self.get_discovery_filter(), cancellable=self.cancellable)
+                self.Adapter.start_discovery(error_handler=error_handler, cancellable=self.cancellable)
                 self.discovering = True
                 t = 1.0 / 15 * 1000
                 GLib.timeout_add(int(t), self.update_progress, t / 1000, time)
@@ -287,72 +346,12 @@ class DeviceList(GenericList):
                 tree_iter = i.iter
                 device = self.get(tree_iter, "device")["device"]
                 self.device_remove_event(device)
-            self.liststore.clear()
+            super().clear()
             self.emit("device-selected", None, None)
 
-        self.path_to_row = {}
-
     def find_device(self, device: Device) -> Optional[Gtk.TreeIter]:
-        object_path = device.get_object_path()
-        try:
-            row = self.path_to_row[object_path]
-            if row.valid():
-                path = row.get_path()
-                assert path is not None
-                tree_iter = self.liststore.get_iter(path)
-                return tree_iter
-            else:
-                del self.path_to_row[object_path]
-                return None
-
-        except KeyError:
-            return None
+        return self.find_device_by_path(device.get_object_path())
 
     def find_device_by_path(self, path: str) -> Optional[Gtk.TreeIter]:
-        try:
-            row = self.path_to_row[path]
-            if row.valid():
-                path_ = row.get_path()
-                assert path_ is not None
-                tree_iter = self.liststore.get_iter(path_)
-                return tree_iter
-            else:
-                del self.path_to_row[path]
-                return None
-        except KeyError:
-            return None
-
-    def do_cache(self, tree_iter: Gtk.TreeIter, kwargs: Dict[str, Any]) -> None:
-        object_path = None
-
-        if "device" in kwargs:
-            if kwargs["device"]:
-                object_path = kwargs['device'].get_object_path()
-
-        elif "dbus_path" in kwargs:
-            if kwargs["dbus_path"]:
-                object_path = kwargs['dbus_path']
-            else:
-                existing = self.get(tree_iter, "dbus_path")["dbus_path"]
-                if existing is not None:
-                    del self.path_to_row[existing]
-
-        if object_path:
-            logging.info(f"Caching new device {object_path}")
-            self.path_to_row[object_path] = Gtk.TreeRowReference.new(self.liststore,
-                                                                     self.liststore.get_path(tree_iter))
-
-    def append(self, **columns: object) -> Gtk.TreeIter:
-        tree_iter = GenericList.append(self, **columns)
-        self.do_cache(tree_iter, columns)
-        return tree_iter
-
-    def prepend(self, **columns: object) -> Gtk.TreeIter:
-        tree_iter = GenericList.prepend(self, **columns)
-        self.do_cache(tree_iter, columns)
-        return tree_iter
-
-    # FIXME: GenericList.set accepts int and str as iterid, DeviceList does not
-    def set(self, iterid: Gtk.TreeIter, **kwargs: object) -> None:  # type: ignore
-        GenericList.set(self, iterid, **kwargs)
-        self.do_cache(iterid, kwargs)
+        rows = self.get_indexed("dbus_path", path)
+        return rows[0] if rows else None
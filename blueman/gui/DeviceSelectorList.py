@@ -29,7 +29,8 @@ class DeviceSelectorList(DeviceList):
              "render_attrs": {"icon_name": 3}}
         ]
 
-        super().__init__(adapter_name, tabledata, headers_visible=False)
+        super().__init__(adapter_name, tabledata, headers_visible=False,
+                         discovery_filter_key="sendto-discovery-filter")
 
     def on_icon_theme_changed(self, _icon_them: Gtk.IconTheme) -> None:
         for row in self.liststore:
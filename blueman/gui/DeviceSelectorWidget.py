@@ -90,7 +90,9 @@ class DeviceSelectorWidget(Gtk.Box):
                     self.List.Adapter.stop_discovery()
                     self.List.set_adapter(os.path.basename(adapter_path))
                     # Start discovery on selected adapter
-                    self.List.Adapter.start_discovery()
+                    self.List.Adapter.set_discovery_filter(self.List.get_discovery_filter(),
+                                                           cancellable=self.List.cancellable)
+                    self.List.Adapter.start_discovery(cancellable=self.List.cancellable)
 
     def on_adapter_changed(self, _devlist: DeviceSelectorList, adapter_path: str) -> None:
         logging.info("changed")
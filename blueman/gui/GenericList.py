@@ -18,6 +18,8 @@ if TYPE_CHECKING:
         view_props: Mapping[str, object]
         celldata_func: Tuple[Callable[[Gtk.TreeViewColumn, Gtk.CellRenderer, Gtk.TreeModel, Gtk.TreeIter, Any],
                                       None], Any]
+        # keep a value -> rows index for lookups, values need to be hashable
+        indexed: bool
 else:
     ListDataDict = dict
 
@@ -33,6 +35,9 @@ class GenericList(Gtk.TreeView):
     def _load(self, data: Iterable[ListDataDict]) -> None:
         self.ids: Dict[str, int] = {}
         self.columns: Dict[str, Gtk.TreeViewColumn] = {}
+        # column -> value -> rows, row references follow their rows when the model gets sorted or reordered
+        self._indices: Dict[str, Dict[object, List[Gtk.TreeRowReference]]] = {
+            row["id"]: {} for row in data if row.get("indexed")}
 
         types = [row["type"] for row in data]
 
@@ -72,6 +77,8 @@ class GenericList(Gtk.TreeView):
         if tree_iter is None:
             return False
         if self.liststore.iter_is_valid(tree_iter):
+            if self._indices:
+                self._update_indices(tree_iter, self.get(tree_iter, *self._indices), {})
             self.liststore.remove(tree_iter)
             return True
         else:
@@ -92,17 +99,70 @@ class GenericList(Gtk.TreeView):
 
     def append(self, **columns: object) -> Gtk.TreeIter:
         vals = self._add(**columns)
-        return self.liststore.append(vals)
+        tree_iter = self.liststore.append(vals)
+        self._update_indices(tree_iter, {}, columns)
+        return tree_iter
 
     def prepend(self, **columns: object) -> Gtk.TreeIter:
         vals = self._add(**columns)
-        return self.liststore.prepend(vals)
+        tree_iter = self.liststore.prepend(vals)
+        self._update_indices(tree_iter, {}, columns)
+        return tree_iter
+
+    def _update_indices(self, tree_iter: Gtk.TreeIter, previous: Mapping[str, object],
+                        columns: Mapping[str, object]) -> None:
+        path = None
+        for key, index in self._indices.items():
+            if key not in previous and key not in columns:
+                continue
+
+            if path is None:
+                path = self.liststore.get_path(tree_iter)
+
+            if previous.get(key) is not None:
+                rows = [row for row in index.get(previous[key], []) if row.valid() and row.get_path() != path]
+                if rows:
+                    index[previous[key]] = rows
+                else:
+                    index.pop(previous[key], None)
+
+            if columns.get(key) is not None:
+                index.setdefault(columns[key], []).append(Gtk.TreeRowReference.new(self.liststore, path))
+
+    def get_indexed(self, key: str, value: object) -> List[Gtk.TreeIter]:
+        """Rows where the indexed column key has value, in no particular order"""
+        index = self._indices[key]
+        rows = index.get(value, [])
+        valid = [row for row in rows if row.valid()]
+        if len(valid) != len(rows):
+            if valid:
+                index[value] = valid
+            else:
+                del index[value]
+
+        tree_iters = []
+        for row in valid:
+            path = row.get_path()
+            assert path is not None
+            tree_iter = self.get_iter(path)
+            assert tree_iter is not None
+            tree_iters.append(tree_iter)
+        return tree_iters
 
     def get_conditional(self, **cols: object) -> List[int]:
+        key = next((k for k in cols if k in self._indices), None)
+        if key is not None:
+            ret = []
+            for tree_iter in self.get_indexed(key, cols[key]):
+                row = self.get(tree_iter, *cols)
+                if all(row[k] == v for k, v in cols.items()):
+                    ret.append(self.liststore.get_path(tree_iter).get_indices()[0])
+            return sorted(ret)
+
         ret = []
         matches = 0
         for i in range(len(self.liststore)):
-            row = self.get(i)
+            row = self.get(i, *cols)
             for k, v in cols.items():
                 if row[k] == v:
                     matches += 1
@@ -120,30 +180,27 @@ class GenericList(Gtk.TreeView):
         else:
             tree_iter = self.get_iter(iterid)
 
-        if tree_iter is not None:
-            for k, v in cols.items():
-                self.liststore.set(tree_iter, self.ids[k], v)
+        if tree_iter is not None and cols:
+            indexed = [k for k in cols if k in self._indices]
+            previous = self.get(tree_iter, *indexed) if indexed else {}
+            # One model call for all columns so the row only changes once
+            self.liststore.set(tree_iter, [self.ids[k] for k in cols], list(cols.values()))
+            if indexed:
+                self._update_indices(tree_iter, previous, cols)
 
     def get(self, iterid: Union[Gtk.TreeIter, Gtk.TreePath, int, str], *items: str) -> Dict[str, Any]:
-        ret = {}
+        if iterid is None:
+            return {}
 
-        if iterid is not None:
-            if isinstance(iterid, Gtk.TreeIter):
-                tree_iter: Optional[Gtk.TreeIter] = iterid
-            else:
-                tree_iter = self.get_iter(iterid)
-            assert tree_iter is not None
-            if len(items) == 0:
-                for k, v in self.ids.items():
-                    ret[k] = self.liststore.get(tree_iter, v)[0]
-            else:
-                for i in range(len(items)):
-                    if items[i] in self.ids:
-                        ret[items[i]] = self.liststore.get(tree_iter, self.ids[items[i]])[0]
+        if isinstance(iterid, Gtk.TreeIter):
+            tree_iter: Optional[Gtk.TreeIter] = iterid
         else:
-            return {}
+            tree_iter = self.get_iter(iterid)
+        assert tree_iter is not None
 
-        return ret
+        # Fetch all requested columns in one model call
+        keys = [k for k in items if k in self.ids] if items else list(self.ids)
+        return dict(zip(keys, self.liststore.get(tree_iter, *(self.ids[k] for k in keys))))
 
     def get_iter(self, path: Optional[Union[Gtk.TreePath, int, str]]) -> Optional[Gtk.TreeIter]:
         if path is None:
@@ -156,6 +213,8 @@ class GenericList(Gtk.TreeView):
 
     def clear(self) -> None:
         self.liststore.clear()
+        for index in self._indices.values():
+            index.clear()
 
     def compare(self, iter_a: Optional[Gtk.TreeIter], iter_b: Optional[Gtk.TreeIter]) -> bool:
         if iter_a is not None and iter_b is not None:
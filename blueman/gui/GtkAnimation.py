@@ -96,15 +96,18 @@ class AnimBase(GObject.GObject):
 
 
 class TreeRowFade(AnimBase):
-    def __init__(self, tw: Gtk.TreeView, path: Gtk.TreePath, columns: Optional[Collection[Gtk.TreeViewColumn]] = None
-                 ) -> None:
+    def __init__(self, tw: Gtk.TreeView, path: Gtk.TreePath, columns: Optional[Collection[Gtk.TreeViewColumn]] = None,
+                 model: Optional[Gtk.TreeModel] = None) -> None:
         super().__init__(1.0)
         self.tw = tw
 
         self.sig: Optional[int] = self.tw.connect_after("draw", self.on_draw)
 
-        assert tw.props.model is not None
-        self.row = Gtk.TreeRowReference.new(tw.props.model, path)
+        # The model can be given while it is detached from the view
+        if model is None:
+            model = tw.props.model
+        assert model is not None
+        self.row = Gtk.TreeRowReference.new(model, path)
         self.stylecontext = tw.get_style_context()
         self.columns = columns
 
@@ -154,14 +157,17 @@ class TreeRowFade(AnimBase):
 
 
 class CellFade(AnimBase):
-    def __init__(self, tw: Gtk.TreeView, path: Gtk.TreePath, columns: Iterable[int]) -> None:
+    def __init__(self, tw: Gtk.TreeView, path: Gtk.TreePath, columns: Iterable[int],
+                 model: Optional[Gtk.TreeModel] = None) -> None:
         super().__init__(1.0)
         self.tw = tw
 
         self.frozen = False
         self.sig: Optional[int] = tw.connect_after("draw", self.on_draw)
-        assert tw.props.model is not None
-        self.row = Gtk.TreeRowReference.new(tw.props.model, path)
+        if model is None:
+            model = tw.props.model
+        assert model is not None
+        self.row = Gtk.TreeRowReference.new(model, path)
         self.selection = tw.get_selection()
         self.columns: List[Optional[Gtk.TreeViewColumn]] = []
         for i in columns:
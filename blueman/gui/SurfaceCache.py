@@ -0,0 +1,47 @@
+from typing import Callable, Dict, Generic, Hashable, Iterable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class SurfaceCache(Generic[K, V]):
+    """Keeps rendered surfaces so drawing a cell again is a dictionary lookup.
+
+    Surfaces are created by factory on the first lookup of a key. Owners clear the cache whenever
+    something the surfaces depend on but is not part of the key changes, e.g. the icon theme.
+    """
+
+    def __init__(self, factory: Callable[[K], V]) -> None:
+        self._factory = factory
+        self._surfaces: Dict[K, V] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._surfaces)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._surfaces
+
+    def get(self, key: K) -> V:
+        try:
+            surface = self._surfaces[key]
+        except KeyError:
+            self.misses += 1
+            surface = self._surfaces[key] = self._factory(key)
+        else:
+            self.hits += 1
+        return surface
+
+    def preload(self, keys: Iterable[K]) -> None:
+        """Render the surfaces of keys not cached yet, without counting misses"""
+        for key in keys:
+            if key not in self._surfaces:
+                self._surfaces[key] = self._factory(key)
+
+    def clear(self) -> None:
+        self._surfaces.clear()
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
@@ -135,7 +135,7 @@ class PluginDialog(Gtk.Window):
             # device caption
             {"id": "desc", "type": str, "renderer": Gtk.CellRendererText(), "render_attrs": {"markup": 3},
              "view_props": {"expand": True}},
-            {"id": "name", "type": str},
+            {"id": "name", "type": str, "indexed": True},
         ]
 
         self.list = GenericList(data, headers_visible=False, visible=True)
@@ -1,10 +1,11 @@
 from gettext import gettext as _
-from typing import Optional, TYPE_CHECKING, List, Any, cast, Callable, Set
+from typing import Optional, TYPE_CHECKING, List, Any, cast, Callable, Tuple, Dict
 import html
 import logging
 import cairo
 import os
 
+from _blueman import HCI_ACL_LINK, DisconnectionComplete
 from blueman.bluez.Battery import Battery
 from blueman.bluez.Device import Device
 from blueman.gui.DeviceList import DeviceList
@@ -15,20 +16,35 @@ from blueman.Constants import PIXMAP_PATH
 from blueman.Functions import launch
 from blueman.Sdp import ServiceUUID, OBEX_OBJPUSH_SVCLASS_ID, BATTERY_SERVICE_SVCLASS_ID
 from blueman.gui.GtkAnimation import TreeRowFade, CellFade, AnimBase
+from blueman.gui.SurfaceCache import SurfaceCache
 from blueman.main.Config import Config
-from _blueman import ConnInfoReadError, conn_info
+from blueman.main.ConnInfoSampler import ConnInfoSampler, ConnInfoSample
+from blueman.main.HciMonitor import HciMonitor
 
 import gi
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk
-from gi.repository import GLib
 from gi.repository import Gdk
 from gi.repository import GdkPixbuf
 from gi.repository import Pango
 
 if TYPE_CHECKING:
+    from _blueman import HciEvent
     from blueman.main.Manager import Blueman
 
+# icon name, paired, trusted, scale factor, size
+DeviceIconKey = Tuple[Optional[str], bool, bool, int, int]
+# bar (battery, rssi, lq or tpl), level, scale factor
+BarKey = Tuple[str, int, int]
+
+BARS = ("battery", "rssi", "lq", "tpl")
+BAR_LEVELS = range(10, 101, 10)
+
+
+def bar_level(percentage: float) -> int:
+    """Quantize a percentage to the level of the pixmap showing it"""
+    return min(max(int(round(percentage, -1)), BAR_LEVELS[0]), BAR_LEVELS[-1])
+
 
 class ManagerDeviceList(DeviceList):
     def __init__(self, adapter: Optional[str] = None, inst: Optional["Blueman"] = None) -> None:
@@ -41,16 +57,16 @@ class ManagerDeviceList(DeviceList):
             # device caption
             {"id": "caption", "type": str, "renderer": cr,
              "render_attrs": {"markup": 1}, "view_props": {"expand": True}},
-            {"id": "battery_pb", "type": GdkPixbuf.Pixbuf, "renderer": Gtk.CellRendererPixbuf(),
+            {"id": "battery_level", "type": int, "renderer": Gtk.CellRendererPixbuf(),
              "render_attrs": {}, "view_props": {"spacing": 0},
              "celldata_func": (self._set_cell_data, "battery")},
-            {"id": "rssi_pb", "type": GdkPixbuf.Pixbuf, "renderer": Gtk.CellRendererPixbuf(),
+            {"id": "rssi_level", "type": int, "renderer": Gtk.CellRendererPixbuf(),
              "render_attrs": {}, "view_props": {"spacing": 0},
              "celldata_func": (self._set_cell_data, "rssi")},
-            {"id": "lq_pb", "type": GdkPixbuf.Pixbuf, "renderer": Gtk.CellRendererPixbuf(),
+            {"id": "lq_level", "type": int, "renderer": Gtk.CellRendererPixbuf(),
              "render_attrs": {}, "view_props": {"spacing": 0},
              "celldata_func": (self._set_cell_data, "lq")},
-            {"id": "tpl_pb", "type": GdkPixbuf.Pixbuf, "renderer": Gtk.CellRendererPixbuf(),
+            {"id": "tpl_level", "type": int, "renderer": Gtk.CellRendererPixbuf(),
              "render_attrs": {}, "view_props": {"spacing": 0},
              "celldata_func": (self._set_cell_data, "tpl")},
             {"id": "alias", "type": str},  # used for quick access instead of device.GetProperties
@@ -62,18 +78,29 @@ class ManagerDeviceList(DeviceList):
             {"id": "rssi", "type": float},
             {"id": "lq", "type": float},
             {"id": "tpl", "type": float},
-            {"id": "icon_info", "type": Gtk.IconInfo},
+            {"id": "icon_name", "type": str},
             {"id": "cell_fader", "type": CellFade},
             {"id": "row_fader", "type": TreeRowFade},
             {"id": "initial_anim", "type": bool},
         ]
+        self.device_icons: SurfaceCache[DeviceIconKey, cairo.Surface] = SurfaceCache(self._render_device_icon)
+        self.bar_surfaces: SurfaceCache[BarKey, cairo.Surface] = SurfaceCache(self._render_bar)
+
         super().__init__(adapter, tabledata)
         self.set_name("ManagerDeviceList")
         self.set_headers_visible(False)
         self.props.has_tooltip = True
         self.Blueman = inst
 
-        self._monitored_devices: Set[str] = set()
+        # address -> row of the connected devices the sampler reads
+        self._monitored_devices: Dict[str, Gtk.TreeRowReference] = {}
+        self._sampler: Optional[ConnInfoSampler] = None
+        self._sampler_handler = 0
+        self._hci_monitor: Optional[HciMonitor] = None
+        self._hci_monitor_handler = 0
+        self._hidden = True
+        self.connect("map", self._on_visibility_changed, False)
+        self.connect("unmap", self._on_visibility_changed, True)
 
         self.Config = Config("org.blueman.general")
         self.Config.connect('changed', self._on_settings_changed)
@@ -115,6 +142,7 @@ class ManagerDeviceList(DeviceList):
                 self.liststore.set_sort_column_id(column_id, sort_type)
 
     def on_icon_theme_changed(self, _icon_them: Gtk.IconTheme) -> None:
+        self.device_icons.clear()
         for row in self.liststore:
             device = self.get(row.iter, "device")["device"]
             self.row_setup_event(row.iter, device)
@@ -213,10 +241,10 @@ class ManagerDeviceList(DeviceList):
 
         return False
 
-    def get_icon_info(self, icon_name: str, size: int = 48, fallback: bool = True) -> Optional[Gtk.IconInfo]:
-        if icon_name is None and not fallback:
-            return None
-        elif icon_name is None and fallback:
+    def get_icon_info(self, icon_name: Optional[str], size: int = 48, fallback: bool = True) -> Optional[Gtk.IconInfo]:
+        if icon_name is None:
+            if not fallback:
+                return None
             icon_name = "image-missing"
 
         icon_info = self.icon_theme.lookup_icon_for_scale(icon_name, size, self.get_scale_factor(),
@@ -224,6 +252,16 @@ class ManagerDeviceList(DeviceList):
 
         return icon_info
 
+    def get_device_icon(self, icon_name: Optional[str], is_paired: bool = False, is_trusted: bool = False,
+                        size: int = 48) -> cairo.Surface:
+        return self.device_icons.get((icon_name, is_paired, is_trusted, self.get_scale_factor(), size))
+
+    def _render_device_icon(self, key: DeviceIconKey) -> cairo.Surface:
+        icon_name, is_paired, is_trusted, _scale, size = key
+        icon_info = self.get_icon_info(icon_name, size)
+        assert icon_info is not None
+        return self.make_device_icon(icon_info, is_paired, is_trusted)
+
     def make_device_icon(self, icon_info: Gtk.IconInfo, is_paired: bool = False, is_trusted: bool = False
                          ) -> cairo.Surface:
         window = self.get_window()
@@ -280,10 +318,10 @@ class ManagerDeviceList(DeviceList):
 
     def row_setup_event(self, tree_iter: Gtk.TreeIter, device: Device) -> None:
         if not self.get(tree_iter, "initial_anim")["initial_anim"]:
-            model = self.props.model
-            assert model is not None
-            cell_fader = CellFade(self, model.get_path(tree_iter), [2, 3, 4, 5])
-            row_fader = TreeRowFade(self, model.get_path(tree_iter))
+            # The list store, the model is detached from the view while populating
+            path = self.liststore.get_path(tree_iter)
+            cell_fader = CellFade(self, path, [2, 3, 4, 5], self.liststore)
+            row_fader = TreeRowFade(self, path, model=self.liststore)
 
             has_objpush = self._has_objpush(device)
 
@@ -291,7 +329,11 @@ class ManagerDeviceList(DeviceList):
 
             cell_fader.freeze()
 
-            self._prepare_fader(row_fader).animate(start=0.0, end=1.0, duration=500)
+            if self.populating:
+                # Known devices show up at once instead of fading in one by one
+                row_fader.freeze()
+            else:
+                self._prepare_fader(row_fader).animate(start=0.0, end=1.0, duration=500)
 
             self.set(tree_iter, initial_anim=True)
 
@@ -305,10 +347,9 @@ class ManagerDeviceList(DeviceList):
         else:
             description = get_major_class(device['Class'])
 
-        icon_info = self.get_icon_info(device["Icon"], 48, False)
         caption = self.make_caption(device['Alias'], description, device['Address'])
 
-        self.set(tree_iter, caption=caption, icon_info=icon_info, alias=device['Alias'])
+        self.set(tree_iter, caption=caption, icon_name=device["Icon"], alias=device['Alias'])
 
         try:
             self.row_update_event(tree_iter, "Trusted", device['Trusted'])
@@ -327,43 +368,79 @@ class ManagerDeviceList(DeviceList):
             self._monitor_power_levels(tree_iter, device)
 
     def _monitor_power_levels(self, tree_iter: Gtk.TreeIter, device: Device) -> None:
-        if device["Address"] in self._monitored_devices:
+        address = device["Address"]
+        if address in self._monitored_devices:
             return
 
         assert self.Adapter is not None
-        cinfo = conn_info(device["Address"], os.path.basename(self.Adapter.get_object_path()))
-        try:
-            cinfo.init()
-        except ConnInfoReadError:
-            logging.warning("Failed to get power levels, probably a LE device.")
-
-        model = self.get_model()
-        assert isinstance(model, Gtk.TreeModel)
-        r = Gtk.TreeRowReference.new(model, model.get_path(tree_iter))
-        self._update_power_levels(tree_iter, device, cinfo)
-        GLib.timeout_add(1000, self._check_power_levels, r, cinfo, device["Address"])
-        self._monitored_devices.add(device["Address"])
-
-    def _check_power_levels(self, row_ref: Gtk.TreeRowReference, cinfo: conn_info, address: str) -> bool:
-        if not row_ref.valid():
-            logging.warning("stopping monitor (row does not exist)")
-            cinfo.deinit()
-            self._monitored_devices.remove(address)
-            return False
+        adapter_name = os.path.basename(self.Adapter.get_object_path())
+        if self._sampler is None or self._sampler.adapter_name != adapter_name:
+            self._stop_sampler()
+            self._sampler = ConnInfoSampler.get_instance(adapter_name)
+            self._sampler_handler = self._sampler.connect_signal("samples", self._on_conn_info_samples)
+            self._sampler.set_hidden(self._hidden)
+            self._hci_monitor = HciMonitor.get_instance(adapter_name)
+            self._hci_monitor_handler = self._hci_monitor.connect_signal("event", self._on_hci_event)
+
+        self._monitored_devices[address] = Gtk.TreeRowReference.new(self.liststore,
+                                                                    self.liststore.get_path(tree_iter))
+        self._sampler.add(address)
+
+    def _stop_monitoring(self, address: str) -> None:
+        self._monitored_devices.pop(address, None)
+        if self._sampler is not None:
+            self._sampler.remove(address)
+
+    def _stop_sampler(self) -> None:
+        if self._sampler is not None:
+            self._sampler.disconnect_signal(self._sampler_handler)
+            self._sampler.stop()
+            self._sampler = None
+        if self._hci_monitor is not None:
+            self._hci_monitor.disconnect_signal(self._hci_monitor_handler)
+            self._hci_monitor = None
+        self._monitored_devices = {}
+
+    def _on_visibility_changed(self, _widget: Gtk.Widget, hidden: bool) -> None:
+        self._hidden = hidden
+        if self._sampler is not None:
+            self._sampler.set_hidden(hidden)
+
+    def _on_hci_event(self, _monitor: HciMonitor, event: "HciEvent") -> None:
+        # Stop reading a link as soon as it is gone instead of when BlueZ gets to it
+        if not isinstance(event, DisconnectionComplete) or event.link_type != HCI_ACL_LINK:
+            return
 
-        tree_iter = self.get_iter(row_ref.get_path())
-        assert tree_iter is not None
+        assert event.address is not None
+        row_ref = self._monitored_devices.get(event.address)
+        if row_ref is not None and row_ref.valid():
+            tree_iter = self.get_iter(row_ref.get_path())
+            assert tree_iter is not None
+            self._disable_power_levels(tree_iter)
+        self._stop_monitoring(event.address)
 
-        device = self.get(tree_iter, "device")["device"]
+    def _on_conn_info_samples(self, _sampler: ConnInfoSampler, samples: Dict[str, ConnInfoSample]) -> None:
+        for address, sample in samples.items():
+            row_ref = self._monitored_devices.get(address)
+            if row_ref is None or not row_ref.valid():
+                logging.info(f"stopping monitor of {address} (row does not exist)")
+                self._stop_monitoring(address)
+                continue
 
-        if device["Connected"]:
-            self._update_power_levels(tree_iter, device, cinfo)
-            return True
-        else:
-            cinfo.deinit()
-            self._disable_power_levels(tree_iter)
-            self._monitored_devices.remove(address)
-            return False
+            tree_iter = self.get_iter(row_ref.get_path())
+            assert tree_iter is not None
+
+            device = self.get(tree_iter, "device")["device"]
+
+            if device["Connected"]:
+                self._update_power_levels(tree_iter, device, sample)
+            else:
+                self._disable_power_levels(tree_iter)
+                self._stop_monitoring(address)
+
+    def destroy(self) -> None:
+        self._stop_sampler()
+        super().destroy()
 
     def row_update_event(self, tree_iter: Gtk.TreeIter, key: str, value: Any) -> None:
         logging.info(f"{key} {value}")
@@ -390,16 +467,22 @@ class ManagerDeviceList(DeviceList):
             has_objpush = self._has_objpush(device)
             self.set(tree_iter, objpush=has_objpush)
 
+        elif key == "Icon":
+            self.set(tree_iter, icon_name=value)
+
         elif key == "Connected":
             self.set(tree_iter, connected=value)
 
+            device = self.get(tree_iter, "device")["device"]
             if value:
-                self._monitor_power_levels(tree_iter, self.get(tree_iter, "device")["device"])
+                self._monitor_power_levels(tree_iter, device)
             else:
                 self._disable_power_levels(tree_iter)
+                self._stop_monitoring(device["Address"])
 
-    def _update_power_levels(self, tree_iter: Gtk.TreeIter, device: Device, cinfo: conn_info) -> None:
-        row = self.get(tree_iter, "cell_fader", "battery", "rssi", "lq", "tpl")
+    def _update_power_levels(self, tree_iter: Gtk.TreeIter, device: Device, sample: ConnInfoSample) -> None:
+        row = self.get(tree_iter, "cell_fader", "battery", "rssi", "lq", "tpl",
+                       "battery_level", "rssi_level", "lq_level", "tpl_level")
 
         bars = {}
 
@@ -409,34 +492,21 @@ class ManagerDeviceList(DeviceList):
 
         # cinfo init may fail for bluetooth devices version 4 and up
         # FIXME Workaround is horrible and we should show something better
-        if cinfo.failed:
+        if sample.failed:
             if not bars:
                 bars = {"rssi": 100.0, "tpl": 100.0, "lq": 100.0}
         else:
-            try:
-                bars["rssi"] = max(50 + float(cinfo.get_rssi()) / 127 * 50, 10)
-            except ConnInfoReadError:
-                bars["rssi"] = 50
-            try:
-                bars["lq"] = max(50 + float(cinfo.get_lq()) / 127 * 50, 10)
-            except ConnInfoReadError:
-                bars["lq"] = 50
-            try:
-                bars["tpl"] = max(float(cinfo.get_tpl()) / 255 * 100, 10)
-            except ConnInfoReadError:
-                bars["tpl"] = 0
+            bars["rssi"] = 50 if sample.rssi is None else max(50 + float(sample.rssi) / 127 * 50, 10)
+            bars["lq"] = 50 if sample.lq is None else max(50 + float(sample.lq) / 127 * 50, 10)
+            bars["tpl"] = 0 if sample.tpl is None else max(float(sample.tpl) / 255 * 100, 10)
 
         if row["battery"] == row["rssi"] == row["tpl"] == row["lq"] == 0:
             self._prepare_fader(row["cell_fader"]).animate(start=0.0, end=1.0, duration=400)
 
-        w = 14 * self.get_scale_factor()
-        h = 48 * self.get_scale_factor()
-
         for (name, perc) in bars.items():
-            if round(row[name], -1) != round(perc, -1):
-                icon_name = f"blueman-{name}-{int(round(perc, -1))}.png"
-                icon = GdkPixbuf.Pixbuf.new_from_file_at_scale(os.path.join(PIXMAP_PATH, icon_name), w, h, True)
-                self.set(tree_iter, **{name: perc, f"{name}_pb": icon})
+            level = bar_level(perc)
+            if row[f"{name}_level"] != level:
+                self.set(tree_iter, **{name: perc, f"{name}_level": level})
 
     def _disable_power_levels(self, tree_iter: Gtk.TreeIter) -> None:
         row = self.get(tree_iter, "cell_fader", "battery", "rssi", "lq", "tpl")
@@ -444,9 +514,23 @@ class ManagerDeviceList(DeviceList):
             return
 
         self.set(tree_iter, rssi=0, lq=0, tpl=0)
-        self._prepare_fader(row["cell_fader"], lambda: self.set(tree_iter, rssi_pb=None, lq_pb=None, tpl_pb=None))\
+        self._prepare_fader(row["cell_fader"], lambda: self.set(tree_iter, rssi_level=0, lq_level=0, tpl_level=0))\
             .animate(start=1.0, end=0.0, duration=400)
 
+    def _render_bar(self, key: BarKey) -> cairo.Surface:
+        name, level, scale = key
+        pixbuf = GdkPixbuf.Pixbuf.new_from_file_at_scale(os.path.join(PIXMAP_PATH, f"blueman-{name}-{level}.png"),
+                                                         14 * scale, 48 * scale, True)
+        return Gdk.cairo_surface_create_from_pixbuf(pixbuf, scale, self.get_window())
+
+    def get_bar_surface(self, name: str, level: int) -> cairo.Surface:
+        scale = self.get_scale_factor()
+        key = (name, level, scale)
+        if key not in self.bar_surfaces:
+            # Decode every level at once so changing levels never touches the disk again
+            self.bar_surfaces.preload((bar, pixmap_level, scale) for bar in BARS for pixmap_level in BAR_LEVELS)
+        return self.bar_surfaces.get(key)
+
     def _prepare_fader(self, fader: AnimBase, callback: Optional[Callable[[], None]] = None) -> AnimBase:
         def on_finished(finished_fader: AnimBase) -> None:
             finished_fader.disconnect(handler)
@@ -488,10 +572,10 @@ class ManagerDeviceList(DeviceList):
             self.tooltip_col = path[1]
             return True
 
-        elif path[1] == self.columns["battery_pb"] \
-                or path[1] == self.columns["tpl_pb"] \
-                or path[1] == self.columns["lq_pb"] \
-                or path[1] == self.columns["rssi_pb"]:
+        elif path[1] == self.columns["battery_level"] \
+                or path[1] == self.columns["tpl_level"] \
+                or path[1] == self.columns["lq_level"] \
+                or path[1] == self.columns["rssi_level"]:
             tree_iter = self.get_iter(path[0])
             assert tree_iter is not None
 
@@ -507,7 +591,7 @@ class ManagerDeviceList(DeviceList):
             tpl = self.get(tree_iter, "tpl")["tpl"]
 
             if battery != 0:
-                if path[1] == self.columns["battery_pb"]:
+                if path[1] == self.columns["battery_level"]:
                     lines.append(f"<b>Battery: {int(battery)}%</b>")
                 else:
                     lines.append(f"Battery: {int(battery)}%")
@@ -524,7 +608,7 @@ class ManagerDeviceList(DeviceList):
                 else:
                     rssi_state = _("Too much")
 
-                if path[1] == self.columns["rssi_pb"]:
+                if path[1] == self.columns["rssi_level"]:
                     lines.append(_("<b>Received Signal Strength: %(rssi)u%%</b> <i>(%(rssi_state)s)</i>") %
                                  {"rssi": rssi, "rssi_state": rssi_state})
                 else:
@@ -532,7 +616,7 @@ class ManagerDeviceList(DeviceList):
                                  {"rssi": rssi, "rssi_state": rssi_state})
 
             if lq != 0:
-                if path[1] == self.columns["lq_pb"]:
+                if path[1] == self.columns["lq_level"]:
                     lines.append(_("<b>Link Quality: %(lq)u%%</b>") % {"lq": lq})
                 else:
                     lines.append(_("Link Quality: %(lq)u%%") % {"lq": lq})
@@ -549,7 +633,7 @@ class ManagerDeviceList(DeviceList):
                 else:
                     tpl_state = _("Very High")
 
-                if path[1] == self.columns["tpl_pb"]:
+                if path[1] == self.columns["tpl_level"]:
                     lines.append(_("<b>Transmit Power Level: %(tpl)u%%</b> <i>(%(tpl_state)s)</i>") %
                                  {"tpl": tpl, "tpl_state": tpl_state})
                 else:
@@ -574,16 +658,13 @@ class ManagerDeviceList(DeviceList):
     def _set_cell_data(self, _col: Gtk.TreeViewColumn, cell: Gtk.CellRenderer, _model: Gtk.TreeModel,
                        tree_iter: Gtk.TreeIter, data: Optional[str]) -> None:
         if data is None:
-            row = self.get(tree_iter, "icon_info", "trusted", "paired")
-            surface = self.make_device_icon(row["icon_info"], row["paired"], row["trusted"])
+            row = self.get(tree_iter, "icon_name", "paired", "trusted")
+            surface = self.get_device_icon(row["icon_name"], row["paired"], row["trusted"])
             cell.set_property("surface", surface)
         else:
-            window = self.get_window()
-            scale = self.get_scale_factor()
-            pb = self.get(tree_iter, data + "_pb")[data + "_pb"]
-            if pb:
-                surface = Gdk.cairo_surface_create_from_pixbuf(pb, scale, window)
-                cell.set_property("surface", surface)
+            level = self.get(tree_iter, f"{data}_level")[f"{data}_level"]
+            if level:
+                cell.set_property("surface", self.get_bar_surface(data, level))
             else:
                 cell.set_property("surface", None)
 
@@ -2,7 +2,7 @@ import errno
 import logging
 from enum import Enum, auto
 from gettext import gettext as _
-from typing import Dict, List, Tuple, Optional, TYPE_CHECKING, Union, Iterable, Callable
+from typing import Dict, List, Optional, TYPE_CHECKING, Union, Iterable, Callable
 
 from blueman.Functions import create_menuitem, e_
 from blueman.bluez.Network import AnyNetwork
@@ -64,15 +64,15 @@ class ManagerDeviceMenu(Gtk.Menu):
 
         self.is_popup = False
 
-        self._device_property_changed_signal = self.Blueman.List.connect("device-property-changed",
-                                                                         self.on_device_property_changed)
+        self._device_property_changed_signal = self.Blueman.List.connect("device-properties-changed",
+                                                                         self.on_device_properties_changed)
         ManagerDeviceMenu.__instances__.append(self)
 
-        self._any_network = AnyNetwork()
-        self._any_network.connect_signal('property-changed', self._on_service_property_changed)
+        self._any_network = AnyNetwork(properties=("Connected",))
+        self._any_network.connect_signal('properties-changed', self._on_service_properties_changed)
 
-        self._any_device = AnyDevice()
-        self._any_device.connect_signal('property-changed', self._on_service_property_changed)
+        self._any_device = AnyDevice(properties=("Connected",))
+        self._any_device.connect_signal('properties-changed', self._on_service_properties_changed)
 
         try:
             self._appl: Optional[AppletService] = AppletService()
@@ -118,9 +118,9 @@ class ManagerDeviceMenu(Gtk.Menu):
             if inst.SelectedDevice == self.SelectedDevice and not (inst.is_popup and not inst.props.visible):
                 inst.generate()
 
-    def _on_service_property_changed(self, _service: Union[AnyNetwork, AnyDevice], key: str, _value: object,
-                                     _path: str) -> None:
-        if key == "Connected":
+    def _on_service_properties_changed(self, _service: Union[AnyNetwork, AnyDevice], changed: Dict[str, object],
+                                       _path: str) -> None:
+        if "Connected" in changed:
             self.generate()
 
     GENERIC_CONNECT = "00000000-0000-0000-0000-000000000000"
@@ -187,12 +187,10 @@ class ManagerDeviceMenu(Gtk.Menu):
         self._appl.DisconnectService('(osd)', device.get_object_path(), uuid, port,
                                      result_handler=ok, error_handler=err, timeout=GLib.MAXINT)
 
-    def on_device_property_changed(self, lst: "ManagerDeviceList", _device: Device, tree_iter: Gtk.TreeIter,
-                                   key_value: Tuple[str, object]) -> None:
-        key, value = key_value
-        # print "menu:", key, value
+    def on_device_properties_changed(self, lst: "ManagerDeviceList", _device: Device, tree_iter: Gtk.TreeIter,
+                                     changed: Dict[str, object]) -> None:
         if lst.compare(tree_iter, lst.selected()):
-            if key in ("Connected", "UUIDs", "Trusted", "Paired"):
+            if any(key in changed for key in ("Connected", "UUIDs", "Trusted", "Paired")):
                 self.generate()
 
     def _handle_error_message(self, error: GLib.Error) -> None:
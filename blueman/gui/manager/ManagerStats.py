@@ -1,12 +1,13 @@
 from typing import TYPE_CHECKING, Optional
 
-from _blueman import device_info
-from gi.repository import GLib
+from gi.repository import Gdk
 from gi.repository import Gtk
 
 from blueman.gui.Animation import Animation
 from blueman.gui.manager.ManagerDeviceList import ManagerDeviceList
-from blueman.main.SpeedCalc import SpeedCalc
+from blueman.gui.manager.ThroughputPopover import ThroughputPopover
+from blueman.main.StatsPoller import StatsPoller, read_counters
+from blueman.main.ThroughputHistory import ThroughputHistory
 from blueman.Functions import adapter_path_to_name
 from blueman.Functions import format_bytes
 
@@ -28,11 +29,6 @@ class ManagerStats:
         assert blueman.List.Adapter is not None
         self.hci = adapter_path_to_name(blueman.List.Adapter.get_object_path())
 
-        self.time = None
-
-        self.up_speed = SpeedCalc()
-        self.down_speed = SpeedCalc()
-
         self.im_upload = Gtk.Image(icon_name="blueman-up-inactive", pixel_size=16,
                                    halign=Gtk.Align.END, valign=Gtk.Align.CENTER,
                                    tooltip_text=_("Data activity indication"))
@@ -64,13 +60,29 @@ class ManagerStats:
 
         hbox.pack_start(self.im_upload, False, False, 0)
         hbox.pack_start(self.im_download, False, False, 0)
+
+        self.history: Optional[ThroughputHistory] = None
+        self.history_popover = ThroughputPopover()
+        history_button = Gtk.MenuButton(relief=Gtk.ReliefStyle.NONE, tooltip_text=_("Throughput history"))
+        history_button.set_popover(self.history_popover)
+        history_button.add(Gtk.Image(icon_name="utilities-system-monitor", pixel_size=16))
+        hbox.pack_start(history_button, False, False, 0)
         hbox.show_all()
-        self.on_adapter_changed(blueman.List, blueman.List.get_adapter_path())
 
         self.up_blinker = Animation(self.im_upload, ["blueman-up-inactive", "blueman-up-active"])
         self.down_blinker = Animation(self.im_download, ["blueman-down-inactive", "blueman-down-active"])
 
-        self.start_update()
+        self.poller = StatsPoller(read_counters)
+        self.poller.connect_signal("update", self._on_update)
+
+        # Nobody sees the statistics while the statusbar is hidden or the window is unmapped or minimized
+        hbox.connect("map", lambda _widget: self.poller.set_suspended("hidden", False))
+        hbox.connect("unmap", lambda _widget: self.poller.set_suspended("hidden", True))
+        assert blueman.window is not None
+        blueman.window.connect("window-state-event", self._on_window_state_event)
+        self.poller.set_suspended("hidden", not hbox.get_mapped())
+
+        self.on_adapter_changed(blueman.List, blueman.List.get_adapter_path())
 
     def on_adapter_changed(self, _lst: ManagerDeviceList, adapter_path: Optional[str]) -> None:
         self.hci = adapter_path_to_name(adapter_path)
@@ -79,8 +91,14 @@ class ManagerStats:
         else:
             self.hbox.props.sensitive = True
 
-        self.up_speed.reset()
-        self.down_speed.reset()
+        self.history = None if self.hci is None else ThroughputHistory.get_instance(self.hci)
+        self.history_popover.set_history(self.history)
+        self.poller.set_adapter(self.hci)
+
+    def _on_window_state_event(self, _window: Gtk.Window, event: Gdk.EventWindowState) -> bool:
+        if event.changed_mask & Gdk.WindowState.ICONIFIED:
+            self.poller.set_suspended("minimized", bool(event.new_window_state & Gdk.WindowState.ICONIFIED))
+        return False
 
     def set_blinker_by_speed(self, blinker: Animation, speed: float) -> None:
 
@@ -102,35 +120,28 @@ class ManagerStats:
         else:
             blinker.set_rate(1)
 
-    def _update(self) -> bool:
-        if self.hci is not None:
-            devinfo = device_info(self.hci)
-            _tx = devinfo["stat"]["byte_tx"]
-            _rx = devinfo["stat"]["byte_rx"]
-
-            tx, s_tx = format_bytes(_tx)
-            rx, s_rx = format_bytes(_rx)
-
-            _u_speed = self.up_speed.calc(_tx)
-            _d_speed = self.down_speed.calc(_rx)
+    def _on_update(self, _poller: StatsPoller, _tx: int, _rx: int, _u_speed: float, _d_speed: float) -> None:
+        if self.history is not None:
+            self.history.add(_tx, _rx)
+            self.history_popover.refresh()
 
-            self.set_blinker_by_speed(self.up_blinker, _u_speed)
-            self.set_blinker_by_speed(self.down_blinker, _d_speed)
+        tx, s_tx = format_bytes(_tx)
+        rx, s_rx = format_bytes(_rx)
 
-            u_speed, s_u_speed = format_bytes(_u_speed)
-            d_speed, s_d_speed = format_bytes(_d_speed)
+        # A suspended poller reports no rate, which stops the blinkers as well
+        self.set_blinker_by_speed(self.up_blinker, _u_speed)
+        self.set_blinker_by_speed(self.down_blinker, _d_speed)
 
-            self.set_data(tx, s_tx, rx, s_rx, u_speed, s_u_speed, d_speed, s_d_speed)
+        u_speed, s_u_speed = format_bytes(_u_speed)
+        d_speed, s_d_speed = format_bytes(_d_speed)
 
-        return True
+        self.set_data(tx, s_tx, rx, s_rx, u_speed, s_u_speed, d_speed, s_d_speed)
 
     def start_update(self) -> None:
-        self._update()
-        self.timer = GLib.timeout_add(1000, self._update)
+        self.poller.set_adapter(self.hci)
 
     def stop_update(self) -> None:
-        if self.timer:
-            GLib.source_remove(self.timer)
+        self.poller.stop()
 
     def set_data(self, uploaded: float, u_name: str, downloaded: float, d_name: str, u_speed: float, us_name: str,
                  d_speed: float, ds_name: str) -> None:
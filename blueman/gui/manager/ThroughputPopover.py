@@ -0,0 +1,109 @@
+from gettext import gettext as _
+from typing import List, Optional
+
+import cairo
+
+from blueman.Functions import format_bytes
+from blueman.main.ThroughputHistory import ThroughputHistory
+
+import gi
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+
+
+class ThroughputPopover(Gtk.Popover):
+    """Sparklines of the bytes per second an adapter sent and received recently"""
+
+    RESOLUTIONS = ((1, _("Seconds")), (60, _("Minutes")), (3600, _("Hours")))
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.history: Optional[ThroughputHistory] = None
+        self.resolution = 1
+        self._tx: List[float] = []
+        self._rx: List[float] = []
+
+        box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=6, margin=6)
+        self.add(box)
+
+        buttons = Gtk.Box(halign=Gtk.Align.CENTER)
+        buttons.get_style_context().add_class("linked")
+        box.pack_start(buttons, False, False, 0)
+
+        group: Optional[Gtk.RadioButton] = None
+        for resolution, label in self.RESOLUTIONS:
+            button = Gtk.RadioButton(label=label)
+            button.join_group(group)
+            button.set_mode(False)
+            button.connect("toggled", self._on_resolution_toggled, resolution)
+            buttons.pack_start(button, False, False, 0)
+            group = button
+
+        self.area = Gtk.DrawingArea(width_request=300, height_request=80)
+        self.area.connect("draw", self._on_draw)
+        box.pack_start(self.area, True, True, 0)
+
+        self.peak = Gtk.Label(halign=Gtk.Align.START)
+        box.pack_start(self.peak, False, False, 0)
+
+        box.show_all()
+        self.connect("show", lambda _popover: self.refresh())
+
+    def set_history(self, history: Optional[ThroughputHistory]) -> None:
+        self.history = history
+        self.refresh()
+
+    def refresh(self) -> None:
+        if not self.get_visible():
+            return
+
+        if self.history is None:
+            self._tx, self._rx = [], []
+            self.peak.set_text(_("No adapter"))
+        else:
+            self._tx, self._rx = self.history.get_series(self.resolution)
+            up, up_unit = format_bytes(max(self._tx))
+            down, down_unit = format_bytes(max(self._rx))
+            self.peak.set_markup(
+                f'<span size="small">{_("Peak")}: ↑ {up:.2f} {up_unit}/s ↓ {down:.2f} {down_unit}/s</span>')
+        self.area.queue_draw()
+
+    def _on_resolution_toggled(self, button: Gtk.RadioButton, resolution: int) -> None:
+        if button.get_active():
+            self.resolution = resolution
+            self.refresh()
+
+    def _on_draw(self, area: Gtk.DrawingArea, cr: cairo.Context) -> bool:
+        if not self._tx:
+            return False
+
+        tx, rx = self._tx, self._rx
+        width = area.get_allocated_width()
+        height = area.get_allocated_height()
+        peak = max(max(tx), max(rx), 1.0)
+
+        color = area.get_style_context().get_color(area.get_state_flags())
+
+        # Received data as area, sent data as line above it
+        cr.set_source_rgba(color.red, color.green, color.blue, 0.3)
+        self._trace(cr, rx, width, height, peak)
+        cr.line_to(width, height)
+        cr.line_to(0, height)
+        cr.close_path()
+        cr.fill()
+
+        cr.set_source_rgba(color.red, color.green, color.blue, 0.9)
+        cr.set_line_width(1.0)
+        self._trace(cr, tx, width, height, peak)
+        cr.stroke()
+        return False
+
+    @staticmethod
+    def _trace(cr: cairo.Context, values: List[float], width: int, height: int, peak: float) -> None:
+        step = width / max(len(values) - 1, 1)
+        for i, value in enumerate(values):
+            y = height - value / peak * (height - 1)
+            if i == 0:
+                cr.move_to(0, y)
+            else:
+                cr.line_to(i * step, y)
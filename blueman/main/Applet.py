@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Dict
 
 from blueman.Functions import *
 from blueman.bluez.Manager import Manager
@@ -40,10 +40,10 @@ class BluemanApplet(Gio.Application):
         self.Manager.watch_name_owner(self._on_dbus_name_appeared, self._on_dbus_name_vanished)
 
         self._any_adapter = AnyAdapter()
-        self._any_adapter.connect_signal('property-changed', self._on_adapter_property_changed)
+        self._any_adapter.connect_signal('properties-changed', self._on_adapter_properties_changed)
 
         self._any_device = AnyDevice()
-        self._any_device.connect_signal('property-changed', self._on_device_property_changed)
+        self._any_device.connect_signal('properties-changed', self._on_device_properties_changed)
 
     def do_activate(self) -> None:
         if not self._active:
@@ -64,13 +64,15 @@ class BluemanApplet(Gio.Application):
         for plugin in self.Plugins.get_loaded_plugins(AppletPlugin):
             plugin.on_manager_state_changed(self.manager_state)
 
-    def _on_adapter_property_changed(self, _adapter: AnyAdapter, key: str, value: Any, path: str) -> None:
-        for plugin in self.Plugins.get_loaded_plugins(AppletPlugin):
-            plugin.on_adapter_property_changed(path, key, value)
+    def _on_adapter_properties_changed(self, _adapter: AnyAdapter, changed: Dict[str, Any], path: str) -> None:
+        for key, value in changed.items():
+            for plugin in self.Plugins.get_loaded_plugins(AppletPlugin):
+                plugin.on_adapter_property_changed(path, key, value)
 
-    def _on_device_property_changed(self, _device: AnyDevice, key: str, value: Any, path: str) -> None:
-        for plugin in self.Plugins.get_loaded_plugins(AppletPlugin):
-            plugin.on_device_property_changed(path, key, value)
+    def _on_device_properties_changed(self, _device: AnyDevice, changed: Dict[str, Any], path: str) -> None:
+        for key, value in changed.items():
+            for plugin in self.Plugins.get_loaded_plugins(AppletPlugin):
+                plugin.on_device_property_changed(path, key, value)
 
     def on_adapter_added(self, _manager: Manager, path: str) -> None:
         logging.info(f"Adapter added {path}")
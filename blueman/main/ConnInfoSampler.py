@@ -0,0 +1,162 @@
+import logging
+import threading
+from functools import partial
+from typing import Dict, NamedTuple, Optional, Set
+
+from gi.repository import GLib, GObject
+
+from _blueman import ConnInfoReadError, conn_info_reader
+from blueman.bluemantyping import GSignals
+
+
+class ConnInfoSample(NamedTuple):
+    # True if no connection info could be read at all, probably a LE device
+    failed: bool
+    rssi: Optional[int] = None
+    lq: Optional[int] = None
+    tpl: Optional[int] = None
+
+
+INTERVAL = 1.0
+MAX_INTERVAL = 8.0
+HIDDEN_INTERVAL = 30.0
+# Rounds without any change after which the interval doubles
+STABLE_ROUNDS = 5
+
+
+def backoff_interval(stable_rounds: int, hidden: bool) -> float:
+    if hidden:
+        return HIDDEN_INTERVAL
+    doublings = min(stable_rounds // STABLE_ROUNDS, 8)
+    return min(INTERVAL * (1 << doublings), MAX_INTERVAL)
+
+
+class ConnInfoSampler(GObject.GObject):
+    """Reads RSSI, link quality and transmit power level of the connected devices of an adapter.
+
+    All devices are read in one pass over one HCI socket on a worker thread and the results of a
+    pass are emitted at once from the main loop. The interval grows while nothing changes and
+    while nobody looks at the values.
+    """
+
+    __gsignals__: GSignals = {
+        # @param: {address: ConnInfoSample} of all monitored devices
+        'samples': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+    }
+
+    connect_signal = GObject.GObject.connect
+    disconnect_signal = GObject.GObject.disconnect
+
+    __instances: Dict[str, "ConnInfoSampler"] = {}
+
+    @classmethod
+    def get_instance(cls, adapter_name: str) -> "ConnInfoSampler":
+        if adapter_name not in cls.__instances:
+            cls.__instances[adapter_name] = cls(adapter_name)
+        return cls.__instances[adapter_name]
+
+    def __init__(self, adapter_name: str) -> None:
+        super().__init__()
+        self.adapter_name = adapter_name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._addresses: Set[str] = set()
+        self._hidden = False
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._open_failed = False
+        self._read_failed = False
+
+    def add(self, address: str) -> None:
+        with self._lock:
+            self._addresses.add(address)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"ConnInfoSampler {self.adapter_name}",
+                                                daemon=True)
+                self._thread.start()
+        # Read the new device right away
+        self._wakeup.set()
+
+    def remove(self, address: str) -> None:
+        with self._lock:
+            self._addresses.discard(address)
+
+    def set_hidden(self, hidden: bool) -> None:
+        self._hidden = hidden
+        if not hidden:
+            self._wakeup.set()
+
+    def stop(self) -> None:
+        with self._lock:
+            self._stopped = True
+            self._addresses.clear()
+        self._wakeup.set()
+        if self.__instances.get(self.adapter_name) is self:
+            del self.__instances[self.adapter_name]
+
+    def _open(self) -> Optional[conn_info_reader]:
+        try:
+            reader = conn_info_reader(self.adapter_name)
+        except ConnInfoReadError as e:
+            # Opening is tried again every pass, a failure is only worth a warning the first time
+            log = logging.debug if self._open_failed else logging.warning
+            log(f"Failed to read power levels of {self.adapter_name}: {e}")
+            self._open_failed = True
+            return None
+
+        self._open_failed = False
+        return reader
+
+    def _read(self, reader: Optional[conn_info_reader], addresses: Set[str]) -> Dict[str, ConnInfoSample]:
+        if reader is not None:
+            ordered = sorted(addresses)
+            try:
+                values = reader.read(ordered)
+            except ConnInfoReadError as e:
+                # Like opening, reading fails the same way every pass
+                log = logging.debug if self._read_failed else logging.warning
+                log(f"Failed to read power levels of {self.adapter_name}: {e}")
+                self._read_failed = True
+            else:
+                self._read_failed = False
+                # Devices without an ACL link are probably LE devices
+                return {address: ConnInfoSample(True) if value is None else ConnInfoSample(False, *value)
+                        for address, value in zip(ordered, values)}
+
+        return {address: ConnInfoSample(True) for address in addresses}
+
+    def _run(self) -> None:
+        reader = None
+        previous: Dict[str, ConnInfoSample] = {}
+        stable = 0
+
+        while True:
+            self._wakeup.clear()
+            with self._lock:
+                if self._stopped:
+                    break
+                addresses = set(self._addresses)
+
+            samples = {}
+            if addresses:
+                # The socket stays open as long as there is something to read
+                if reader is None:
+                    reader = self._open()
+                samples = self._read(reader, addresses)
+                GLib.idle_add(partial(self._deliver, samples))
+            elif reader is not None:
+                reader.close()
+                reader = None
+
+            stable = stable + 1 if samples == previous else 0
+            previous = samples
+
+            self._wakeup.wait(backoff_interval(stable, self._hidden) if addresses else None)
+
+        if reader is not None:
+            reader.close()
+
+    def _deliver(self, samples: Dict[str, ConnInfoSample]) -> bool:
+        if not self._stopped:
+            self.emit("samples", samples)
+        return False
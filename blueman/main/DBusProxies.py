@@ -1,5 +1,6 @@
 from gi.repository import Gio, GLib
 
+from blueman.DBusStats import InstrumentedProxy
 from blueman.gobject import SingletonGObjectMeta
 
 
@@ -7,7 +8,7 @@ class DBusProxyFailed(Exception):
     pass
 
 
-class ProxyBase(Gio.DBusProxy, metaclass=SingletonGObjectMeta):
+class ProxyBase(InstrumentedProxy, metaclass=SingletonGObjectMeta):
     def __init__(self, name: str, interface_name: str, object_path: str = "/", systembus: bool = False,
                  flags: Gio.DBusProxyFlags = Gio.DBusProxyFlags.NONE) -> None:
         if systembus:
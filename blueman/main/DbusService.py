@@ -1,10 +1,13 @@
 import logging
 import sys
+import time
 import traceback
 from typing import Dict, Tuple, Callable, Set, Optional, Any, Collection
 
 from gi.repository import Gio, GLib
 
+from blueman import DBusStats
+
 
 class DbusError(Exception):
     _name = "org.blueman.Error"
@@ -114,14 +117,22 @@ class DbusService:
                 invocation.return_error_literal(Gio.dbus_error_quark(), Gio.DBusError.UNKNOWN_METHOD,
                                                 f"No such method on interface: {interface_name}.{method_name}")
 
+            start = time.monotonic()
+            module = getattr(method, "__module__", None) or "?"
+
             def ok(*result: Any) -> None:
+                DBusStats.record(interface_name, method_name, DBusStats.DISPATCH, time.monotonic() - start, module)
                 invocation.return_value(self._prepare_arguments(result_signature, result))
 
+            def err(exception: object) -> None:
+                DBusStats.record(interface_name, method_name, DBusStats.DISPATCH, time.monotonic() - start, module)
+                self._return_dbus_error(invocation, exception)
+
             args = parameters.unpack()
             if "sender" in options:
                 args += (sender,)
             if "async" in options:
-                method(*(args + (ok, lambda exception: self._return_dbus_error(invocation, exception))))
+                method(*(args + (ok, err)))
             else:
                 ok(method(*args))
         except Exception as e:
@@ -0,0 +1,121 @@
+import logging
+from typing import Dict, NamedTuple, Optional, TYPE_CHECKING
+
+from gi.repository import GLib, GObject
+
+from _blueman import HCI_ACL_LINK, ConnectionComplete, DisconnectionComplete, EncryptionChange, HciMonitorError, \
+    hci_monitor
+from blueman.bluemantyping import GSignals
+
+if TYPE_CHECKING:
+    from _blueman import HciEvent
+
+
+class HciLink(NamedTuple):
+    handle: int
+    encrypted: bool = False
+
+
+class HciMonitor(GObject.GObject):
+    """Follows the ACL links of an adapter through the HCI events of the kernel instead of polling.
+
+    links holds the links that are up by address and is updated before an event is emitted. If the
+    monitor is not available, e.g. because the socket could not be opened, users have to poll. Such
+    monitors are not kept, so asking again later tries to open the socket again.
+    """
+
+    __gsignals__: GSignals = {
+        # @param: parsed event of _blueman.hci_monitor
+        'event': (GObject.SignalFlags.RUN_LAST, None, (object,)),
+    }
+
+    connect_signal = GObject.GObject.connect
+    disconnect_signal = GObject.GObject.disconnect
+
+    __instances: Dict[str, "HciMonitor"] = {}
+
+    @classmethod
+    def get_instance(cls, adapter_name: str) -> "HciMonitor":
+        if adapter_name in cls.__instances:
+            return cls.__instances[adapter_name]
+
+        instance = cls(adapter_name)
+        if instance.available:
+            cls.__instances[adapter_name] = instance
+        return instance
+
+    def __init__(self, adapter_name: str) -> None:
+        super().__init__()
+        self.adapter_name = adapter_name
+        self.links: Dict[str, HciLink] = {}
+        self._monitor: Optional[hci_monitor] = None
+        self._watch: Optional[int] = None
+
+        try:
+            self._monitor = hci_monitor(adapter_name)
+        except HciMonitorError as e:
+            logging.warning(f"Failed to monitor HCI events of {adapter_name}: {e}")
+            return
+
+        for handle, address, link_type in self._monitor.connections():
+            if link_type == HCI_ACL_LINK:
+                self.links[address] = HciLink(handle)
+
+        self._watch = GLib.io_add_watch(self._monitor.fileno(), GLib.IO_IN | GLib.IO_ERR | GLib.IO_HUP,
+                                        self._on_io)
+
+    @property
+    def available(self) -> bool:
+        return self._monitor is not None
+
+    def stop(self) -> None:
+        if self._watch is not None:
+            GLib.source_remove(self._watch)
+            self._watch = None
+        if self._monitor is not None:
+            self._monitor.close()
+            self._monitor = None
+        self.links = {}
+        if self.__instances.get(self.adapter_name) is self:
+            del self.__instances[self.adapter_name]
+
+    def _on_io(self, _fd: int, condition: GLib.IOCondition) -> bool:
+        assert self._monitor is not None
+        failed = bool(condition & (GLib.IO_ERR | GLib.IO_HUP))
+
+        try:
+            events = self._monitor.read()
+        except HciMonitorError as e:
+            logging.warning(f"Failed to read HCI events of {self.adapter_name}: {e}")
+            events = []
+            failed = True
+
+        for event in events:
+            self._update_links(event)
+            self.emit("event", event)
+
+        if failed:
+            # The adapter is gone, a new instance opens a new socket
+            self._watch = None
+            self.stop()
+            return False
+
+        return True
+
+    def _update_links(self, event: "HciEvent") -> None:
+        if event.status != 0 or event.address is None:
+            return
+
+        if isinstance(event, ConnectionComplete):
+            if event.link_type == HCI_ACL_LINK:
+                self.links[event.address] = HciLink(event.handle, encrypted=event.encrypted)
+            return
+
+        link = self.links.get(event.address)
+        if link is None or link.handle != event.handle:
+            return
+
+        if isinstance(event, DisconnectionComplete):
+            del self.links[event.address]
+        elif isinstance(event, EncryptionChange):
+            self.links[event.address] = link._replace(encrypted=event.encrypted)
@@ -0,0 +1,7 @@
+from typing import Any, Mapping, Tuple
+
+# Version of GetMenuSnapshot and MenuPatched, clients that do not know it use GetMenu and MenuChanged
+MENU_PROTOCOL = 1
+
+# Operation (insert, update or remove), index and the new item
+MenuPatch = Tuple[str, int, Mapping[str, Any]]
@@ -0,0 +1,96 @@
+import time
+from typing import Callable, List, Optional
+
+
+class RateEstimator:
+    """Estimates the rate of a growing counter, e.g. transferred bytes, from its recent samples.
+
+    Samples go to a ring buffer of fixed size and are timed with a monotonic clock, so clock steps
+    and suspend do not produce absurd rates. rate is the moving average over the last window seconds,
+    ewma an exponentially weighted average whose weight halves every halflife seconds. A counter going
+    backwards was reset and continues from where it was.
+    """
+
+    def __init__(self, window: float = 3.0, halflife: float = 1.0, size: int = 64,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.window = window
+        self.halflife = halflife
+        self._clock = clock
+        self._size = size
+        self._times: List[float] = [0.0] * size
+        self._values: List[float] = [0.0] * size
+        self.reset()
+
+    def reset(self) -> None:
+        self._first = 0
+        self._count = 0
+        self._offset = 0.0
+        self._last = 0.0
+        self._ewma: Optional[float] = None
+
+    def __len__(self) -> int:
+        return self._count
+
+    def add(self, value: float, now: Optional[float] = None) -> float:
+        """Add a sample of the counter and return the moving average rate"""
+        if now is None:
+            now = self._clock()
+
+        if self._count and value < self._last:
+            self._offset += self._last
+        self._last = value
+        value += self._offset
+
+        if self._count:
+            newest = (self._first + self._count - 1) % self._size
+            elapsed = now - self._times[newest]
+            if elapsed <= 0:
+                # Nothing to tell the samples apart, the newer value wins
+                self._values[newest] = value
+                return self.rate
+
+            current = (value - self._values[newest]) / elapsed
+            if self._ewma is None:
+                self._ewma = current
+            else:
+                self._ewma += (current - self._ewma) * (1 - 0.5 ** (elapsed / self.halflife))
+
+        if self._count == self._size:
+            self._first = (self._first + 1) % self._size
+            self._count -= 1
+
+        index = (self._first + self._count) % self._size
+        self._times[index] = now
+        self._values[index] = value
+        self._count += 1
+
+        # Drop samples as long as the rest still covers the window
+        while self._count > 2 and now - self._times[(self._first + 1) % self._size] >= self.window:
+            self._first = (self._first + 1) % self._size
+            self._count -= 1
+
+        return self.rate
+
+    @property
+    def total(self) -> float:
+        """The counter including the values before resets"""
+        return self._last + self._offset
+
+    @property
+    def rate(self) -> float:
+        if self._count < 2:
+            return 0.0
+        newest = (self._first + self._count - 1) % self._size
+        elapsed = self._times[newest] - self._times[self._first]
+        return (self._values[newest] - self._values[self._first]) / elapsed
+
+    @property
+    def ewma(self) -> float:
+        return 0.0 if self._ewma is None else self._ewma
+
+    def eta(self, remaining: float, smoothed: bool = False) -> Optional[float]:
+        """Seconds until remaining more is counted at the moving average or ewma rate, None if nothing moves"""
+        rate = self.ewma if smoothed else self.rate
+        if rate <= 0:
+            return None
+        return remaining / rate
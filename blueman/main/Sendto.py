@@ -14,7 +14,7 @@ from blueman.bluez.obex.Manager import Manager
 from blueman.bluez.obex.Client import Client
 from blueman.bluez.obex.Transfer import Transfer
 from blueman.Functions import format_bytes
-from blueman.main.SpeedCalc import SpeedCalc
+from blueman.main.RateEstimator import RateEstimator
 from blueman.gui.CommonUi import ErrorDialog
 
 import gi
@@ -73,11 +73,12 @@ class Sender(Gtk.Dialog):
 
         self.error_dialog: Optional[ErrorDialog] = None
         self.cancelling = False
+        self._cancellable = Gio.Cancellable()
 
         # bytes transferred on a current transfer
         self.transferred = 0
 
-        self.speed = SpeedCalc(6)
+        self.speed = RateEstimator(window=6)
 
         for file_name in files:
             parsed_file = Gio.File.parse_name(file_name)
@@ -136,13 +137,14 @@ class Sender(Gtk.Dialog):
         self.show()
 
     def create_session(self) -> None:
-        self.client.create_session(self.device['Address'], self.adapter["Address"])
+        self.client.create_session(self.device['Address'], self.adapter["Address"], cancellable=self._cancellable)
 
     def on_cancel(self, button: Optional[Gtk.Button]) -> None:
         self.pb.props.text = _("Cancelling")
         if button:
             button.props.sensitive = False
 
+        self._cancellable.cancel()
         if self.object_push:
             self.client.remove_session(self.object_push.get_session_path())
 
@@ -178,19 +180,20 @@ class Sender(Gtk.Dialog):
 
         self._last_bytes = progress
 
-        tm = time.time()
+        tm = time.monotonic()
         if tm - self._last_update > 0.5:
-            spd = self.speed.calc(self.total_transferred)
+            spd = self.speed.add(self.total_transferred, tm)
             (size, units) = format_bytes(spd)
-            try:
-                x = ((self.total_bytes - self.total_transferred) / spd) + 1
+            remaining = self.speed.eta(self.total_bytes - self.total_transferred)
+            if remaining is None:
+                eta = "∞"
+            else:
+                x = remaining + 1
                 if x > 60:
                     x /= 60
                     eta = ngettext("%(minutes)d Minute", "%(minutes)d Minutes", round(x)) % {"minutes": round(x)}
                 else:
                     eta = ngettext("%(seconds)d Second", "%(seconds)d Seconds", round(x)) % {"seconds": round(x)}
-            except ZeroDivisionError:
-                eta = "∞"
 
             self.pb.props.text = _("Sending File") + (" %(0)s/%(1)s (%(2).2f %(3)s/s) " + _("ETA:") + " %(4)s") % {
                 "1": self.num_files,
@@ -219,7 +222,7 @@ class Sender(Gtk.Dialog):
     def send_file(self, file_path: str) -> None:
         logging.info(file_path)
         if self.object_push:
-            self.object_push.send_file(file_path)
+            self.object_push.send_file(file_path, cancellable=self._cancellable)
 
     def on_transfer_error(self, _transfer: Optional[Transfer], msg: str = "") -> None:
         if not self.error_dialog:
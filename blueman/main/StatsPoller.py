@@ -0,0 +1,139 @@
+import time
+from typing import Callable, Optional, Set, Tuple, TYPE_CHECKING
+
+from gi.repository import GLib, GObject
+
+from _blueman import ConnectionComplete, device_info
+from blueman.bluemantyping import GSignals
+from blueman.main.HciMonitor import HciMonitor
+from blueman.main.RateEstimator import RateEstimator
+
+if TYPE_CHECKING:
+    from _blueman import HciEvent
+
+# Milliseconds between polls while the counters move and the most they grow to while they do not
+FAST_INTERVAL = 1000
+MAX_INTERVAL = 16000
+
+
+def read_counters(hci: str) -> Tuple[int, int]:
+    stat = device_info(hci)["stat"]
+    return stat["byte_tx"], stat["byte_rx"]
+
+
+class StatsPoller(GObject.GObject):
+    """Polls the byte counters of an adapter only as often as they change.
+
+    The interval is FAST_INTERVAL while data flows and doubles with every poll that finds the
+    counters where they were, up to MAX_INTERVAL. Nothing is polled while any reason to suspend
+    is set, e.g. while nobody sees the statistics. If follow_links is set the poller goes back to
+    FAST_INTERVAL as soon as the HCI monitor sees a link come up.
+
+    Polling goes on while the adapter has no links, its counters also count HCI events like the
+    results of a device search.
+    """
+
+    __gsignals__: GSignals = {
+        # @param: bytes sent, bytes received, upload rate, download rate
+        'update': (GObject.SignalFlags.RUN_LAST, None,
+                   (GObject.TYPE_UINT64, GObject.TYPE_UINT64, float, float)),
+    }
+
+    connect_signal = GObject.GObject.connect
+    disconnect_signal = GObject.GObject.disconnect
+
+    def __init__(self, read_counters: Callable[[str], Tuple[int, int]],
+                 clock: Callable[[], float] = time.monotonic, follow_links: bool = True) -> None:
+        super().__init__()
+        self._read_counters = read_counters
+        self._clock = clock
+        self._follow_links = follow_links
+        self._monitor: Optional[HciMonitor] = None
+        self._monitor_handler = 0
+        self.hci: Optional[str] = None
+        self.interval = FAST_INTERVAL
+        self.up_speed = RateEstimator(clock=clock)
+        self.down_speed = RateEstimator(clock=clock)
+        self._last: Optional[Tuple[int, int]] = None
+        self._suspended: Set[str] = set()
+        self._timer: Optional[int] = None
+
+    @property
+    def suspended(self) -> bool:
+        return bool(self._suspended)
+
+    def set_adapter(self, hci: Optional[str]) -> None:
+        self.hci = hci
+        if self._follow_links:
+            self._follow(hci)
+        self.wake()
+
+    def set_suspended(self, reason: str, suspended: bool) -> None:
+        was_suspended = self.suspended
+        if suspended:
+            self._suspended.add(reason)
+        else:
+            self._suspended.discard(reason)
+
+        if self.suspended and not was_suspended:
+            self._cancel()
+            # Nothing is measured from here on, do not leave a stale rate behind
+            if self._last is not None:
+                self.emit("update", self._last[0], self._last[1], 0.0, 0.0)
+        elif was_suspended and not self.suspended:
+            self.wake()
+
+    def wake(self) -> None:
+        """Poll right away and quickly again, e.g. because a link came up"""
+        self._cancel()
+        self.up_speed.reset()
+        self.down_speed.reset()
+        self._last = None
+        self.interval = FAST_INTERVAL
+        if not self.suspended and self.hci is not None:
+            self._poll()
+
+    def stop(self) -> None:
+        self._cancel()
+        self._follow(None)
+        self.hci = None
+
+    def _follow(self, hci: Optional[str]) -> None:
+        if self._monitor is not None:
+            self._monitor.disconnect_signal(self._monitor_handler)
+            self._monitor = None
+        if hci is not None:
+            self._monitor = HciMonitor.get_instance(hci)
+            self._monitor_handler = self._monitor.connect_signal("event", self._on_hci_event)
+
+    def _on_hci_event(self, _monitor: HciMonitor, event: "HciEvent") -> None:
+        if isinstance(event, ConnectionComplete) and event.status == 0:
+            self.wake()
+
+    def _cancel(self) -> None:
+        if self._timer is not None:
+            GLib.source_remove(self._timer)
+            self._timer = None
+
+    def _poll(self) -> bool:
+        self._timer = None
+        if self.hci is None:
+            return False
+
+        tx, rx = self._read_counters(self.hci)
+        now = self._clock()
+        up = self.up_speed.add(tx, now)
+        down = self.down_speed.add(rx, now)
+
+        if self._last is None or (tx, rx) != self._last:
+            self.interval = FAST_INTERVAL
+        else:
+            self.interval = min(self.interval * 2, MAX_INTERVAL)
+        self._last = (tx, rx)
+
+        self.emit("update", tx, rx, up, down)
+
+        # The handlers may have suspended polling
+        if not self.suspended and self._timer is None:
+            self._timer = GLib.timeout_add(self.interval, self._poll)
+        return False
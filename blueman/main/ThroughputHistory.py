@@ -0,0 +1,117 @@
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Seconds per bucket and number of buckets: five minutes by the second, three hours by the minute
+# and three days by the hour
+RESOLUTIONS = ((1, 300), (60, 180), (3600, 72))
+
+# Resolution in seconds, wall clock time the newest bucket ends, bytes per second sent and received
+SeriesRow = Tuple[int, float, List[float], List[float]]
+
+
+class Series:
+    """Bytes sent and received per bucket of resolution seconds in a ring of size buckets"""
+
+    def __init__(self, resolution: int, size: int) -> None:
+        self.resolution = resolution
+        self.size = size
+        self.tx = array("d", bytes(8 * size))
+        self.rx = array("d", bytes(8 * size))
+        # Number of the newest bucket counted from the start of the clock
+        self.newest: Optional[int] = None
+
+    def advance(self, now: float) -> None:
+        slot = int(now // self.resolution)
+        if self.newest is not None and slot > self.newest:
+            # Buckets nothing was counted for since the newest one
+            for skipped in range(self.newest + 1, min(slot, self.newest + self.size) + 1):
+                self.tx[skipped % self.size] = 0.0
+                self.rx[skipped % self.size] = 0.0
+        if self.newest is None or slot > self.newest:
+            self.newest = slot
+
+    def add(self, start: float, end: float, tx: float, rx: float) -> None:
+        """Spread tx and rx over the buckets between start and end"""
+        self.advance(end)
+        assert self.newest is not None
+
+        if end <= start:
+            self.tx[self.newest % self.size] += tx
+            self.rx[self.newest % self.size] += rx
+            return
+
+        first = max(int(start // self.resolution), self.newest - self.size + 1)
+        for slot in range(first, self.newest + 1):
+            share = (min(end, (slot + 1) * self.resolution) - max(start, slot * self.resolution)) / (end - start)
+            self.tx[slot % self.size] += tx * share
+            self.rx[slot % self.size] += rx * share
+
+    def rates(self) -> Tuple[List[float], List[float]]:
+        """Bytes per second of every bucket, the oldest first"""
+        if self.newest is None:
+            return [0.0] * self.size, [0.0] * self.size
+
+        split = (self.newest + 1) % self.size
+        tx = self.tx[split:] + self.tx[:split]
+        rx = self.rx[split:] + self.rx[:split]
+        return [value / self.resolution for value in tx], [value / self.resolution for value in rx]
+
+
+class ThroughputHistory:
+    """Throughput of an adapter over time in fixed memory.
+
+    Fed with the byte counters of the adapter, the transferred bytes are counted in a series of
+    buckets per resolution, so the history is as fine as a second for the last minutes and as coarse
+    as an hour for the last days. Buckets are timed with a monotonic clock, only the export uses the
+    wall clock.
+    """
+
+    __instances: Dict[str, "ThroughputHistory"] = {}
+
+    @classmethod
+    def get_instance(cls, adapter_name: str) -> "ThroughputHistory":
+        if adapter_name not in cls.__instances:
+            cls.__instances[adapter_name] = cls()
+        return cls.__instances[adapter_name]
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic,
+                 wall_clock: Callable[[], float] = time.time) -> None:
+        self._clock = clock
+        self._wall_clock = wall_clock
+        self.series = [Series(resolution, size) for resolution, size in RESOLUTIONS]
+        self._last: Optional[Tuple[float, int, int]] = None
+
+    def add(self, tx: int, rx: int, now: Optional[float] = None) -> None:
+        """Count the bytes the counters grew by since the last call"""
+        if now is None:
+            now = self._clock()
+
+        if self._last is not None:
+            then, last_tx, last_rx = self._last
+            # Counters going backwards were reset and count from zero
+            sent = tx - last_tx if tx >= last_tx else tx
+            received = rx - last_rx if rx >= last_rx else rx
+            for series in self.series:
+                series.add(then, now, sent, received)
+
+        self._last = (now, tx, rx)
+
+    def get_series(self, resolution: int) -> Tuple[List[float], List[float]]:
+        """Bytes per second sent and received per bucket of resolution seconds, up to now"""
+        for series in self.series:
+            if series.resolution == resolution:
+                series.advance(self._clock())
+                return series.rates()
+        raise KeyError(resolution)
+
+    def export(self) -> List[SeriesRow]:
+        now = self._clock()
+        wall_now = self._wall_clock()
+        rows = []
+        for series in self.series:
+            series.advance(now)
+            assert series.newest is not None
+            end = wall_now - (now - (series.newest + 1) * series.resolution)
+            rows.append((series.resolution, end) + series.rates())
+        return rows
@@ -1,45 +1,142 @@
 from importlib import import_module
 import logging
-import os
-import sys
+from typing import Any, Dict, Optional
+
 from blueman.main.DBusProxies import AppletService
+from blueman.main.MenuProtocol import MENU_PROTOCOL
 from gi.repository import Gio, GLib
 
+# Seconds to wait for the applet to come back before quitting
+APPLET_RESTART_TIMEOUT = 10
+# Seconds between attempts to get the first state of the applet, and how often to try before quitting
+STATE_RETRY_TIMEOUT = 2
+STATE_RETRIES = 3
+
 
 class BluemanTray(Gio.Application):
     def __init__(self) -> None:
         super().__init__(application_id="org.blueman.Tray", flags=Gio.ApplicationFlags.FLAGS_NONE)
         self._active = False
+        self._applet: Optional[AppletService] = None
+        self.indicator: Any = None
+        self._implementation: Optional[str] = None
+        # Revision of the menu of the applet, None while it is fetched or if the applet only announces whole menus
+        self._menu_revision: Optional[int] = None
+        self._legacy_menu = False
+        self._quit_timeout: Optional[int] = None
+        self._retry_timeout: Optional[int] = None
+        self._state_failures = 0
 
     def do_activate(self) -> None:
         if self._active:
-            logging.info("Already running, restarting instance")
-            os.execv(sys.argv[0], sys.argv)
+            # The applet starts the tray when its plugins change, e.g. the indicator implementation
+            logging.info("Already running, updating from the applet")
+            if self._applet is not None and self._applet.get_name_owner() is not None:
+                self._fetch_state()
+            return
 
         Gio.bus_watch_name(Gio.BusType.SESSION, 'org.blueman.Applet', Gio.BusNameWatcherFlags.NONE,
                            self._on_name_appeared, self._on_name_vanished)
         self.hold()
+        self._active = True
 
     def _on_name_appeared(self, _connection: Gio.DBusConnection, name: str, _owner: str) -> None:
         logging.debug("Applet started on name %s, showing indicator" % name)
 
-        applet = AppletService()
-        indicator_name = applet.GetStatusIconImplementation()
-        logging.info(f'Using indicator "{indicator_name}"')
-        indicator_class = getattr(import_module('blueman.main.indicators.' + indicator_name), indicator_name)
-        self.indicator = indicator_class(applet.GetIconName(), self._activate_menu_item, self._activate_status_icon)
+        if self._quit_timeout is not None:
+            GLib.source_remove(self._quit_timeout)
+            self._quit_timeout = None
 
-        applet.connect('g-signal', self.on_signal)
+        if self._applet is None:
+            self._applet = AppletService()
+            self._applet.connect('g-signal', self.on_signal)
 
-        self.indicator.set_text(applet.GetText())
-        self.indicator.set_visibility(applet.GetVisibility())
-        self.indicator.set_menu(applet.GetMenu())
-
-        self._active = True
+        self._fetch_state()
 
     def _on_name_vanished(self, _connection: Gio.DBusConnection, _name: str) -> None:
-        logging.debug("Applet shutdown or not available at startup")
+        if self._retry_timeout is not None:
+            GLib.source_remove(self._retry_timeout)
+            self._retry_timeout = None
+
+        if self.indicator is None:
+            logging.debug("Applet not available at startup")
+            self.quit()
+            return
+
+        logging.debug("Applet shutdown, waiting for it to restart")
+        self.indicator.set_visibility(False)
+        self._menu_revision = None
+        if self._quit_timeout is None:
+            self._quit_timeout = GLib.timeout_add_seconds(APPLET_RESTART_TIMEOUT, self._on_quit_timeout)
+
+    def _on_quit_timeout(self) -> bool:
+        self._quit_timeout = None
         self.quit()
+        return False
+
+    def _on_retry_timeout(self) -> bool:
+        self._retry_timeout = None
+        self._fetch_state()
+        return False
+
+    def _fetch_state(self) -> None:
+        assert self._applet is not None
+        if self._retry_timeout is not None:
+            GLib.source_remove(self._retry_timeout)
+            self._retry_timeout = None
+        self._menu_revision = None
+        self._applet.call('GetState', None, Gio.DBusCallFlags.NONE, -1, None, self._on_state)
+
+    def _on_state(self, applet: AppletService, result: Gio.AsyncResult) -> None:
+        try:
+            state = applet.call_finish(result).unpack()[0]
+        except GLib.Error as e:
+            if not e.matches(Gio.dbus_error_quark(), Gio.DBusError.UNKNOWN_METHOD):
+                logging.warning(f"Failed to get the state of the applet: {e.message}")
+                if self.indicator is None:
+                    # Without an indicator nothing else fetches the state again
+                    self._state_failures += 1
+                    if self._state_failures >= STATE_RETRIES:
+                        self.quit()
+                    elif self._retry_timeout is None:
+                        self._retry_timeout = GLib.timeout_add_seconds(STATE_RETRY_TIMEOUT, self._on_retry_timeout)
+                return
+            state = self._get_legacy_state(applet)
+
+        self._state_failures = 0
+
+        self._set_indicator(state["Implementation"], state["IconName"])
+        self.indicator.set_text(state["Text"])
+        self.indicator.set_visibility(state["Visibility"])
+
+        self._legacy_menu = state.get("MenuProtocol") != MENU_PROTOCOL
+        if not self._legacy_menu:
+            self._menu_revision = state["MenuRevision"]
+        self.indicator.set_menu(state["Menu"])
+
+    @staticmethod
+    def _get_legacy_state(applet: AppletService) -> Dict[str, Any]:
+        # An applet from before GetState
+        return {
+            "Implementation": applet.GetStatusIconImplementation(),
+            "IconName": applet.GetIconName(),
+            "Text": applet.GetText(),
+            "Visibility": applet.GetVisibility(),
+            "Menu": applet.GetMenu(),
+        }
+
+    def _set_indicator(self, implementation: str, icon_name: str) -> None:
+        if self.indicator is not None and implementation == self._implementation:
+            self.indicator.set_icon(icon_name)
+            return
+
+        if self.indicator is not None:
+            self.indicator.set_visibility(False)
+
+        logging.info(f'Using indicator "{implementation}"')
+        indicator_class = getattr(import_module('blueman.main.indicators.' + implementation), implementation)
+        self.indicator = indicator_class(icon_name, self._activate_menu_item, self._activate_status_icon)
+        self._implementation = implementation
 
     def _activate_menu_item(self, *indexes: int) -> None:
         AppletService().ActivateMenuItem('(ai)', indexes)
@@ -47,7 +144,10 @@ class BluemanTray(Gio.Application):
     def _activate_status_icon(self) -> None:
         AppletService().Activate()
 
-    def on_signal(self, _applet: AppletService, _sender_name: str, signal_name: str, args: GLib.Variant) -> None:
+    def on_signal(self, applet: AppletService, _sender_name: str, signal_name: str, args: GLib.Variant) -> None:
+        if self.indicator is None:
+            return
+
         if signal_name == 'IconNameChanged':
             self.indicator.set_icon(*args)
         elif signal_name == 'TextChanged':
@@ -55,4 +155,16 @@ class BluemanTray(Gio.Application):
         elif signal_name == 'VisibilityChanged':
             self.indicator.set_visibility(*args)
         elif signal_name == 'MenuChanged':
-            self.indicator.set_menu(*args)
+            if self._legacy_menu:
+                self.indicator.set_menu(*args)
+        elif signal_name == 'MenuPatched':
+            # While the state is fetched its reply includes the patches
+            if self._legacy_menu or self._menu_revision is None:
+                return
+            revision, patches = args.unpack()[0]
+            if revision == self._menu_revision + 1:
+                self._menu_revision = revision
+                self.indicator.patch_menu(patches)
+            elif revision > self._menu_revision:
+                logging.info(f"Missed menu revisions {self._menu_revision + 1} to {revision - 1}, fetching state")
+                self._fetch_state()
@@ -1,14 +1,16 @@
-from typing import Iterable, TYPE_CHECKING, Callable
+from typing import Any, Iterable, List, Mapping, TYPE_CHECKING, Callable, Optional
 
 import gi
 
 gi.require_version('AppIndicator3', '0.1')
-from gi.repository import AppIndicator3
-from blueman.main.indicators.GtkStatusIcon import build_menu
+gi.require_version("Gtk", "3.0")
+from gi.repository import AppIndicator3, GLib, Gtk
+from blueman.main.indicators.GtkStatusIcon import build_menu, patch_items, patch_menu, update_countdowns
 
 if TYPE_CHECKING:
     from blueman.plugins.applet.Menu import MenuItemDict
     from blueman.main.indicators.GtkStatusIcon import MenuItemActivator
+    from blueman.main.MenuProtocol import MenuPatch
 
 
 class AppIndicator:
@@ -18,6 +20,9 @@ class AppIndicator:
         self.indicator = AppIndicator3.Indicator.new('blueman', icon_name,
                                                      AppIndicator3.IndicatorCategory.APPLICATION_STATUS)
         self.indicator.set_status(AppIndicator3.IndicatorStatus.ACTIVE)
+        self._menu: Optional[Gtk.Menu] = None
+        self._items: List[Mapping[str, Any]] = []
+        self._countdown_timer: Optional[int] = None
 
     def set_icon(self, icon_name: str) -> None:
         self.indicator.set_icon(icon_name)
@@ -32,4 +37,27 @@ class AppIndicator:
         self.indicator.set_status(status)
 
     def set_menu(self, menu: Iterable["MenuItemDict"]) -> None:
-        self.indicator.set_menu(build_menu(menu, self._on_activate))
+        menu = list(menu)
+        self._items = list(menu)
+        self._menu = build_menu(menu, self._on_activate)
+        self.indicator.set_menu(self._menu)
+        self._follow_countdowns()
+
+    def patch_menu(self, patches: Iterable["MenuPatch"]) -> None:
+        # The indicator exports the menu as long as it is set, so unlike GtkStatusIcon the widgets are kept up
+        # to date right away. The indicator follows the changes of the items.
+        assert self._menu is not None
+        patches = list(patches)
+        patch_items(self._items, patches)
+        patch_menu(self._menu, patches, self._on_activate)
+        self._follow_countdowns()
+
+    def _follow_countdowns(self) -> None:
+        if self._countdown_timer is None and self._on_countdown_tick():
+            self._countdown_timer = GLib.timeout_add(1000, self._on_countdown_tick)
+
+    def _on_countdown_tick(self) -> bool:
+        if self._menu is not None and update_countdowns(self._menu, self._items):
+            return True
+        self._countdown_timer = None
+        return False
@@ -1,10 +1,13 @@
-from typing import Callable, Iterable, TYPE_CHECKING, overload, Any, cast, Mapping, Optional
+import math
+import time
+from typing import Callable, Iterable, TYPE_CHECKING, overload, Any, cast, List, Mapping, Optional, Sequence
 
 import gi
 
 gi.require_version("Gtk", "3.0")
-from gi.repository import Gtk
+from gi.repository import GLib, Gtk
 from blueman.Functions import create_menuitem
+from blueman.main.MenuProtocol import MenuPatch
 
 if TYPE_CHECKING:
     from typing_extensions import Protocol
@@ -34,26 +37,104 @@ def build_menu(items: Iterable["SubmenuItemDict"], activate: Callable[[int], Non
 def build_menu(items: Iterable[Mapping[str, Any]], activate: Callable[..., None]) -> Gtk.Menu:
     menu = Gtk.Menu()
     for index, item in enumerate(items):
-        if 'text' in item and 'icon_name' in item:
-            gtk_item: Gtk.MenuItem = create_menuitem(item['text'], item['icon_name'])
-            label = gtk_item.get_child()
-            assert isinstance(label, Gtk.Label)
-            if item['markup']:
-                label.set_markup_with_mnemonic(item['text'])
+        _insert_item(menu, index, item, activate)
+    return menu
+
+
+def patch_menu(menu: Gtk.Menu, patches: Iterable[MenuPatch],
+               activate: "MenuItemActivator") -> None:
+    """Apply the insert, update and remove patches of the applet to the items of menu in place"""
+    for operation, index, item in patches:
+        if operation == "insert":
+            _insert_item(menu, index, item, activate)
+        elif operation == "remove":
+            menu.get_children()[index].destroy()
+        elif operation == "update":
+            gtk_item = menu.get_children()[index]
+            if isinstance(gtk_item, Gtk.ImageMenuItem) and _has_label(item):
+                _update_item(gtk_item, item, activate)
             else:
-                label.set_text_with_mnemonic(item['text'])
-            gtk_item.connect('activate', cast(Callable[[Gtk.MenuItem], None], lambda _, idx=index: activate(idx)))
-            if 'submenu' in item:
-                gtk_item.set_submenu(build_menu(item['submenu'], cast(Callable[[int], None],
-                                                                      lambda subid, idx=index: activate(idx, subid))))
-            if 'tooltip' in item:
-                gtk_item.props.tooltip_text = item['tooltip']
-            gtk_item.props.sensitive = item['sensitive']
+                gtk_item.destroy()
+                _insert_item(menu, index, item, activate)
         else:
-            gtk_item = Gtk.SeparatorMenuItem()
-        gtk_item.show()
-        menu.append(gtk_item)
-    return menu
+            raise ValueError(f"Unknown menu patch {operation}")
+
+
+def patch_items(items: List[Mapping[str, Any]], patches: Iterable[MenuPatch]) -> None:
+    """Apply the patches of the applet to a list of serialized menu items"""
+    for operation, index, item in patches:
+        if operation == "insert":
+            items.insert(index, item)
+        elif operation == "remove":
+            del items[index]
+        elif operation == "update":
+            items[index] = item
+        else:
+            raise ValueError(f"Unknown menu patch {operation}")
+
+
+def update_countdowns(menu: Gtk.Menu, items: Sequence[Mapping[str, Any]]) -> bool:
+    """Render the countdown items of menu with the time left now, True while any of them runs"""
+    running = False
+    for gtk_item, item in zip(menu.get_children(), items):
+        if 'countdown' in item and isinstance(gtk_item, Gtk.ImageMenuItem):
+            _set_label(gtk_item, item)
+            running = running or item['deadline'] > time.time()
+    return running
+
+
+def item_text(item: Mapping[str, Any]) -> str:
+    if 'countdown' in item and 'deadline' in item:
+        return cast(str, item['countdown'] % max(0, math.ceil(item['deadline'] - time.time())))
+    return cast(str, item['text'])
+
+
+def _has_label(item: Mapping[str, Any]) -> bool:
+    return 'text' in item and 'icon_name' in item
+
+
+def _position(gtk_item: Gtk.MenuItem) -> int:
+    # Items move when others are inserted or removed in front of them, so look the index up on activation
+    menu = gtk_item.get_parent()
+    assert isinstance(menu, Gtk.Menu)
+    return list(menu.get_children()).index(gtk_item)
+
+
+def _insert_item(menu: Gtk.Menu, index: int, item: Mapping[str, Any], activate: Callable[..., None]) -> None:
+    if _has_label(item):
+        image_item = create_menuitem(item['text'], item['icon_name'])
+        image_item.connect('activate', lambda activated: activate(_position(activated)))
+        _update_item(image_item, item, activate)
+        gtk_item: Gtk.MenuItem = image_item
+    else:
+        gtk_item = Gtk.SeparatorMenuItem()
+    gtk_item.show()
+    menu.insert(gtk_item, index)
+
+
+def _update_item(gtk_item: Gtk.ImageMenuItem, item: Mapping[str, Any], activate: Callable[..., None]) -> None:
+    image = gtk_item.get_image()
+    assert isinstance(image, Gtk.Image)
+    image.set_from_icon_name(item['icon_name'], Gtk.IconSize.MENU)
+
+    _set_label(gtk_item, item)
+
+    if 'submenu' in item:
+        gtk_item.set_submenu(build_menu(item['submenu'], cast(Callable[[int], None],
+                                                              lambda subid: activate(_position(gtk_item), subid))))
+    else:
+        gtk_item.set_submenu(None)
+    gtk_item.props.tooltip_text = item.get('tooltip')
+    gtk_item.props.sensitive = item['sensitive']
+
+
+def _set_label(gtk_item: Gtk.ImageMenuItem, item: Mapping[str, Any]) -> None:
+    label = gtk_item.get_child()
+    assert isinstance(label, Gtk.Label)
+    if item['markup']:
+        label.set_markup_with_mnemonic(item_text(item))
+    else:
+        label.set_text_with_mnemonic(item_text(item))
 
 
 class GtkStatusIcon:
@@ -64,11 +145,51 @@ class GtkStatusIcon:
         self.indicator.set_title('blueman')
         self.indicator.connect('popup-menu', self.on_popup_menu)
         self.indicator.connect('activate', lambda _status_icon: on_activate_status_icon())
+
+        # The menu is kept as the applet sent it and its widgets are only built or patched right before it
+        # pops up. _pending holds the patches since then, None if the widgets have to be built anew.
+        self._items: Optional[List[Mapping[str, Any]]] = None
+        self._pending: Optional[List[MenuPatch]] = None
         self._menu: Optional[Gtk.Menu] = None
+        self._countdown_timer: Optional[int] = None
 
     def on_popup_menu(self, _status_icon: Gtk.StatusIcon, _button: int, _activate_time: int) -> None:
-        if self._menu:
-            self._menu.popup_at_pointer(None)
+        if self._items is not None:
+            self._materialize().popup_at_pointer(None)
+            self._follow_countdowns()
+
+    def _follow_countdowns(self) -> None:
+        if self._countdown_timer is None and self._on_countdown_tick():
+            self._countdown_timer = GLib.timeout_add(1000, self._on_countdown_tick)
+
+    def _on_countdown_tick(self) -> bool:
+        # Countdowns only tick while the menu is open
+        if self._menu is not None and self._menu.get_visible() and self._items is not None \
+                and update_countdowns(self._menu, self._items):
+            return True
+        self._countdown_timer = None
+        return False
+
+    def _materialize(self) -> Gtk.Menu:
+        assert self._items is not None
+        if self._menu is None or self._pending is None:
+            if self._menu is not None:
+                self._menu.destroy()
+            self._menu = build_menu(cast(List["MenuItemDict"], self._items), self._on_activate)
+        else:
+            patch_menu(self._menu, self._pending, self._on_activate)
+        self._pending = []
+        return self._menu
+
+    def _on_model_changed(self) -> None:
+        assert self._items is not None
+        if self._menu is not None and self._menu.get_visible():
+            # The open menu follows the applet right away
+            self._materialize()
+            self._follow_countdowns()
+        elif self._pending is not None and len(self._pending) > len(self._items):
+            # Building the menu anew is cheaper than replaying the patches by now
+            self._pending = None
 
     def set_icon(self, icon_name: str) -> None:
         self.indicator.props.icon_name = icon_name
@@ -80,4 +201,14 @@ class GtkStatusIcon:
         self.indicator.props.visible = visible
 
     def set_menu(self, menu: Iterable["MenuItemDict"]) -> None:
-        self._menu = build_menu(menu, self._on_activate)
+        self._items = list(menu)
+        self._pending = None
+        self._on_model_changed()
+
+    def patch_menu(self, patches: Iterable[MenuPatch]) -> None:
+        assert self._items is not None
+        patches = list(patches)
+        patch_items(self._items, patches)
+        if self._pending is not None:
+            self._pending.extend(patches)
+        self._on_model_changed()
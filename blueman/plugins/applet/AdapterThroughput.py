@@ -0,0 +1,57 @@
+from gettext import gettext as _
+from typing import Dict, List
+
+from blueman.Functions import adapter_path_to_name
+from blueman.main.DbusService import DbusError
+from blueman.main.StatsPoller import StatsPoller, read_counters
+from blueman.main.ThroughputHistory import SeriesRow, ThroughputHistory
+from blueman.plugins.AppletPlugin import AppletPlugin
+
+
+class NoSuchAdapterError(DbusError):
+    _name = "org.blueman.Error.NoSuchAdapter"
+
+
+class AdapterThroughput(AppletPlugin):
+    __author__ = "infirit"
+    __icon__ = "utilities-system-monitor"
+    __description__ = _("Keeps a history of the data each adapter sent and received, so it can be "
+                        "queried over D-Bus for analysis.")
+    __autoload__ = False
+
+    def on_load(self) -> None:
+        self._pollers: Dict[str, StatsPoller] = {}
+
+        self._add_dbus_method("GetThroughputHistory", ("s",), "a(udadad)", self._get_history)
+
+    def on_unload(self) -> None:
+        for path in list(self._pollers):
+            self.on_adapter_removed(path)
+
+    def on_manager_state_changed(self, state: bool) -> None:
+        if state:
+            for adapter in self.parent.Manager.get_adapters():
+                self.on_adapter_added(adapter.get_object_path())
+        else:
+            self.on_unload()
+
+    def on_adapter_added(self, path: str) -> None:
+        name = adapter_path_to_name(path)
+        if name is None or path in self._pollers:
+            return
+
+        history = ThroughputHistory.get_instance(name)
+        poller = StatsPoller(read_counters)
+        poller.connect_signal("update", lambda _poller, tx, rx, _up, _down: history.add(tx, rx))
+        poller.set_adapter(name)
+        self._pollers[path] = poller
+
+    def on_adapter_removed(self, path: str) -> None:
+        poller = self._pollers.pop(path, None)
+        if poller is not None:
+            poller.stop()
+
+    def _get_history(self, adapter_name: str) -> List[SeriesRow]:
+        if adapter_name not in (adapter_path_to_name(path) for path in self._pollers):
+            raise NoSuchAdapterError(f"No history of {adapter_name}")
+        return ThroughputHistory.get_instance(adapter_name).export()
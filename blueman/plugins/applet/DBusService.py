@@ -4,6 +4,7 @@ from typing import Callable, Union
 from _blueman import RFCOMMError
 from gi.repository import GLib
 
+from blueman import DBusStats
 from blueman.Service import Service
 from blueman.bluez.errors import BluezDBusException
 from blueman.main.NetworkManager import NMConnectionError
@@ -53,6 +54,7 @@ class DBusService(AppletPlugin):
         self._add_dbus_method("ConnectService", ("o", "s"), "", self.connect_service, is_async=True)
         self._add_dbus_method("DisconnectService", ("o", "s", "d"), "", self._disconnect_service, is_async=True)
         self._add_dbus_method("OpenPluginDialog", (), "", self._open_plugin_dialog)
+        self._add_dbus_method("GetDBusStats", (), "a(ssssuddau)", DBusStats.snapshot)
 
     def connect_service(self, object_path: str, uuid: str, ok: Callable[[], None],
                         err: Callable[[Union[BluezDBusException, NMConnectionError,
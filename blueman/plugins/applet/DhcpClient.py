@@ -18,7 +18,7 @@ class DhcpClient(AppletPlugin):
     _any_network = None
 
     def on_load(self) -> None:
-        self._any_network = AnyNetwork()
+        self._any_network = AnyNetwork(properties=("Interface",))
         self._any_network.connect_signal('property-changed', self._on_network_prop_changed)
 
         self.quering: List[str] = []
@@ -1,10 +1,10 @@
 from gettext import gettext as _
+import time
 from typing import Any, Optional
 
 from blueman.bluez.Adapter import Adapter
 from blueman.bluez.errors import DBusNoSuchAdapterError
 from blueman.plugins.AppletPlugin import AppletPlugin
-from gi.repository import GLib
 import logging
 
 
@@ -36,38 +36,32 @@ class DiscvManager(AppletPlugin):
                                                  tooltip=_("Make the default adapter temporarily visible"),
                                                  callback=self.on_set_discoverable, visible=False)
         self.adapter = None
-        self.time_left = -1
-
-        self.timeout: Optional[int] = None
+        # When the adapter stops being discoverable, the menu counts down to it on its own
+        self.deadline: Optional[float] = None
+        # The text for clients that do not count down, fixed so that it does not change the menu on every update
+        self.deadline_text = ""
 
     def on_unload(self) -> None:
         self.parent.Plugins.Menu.unregister(self)
         del self.item
 
-        if self.timeout:
-            GLib.source_remove(self.timeout)
-
     def on_manager_state_changed(self, state: bool) -> None:
         if state:
             self.init_adapter()
             self.update_menuitems()
         else:
             self.adapter = None
+            self.deadline = None
             self.update_menuitems()
 
-    def on_update(self) -> bool:
-        self.time_left -= 1
-        self.item.set_text(_("Discoverable… %ss") % self.time_left)
-        self.item.set_sensitive(False)
-
-        return True
-
     def on_set_discoverable(self) -> None:
         if self.adapter:
             self.adapter.set("Discoverable", True)
             self.adapter.set("DiscoverableTimeout", self.get_option("time"))
 
     def init_adapter(self) -> None:
+        # A countdown of the previous adapter or bluetoothd instance does not apply anymore
+        self.deadline = None
         try:
             self.adapter = self.parent.Manager.get_adapter()
         except DBusNoSuchAdapterError:
@@ -92,25 +86,14 @@ class DiscvManager(AppletPlugin):
             logging.debug(f"prop {key} {value}")
             if key == "DiscoverableTimeout":
                 if value == 0:  # always visible
-                    if self.timeout is not None:
-                        GLib.source_remove(self.timeout)
-                    self.time_left = -1
-                    self.timeout = None
+                    self.deadline = None
                 else:
-                    if self.time_left > -1:
-                        if self.timeout is not None:
-                            GLib.source_remove(self.timeout)
-                    self.time_left = value
-
-                    self.timeout = GLib.timeout_add(1000, self.on_update)
-                    return
+                    self.deadline = time.time() + value
+                    self.deadline_text = _("Discoverable… %ss") % value
 
             elif (key == "Discoverable" and not value) or (key == "Powered" and not value):
                 logging.info("Stop")
-                if self.timeout is not None:
-                    GLib.source_remove(self.timeout)
-                self.time_left = -1
-                self.timeout = None
+                self.deadline = None
 
             self.update_menuitems()
 
@@ -118,9 +101,15 @@ class DiscvManager(AppletPlugin):
         if self.adapter is None:
             logging.warning("warning: Adapter is None")
             self.item.set_visible(False)
+        elif self.deadline is not None and self.deadline > time.time():
+            self.item.set_visible(True)
+            self.item.set_text(self.deadline_text)
+            self.item.set_countdown(_("Discoverable… %ss"), self.deadline)
+            self.item.set_sensitive(False)
         elif (not self.adapter["Discoverable"] or self.adapter["DiscoverableTimeout"] > 0) and self.adapter["Powered"]:
             self.item.set_visible(True)
             self.item.set_text(_("_Make Discoverable"))
+            self.item.set_countdown(None)
             self.item.set_sensitive(True)
         else:
             self.item.set_visible(False)
@@ -1,9 +1,11 @@
+from difflib import SequenceMatcher
 from gettext import gettext as _
 from typing import List, Union, Iterable, Dict, Optional, Callable, \
     TYPE_CHECKING, Tuple, Iterator, Mapping, Sequence
 
 from gi.repository import GLib
 
+from blueman.main.MenuProtocol import MENU_PROTOCOL, MenuPatch
 from blueman.plugins.AppletPlugin import AppletPlugin
 from operator import attrgetter
 
@@ -20,6 +22,11 @@ if TYPE_CHECKING:
 
     class MenuItemDict(SubmenuItemDict, total=False):
         submenu: Iterable["SubmenuItemDict"]
+        deadline: float
+        countdown: str
+
+ItemValue = Union[str, bool, float]
+ItemData = Dict[str, Union[ItemValue, List[Dict[str, ItemValue]]]]
 
 
 class MenuItem:
@@ -37,6 +44,8 @@ class MenuItem:
         self._submenu_function = submenu_function
         self._visible = visible
         self._sensitive = sensitive
+        self._countdown: Optional[str] = None
+        self._deadline: Optional[float] = None
 
         assert text and icon_name and (callback or submenu_function) or \
             not any([text, icon_name, tooltip, callback, submenu_function])
@@ -57,13 +66,13 @@ class MenuItem:
     def visible(self) -> bool:
         return self._visible
 
-    def _iter_base(self) -> Iterator[Tuple[str, Union[str, bool]]]:
-        for key in ['text', 'markup', 'icon_name', 'tooltip', 'sensitive']:
+    def _iter_base(self) -> Iterator[Tuple[str, ItemValue]]:
+        for key in ['text', 'markup', 'icon_name', 'tooltip', 'sensitive', 'countdown', 'deadline']:
             value = getattr(self, '_' + key)
             if value is not None:
                 yield key, value
 
-    def __iter__(self) -> Iterator[Tuple[str, Union[str, bool, List[Dict[str, Union[str, bool]]]]]]:
+    def __iter__(self) -> Iterator[Tuple[str, Union[ItemValue, List[Dict[str, ItemValue]]]]]:
         yield from self._iter_base()
         submenu = list(self.submenu_items)
         if submenu:
@@ -103,9 +112,16 @@ class MenuItem:
         self._sensitive = sensitive
         self._menu_plugin.on_menu_changed()
 
+    def set_countdown(self, text_format: Optional[str], deadline: Optional[float] = None) -> None:
+        """Show text_format formatted with the seconds left until deadline, a time.time() timestamp, instead of
+        the text. Clients tick the countdown on their own, the text remains for clients that cannot."""
+        self._countdown = text_format
+        self._deadline = deadline if text_format is not None else None
+        self._menu_plugin.on_menu_changed()
+
 
 class SubmenuItem(MenuItem):
-    def __iter__(self) -> Iterator[Tuple[str, Union[str, bool]]]:
+    def __iter__(self) -> Iterator[Tuple[str, ItemValue]]:
         yield from self._iter_base()
 
 
@@ -119,9 +135,15 @@ class Menu(AppletPlugin):
         self.__plugins_loaded = False
 
         self.__menuitems: List[MenuItem] = []
+        self.__idle_id: Optional[int] = None
+        # The menu as last announced to the clients and its revision
+        self.__announced: List[Tuple[MenuItem, ItemData]] = []
+        self.__revision = 0
 
         self._add_dbus_signal("MenuChanged", "aa{sv}")
+        self._add_dbus_signal("MenuPatched", "(ua(sua{sv}))")
         self._add_dbus_method("GetMenu", (), "aa{sv}", self._get_menu)
+        self._add_dbus_method("GetMenuSnapshot", (), "(uuaa{sv})", self.get_snapshot)
         self._add_dbus_method("ActivateMenuItem", ("ai",), "", self._activate_menu_item)
 
     def __sort(self) -> None:
@@ -151,24 +173,64 @@ class Menu(AppletPlugin):
         self.__sort()
 
     def on_menu_changed(self) -> None:
-        self._emit_dbus_signal("MenuChanged", self._get_menu())
+        """Announce the menu once for all changes until the main loop is idle again"""
+        if self.__idle_id is None:
+            self.__idle_id = GLib.idle_add(self._on_idle)
+
+    def _on_idle(self) -> bool:
+        self.__idle_id = None
+
+        current = [(item, dict(item)) for item in self.__menuitems if item.visible]
+        patches = self._diff(self.__announced, current)
+        self.__announced = current
+        if patches:
+            self.__revision += 1
+            self._emit_dbus_signal("MenuPatched", (self.__revision, patches))
+            self._emit_dbus_signal("MenuChanged", self._prepare_menu(data for _item, data in current))
+        return False
+
+    def _diff(self, old: Sequence[Tuple[MenuItem, ItemData]], new: Sequence[Tuple[MenuItem, ItemData]]) \
+            -> List[MenuPatch]:
+        """Patches that turn the old menu into the new one when applied in order"""
+        matcher = SequenceMatcher(None, [item for item, _data in old], [item for item, _data in new], autojunk=False)
+        patches: List[MenuPatch] = []
+        # Back to front, so the indexes of the items in front of a patch are still valid when it is applied
+        for tag, i1, i2, j1, j2 in reversed(matcher.get_opcodes()):
+            if tag == "equal":
+                for offset in range(i2 - i1):
+                    data = new[j1 + offset][1]
+                    if data != old[i1 + offset][1]:
+                        patches.append(("update", i1 + offset, self._prepare_menu([data])[0]))
+                continue
+
+            for index in reversed(range(i1, i2)):
+                patches.append(("remove", index, {}))
+            for offset in range(j2 - j1):
+                patches.append(("insert", i1 + offset, self._prepare_menu([new[j1 + offset][1]])[0]))
+        return patches
 
     def _get_menu(self) -> List[Dict[str, GLib.Variant]]:
         return self._prepare_menu(dict(item) for item in self.__menuitems if item.visible)
 
-    def _prepare_menu(self, data: Iterable[Mapping[str, Union[str, bool, Iterable[Mapping[str, Union[str, bool]]]]]]) \
+    def get_snapshot(self) -> Tuple[int, int, List[Dict[str, GLib.Variant]]]:
+        """The protocol version, revision and menu as last announced to the clients"""
+        return MENU_PROTOCOL, self.__revision, self._prepare_menu(data for _item, data in self.__announced)
+
+    def _prepare_menu(self, data: Iterable[Mapping[str, Union[ItemValue, Iterable[Mapping[str, ItemValue]]]]]) \
             -> List[Dict[str, GLib.Variant]]:
         return [{k: self._build_variant(v) for k, v in item.items()} for item in data]
 
-    def _build_variant(self, value: Union[str, bool, Iterable[Mapping[str, Union[str, bool]]]]) -> GLib.Variant:
+    def _build_variant(self, value: Union[ItemValue, Iterable[Mapping[str, ItemValue]]]) -> GLib.Variant:
         if isinstance(value, str):
             return GLib.Variant("s", value)
         if isinstance(value, bool):
             return GLib.Variant("b", value)
+        if isinstance(value, float):
+            return GLib.Variant("d", value)
         return GLib.Variant("aa{sv}", self._prepare_menu(value))
 
     def _activate_menu_item(self, indexes: Sequence[int]) -> None:
-        node = [item for item in self.__menuitems if item.visible][indexes[0]]
+        node = self.__announced[indexes[0]][0]
         for index in list(indexes)[1:]:
             node = [item for item in node.submenu_items if item.visible][index]
         if node.callback:
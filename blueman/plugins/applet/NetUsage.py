@@ -3,12 +3,14 @@ import time
 import datetime
 from gettext import gettext as _, ngettext
 import logging
-from typing import List, Any, Optional
+from typing import List, Any, Optional, TYPE_CHECKING
 
+from _blueman import DisconnectionComplete
 from blueman.Functions import *
 from blueman.main.Builder import Builder
 from blueman.plugins.AppletPlugin import AppletPlugin
 from blueman.main.Config import Config
+from blueman.main.HciMonitor import HciMonitor
 from blueman.bluez.Device import Device
 from blueman.bluez.Network import AnyNetwork
 from gi.repository import GObject
@@ -19,6 +21,9 @@ import gi
 from blueman.plugins.applet.PPPSupport import PPPConnectedListener
 from blueman.bluemantyping import GSignals
 
+if TYPE_CHECKING:
+    from _blueman import HciEvent
+
 gi.require_version("Gtk", "3.0")
 from gi.repository import Gtk
 from gi.repository import Pango
@@ -68,16 +73,46 @@ class MonitorBase(GObject.GObject):
 
 
 class Monitor(MonitorBase):
+    POLL_INTERVAL = 5000
+
     def __init__(self, device: Device, interface: str):
         super().__init__(device, interface)
-        self.poller = None
+        self.poller: Optional[int] = None
         self.ppp_port = None
 
-        self.poller = GLib.timeout_add(5000, self.poll_stats)
+        self._address = device["Address"]
+        self._hci_monitor: Optional[HciMonitor] = None
+        self._hci_handler = 0
+        adapter_name = adapter_path_to_name(device["Adapter"])
+        if adapter_name is not None:
+            self._hci_monitor = HciMonitor.get_instance(adapter_name)
+            self._hci_handler = self._hci_monitor.connect_signal("event", self._on_hci_event)
+
+        self._start_polling()
 
     def __del__(self) -> None:
         logging.debug("deleting monitor")
 
+    def _start_polling(self) -> None:
+        self.poller = GLib.timeout_add(self.POLL_INTERVAL, self.poll_stats)
+
+    def _on_hci_event(self, _monitor: HciMonitor, event: "HciEvent") -> None:
+        if event.address != self._address or self.poller is None:
+            return
+
+        if isinstance(event, DisconnectionComplete):
+            # Take the final totals now, the interface goes away with the link
+            GLib.source_remove(self.poller)
+            self.poller = None
+            if self.poll_stats():
+                self._start_polling()
+
+    def disconnect_monitor(self) -> None:
+        if self._hci_monitor is not None:
+            self._hci_monitor.disconnect_signal(self._hci_handler)
+            self._hci_monitor = None
+        super().disconnect_monitor()
+
     def poll_stats(self) -> bool:
         try:
             with open(f"/sys/class/net/{self.interface}/statistics/tx_bytes") as f:
@@ -301,7 +336,7 @@ class NetUsage(AppletPlugin, GObject.GObject, PPPConnectedListener):
         GObject.GObject.__init__(self)
         self.monitors: List[Monitor] = []
 
-        self._any_network = AnyNetwork()
+        self._any_network = AnyNetwork(properties=("Interface",))
         self._any_network.connect_signal('property-changed', self._on_network_property_changed)
 
         self.parent.Plugins.Menu.add(self, 84, text=_("Network _Usage"), icon_name="network-wireless",
@@ -1,5 +1,5 @@
 from gettext import gettext as _
-from typing import Optional
+from typing import Dict, Optional
 
 from gi.repository import GObject, GLib
 
@@ -54,6 +54,7 @@ class StatusIcon(AppletPlugin, GObject.GObject):
         self._add_dbus_method("GetStatusIconImplementation", (), "s", self._get_status_icon_implementation)
         self._add_dbus_method("GetIconName", (), "s", self._get_icon_name)
         self._add_dbus_method("Activate", (), "", lambda: self.emit("activate"))
+        self._add_dbus_method("GetState", (), "a{sv}", self._get_state)
 
     def query_visibility(self, delay_hiding: bool = False, emit: bool = True) -> None:
         if self.parent.Manager.get_adapters() or \
@@ -112,6 +113,19 @@ class StatusIcon(AppletPlugin, GObject.GObject):
         if self.parent.manager_state:
             launch('blueman-tray', icon_name='blueman', sn=False)
 
+    def _get_state(self) -> Dict[str, GLib.Variant]:
+        """Everything the tray shows in one reply"""
+        protocol, revision, menu = self.parent.Plugins.Menu.get_snapshot()
+        return {
+            "Implementation": GLib.Variant("s", self._get_status_icon_implementation()),
+            "IconName": GLib.Variant("s", self._get_icon_name()),
+            "Text": GLib.Variant("s", self._get_text()),
+            "Visibility": GLib.Variant("b", bool(self.visible)),
+            "MenuProtocol": GLib.Variant("u", protocol),
+            "MenuRevision": GLib.Variant("u", revision),
+            "Menu": GLib.Variant("aa{sv}", menu),
+        }
+
     def _get_status_icon_implementation(self) -> str:
         for plugin in self.parent.Plugins.get_loaded_plugins(StatusIconImplementationProvider):
             implementation = plugin.on_query_status_icon_implementation()
@@ -2,12 +2,15 @@
 # coding=utf-8
 #cython: language_level=3
 import logging
+from collections import namedtuple
 
 cdef extern from "malloc.h":
+    cdef void* malloc(size_t size)
     cdef void free(void *ptr)
 
 cdef extern from "string.h":
     cdef char* strerror(int errnum)
+    cdef char* strncpy(char *dest, const char *src, size_t n)
 
 cdef extern from "bluetooth/bluetooth.h":
     ctypedef struct bdaddr_t:
@@ -52,6 +55,19 @@ cdef extern from "bluetooth/hci.h":
 
         hci_dev_stats stat
 
+    cdef struct hci_conn_info:
+        unsigned short handle
+        bdaddr_t bdaddr
+        unsigned char type
+        unsigned char out
+        unsigned short state
+        unsigned int link_mode
+
+    cdef struct hci_conn_list_req:
+        unsigned short dev_id
+        unsigned short conn_num
+        hci_conn_info conn_info[0]
+
 
 
 cdef extern from "bluetooth/hci_lib.h":
@@ -84,6 +100,41 @@ cdef extern from "libblueman.h":
     cdef int connection_get_lq(conn_info_handles *ci, unsigned char *ret_lq)
     cdef int connection_get_tpl(conn_info_handles *ci, signed char *ret_tpl, unsigned char type)
     cdef int connection_close(conn_info_handles *ci)
+
+    cdef int CONN_INFO_RSSI
+    cdef int CONN_INFO_LQ
+    cdef int CONN_INFO_TPL
+
+    cdef struct conn_info_sample:
+        char addr[18]
+        signed char rssi
+        unsigned char lq
+        signed char tpl
+        int result
+
+    cdef int ERR_NO_EVENT
+
+    cdef struct hci_monitor_event:
+        unsigned char evt
+        unsigned char status
+        unsigned short handle
+        char addr[18]
+        unsigned char link_type
+        unsigned char value
+
+    cdef int conn_info_open(int dev_id)
+    cdef int conn_info_read_all(int dd, int dev_id, conn_info_sample *samples, int count) nogil
+    cdef void conn_info_close(int dd)
+    cdef int hci_monitor_open(int dev_id)
+    cdef int hci_monitor_read(int fd, hci_monitor_event *event)
+    cdef int hci_monitor_connections(int fd, int dev_id, hci_conn_list_req **result)
+    cdef void hci_monitor_close(int fd)
+    cdef void fake_hci_enable(int enable)
+    cdef int fake_hci_add_connection(char *addr, unsigned short handle, int le, signed char rssi, unsigned char lq,
+                                     signed char tpl)
+    cdef int fake_hci_event(const void *packet, int len)
+    cdef void fake_hci_reset()
+    cdef int fake_hci_requests()
     cdef int c_get_rfcomm_channel "get_rfcomm_channel" (unsigned short service_class, char* btd_addr)
     cdef int get_rfcomm_list(rfcomm_dev_list_req **ret)
     cdef int c_create_rfcomm_device "create_rfcomm_device" (char *local_address, char *remote_address, int channel)
@@ -111,7 +162,9 @@ ERR = {
     -12: "Can't bind RFCOMM socket",
     -13: "Can't connect RFCOMM socket",
     -14: "Can't create RFCOMM TTY",
-    -15: "Can't release RFCOMM TTY"
+    -15: "Can't release RFCOMM TTY",
+    -16: "No HCI event",
+    -17: "Reading HCI events failed"
     }
 
 RFCOMM_STATES = [
@@ -269,6 +322,203 @@ cdef class conn_info:
 
         return tpl
 
+cdef class conn_info_reader:
+    """Reads RSSI, link quality and transmit power level of many connections over one HCI socket"""
+    cdef int dev_id
+    cdef int dd
+
+    def __cinit__(self):
+        self.dd = -1
+
+    def __init__(self, py_hci_name="hci0"):
+        self.dev_id = int(py_hci_name[3:])
+        res = conn_info_open(self.dev_id)
+        if res < 0:
+            raise ConnInfoReadError(ERR[res])
+        self.dd = res
+
+    def __dealloc__(self):
+        if self.dd >= 0:
+            conn_info_close(self.dd)
+
+    def close(self):
+        if self.dd >= 0:
+            conn_info_close(self.dd)
+            self.dd = -1
+
+    def read(self, addresses):
+        """One (rssi, lq, tpl) tuple per address, None for values that could not be read
+        and instead of the tuple if there is no ACL link to the address"""
+        addresses = [address.encode("UTF-8") for address in addresses]
+        cdef int count = len(addresses)
+        cdef int res
+        cdef int i
+        cdef conn_info_sample *samples
+
+        if self.dd < 0:
+            raise ConnInfoReadError(ERR[-2])
+        if count == 0:
+            return []
+
+        samples = <conn_info_sample *> malloc(count * sizeof(conn_info_sample))
+        if samples == NULL:
+            raise MemoryError()
+
+        try:
+            for i in range(count):
+                py_bytes_addr = addresses[i]
+                strncpy(samples[i].addr, py_bytes_addr, 17)
+                samples[i].addr[17] = 0
+
+            with nogil:
+                res = conn_info_read_all(self.dd, self.dev_id, samples, count)
+
+            if res < 0:
+                raise ConnInfoReadError(ERR[res])
+
+            values = []
+            for i in range(count):
+                if samples[i].result < 0:
+                    values.append(None)
+                    continue
+
+                rssi = lq = tpl = None
+                if samples[i].result & CONN_INFO_RSSI:
+                    rssi = samples[i].rssi
+                if samples[i].result & CONN_INFO_LQ:
+                    lq = samples[i].lq
+                if samples[i].result & CONN_INFO_TPL:
+                    tpl = samples[i].tpl
+                values.append((rssi, lq, tpl))
+            return values
+        finally:
+            free(samples)
+
+HCI_EVT_CONN_COMPLETE = 0x03
+HCI_EVT_DISCONN_COMPLETE = 0x05
+HCI_EVT_ENCRYPT_CHANGE = 0x08
+
+HCI_SCO_LINK = 0x00
+HCI_ACL_LINK = 0x01
+HCI_ESCO_LINK = 0x02
+
+# The events of hci_monitor, address is None for handles the monitor does not know
+ConnectionComplete = namedtuple("ConnectionComplete", ["status", "handle", "address", "link_type", "encrypted"])
+DisconnectionComplete = namedtuple("DisconnectionComplete", ["status", "handle", "address", "link_type", "reason"])
+EncryptionChange = namedtuple("EncryptionChange", ["status", "handle", "address", "encrypted"])
+
+class HciMonitorError(Exception):
+    pass
+
+cdef class hci_monitor:
+    """Connection complete, disconnection complete and encryption change events of an adapter.
+
+    The socket does not block, watch fileno() for input, e.g. with GLib.io_add_watch, and call read()
+    to get the parsed events. The addresses of the connection handles are remembered from the
+    connections at startup and from connection complete events."""
+    cdef int dev_id
+    cdef int fd
+    cdef dict links
+
+    def __cinit__(self):
+        self.fd = -1
+
+    def __init__(self, py_hci_name="hci0"):
+        cdef hci_conn_list_req *cl
+        cdef char addr[18]
+
+        self.dev_id = int(py_hci_name[3:])
+        self.links = {}
+
+        res = hci_monitor_open(self.dev_id)
+        if res < 0:
+            raise HciMonitorError(ERR[res])
+        self.fd = res
+
+        # Events only tell about connections made from now on
+        if hci_monitor_connections(self.fd, self.dev_id, &cl) > 0:
+            for i in range(cl.conn_num):
+                ba2str(&cl.conn_info[i].bdaddr, addr)
+                self.links[cl.conn_info[i].handle] = (addr.decode("UTF-8"), cl.conn_info[i].type)
+            free(cl)
+
+    def __dealloc__(self):
+        if self.fd >= 0:
+            hci_monitor_close(self.fd)
+
+    def fileno(self):
+        return self.fd
+
+    def close(self):
+        if self.fd >= 0:
+            hci_monitor_close(self.fd)
+            self.fd = -1
+
+    def connections(self):
+        """(handle, address, link type) of every known connection"""
+        return [(handle, address, link_type) for handle, (address, link_type) in self.links.items()]
+
+    def read(self):
+        """All events received since the last call, without blocking"""
+        cdef hci_monitor_event event
+        cdef int res
+
+        if self.fd < 0:
+            raise HciMonitorError(ERR[-2])
+
+        events = []
+        while True:
+            res = hci_monitor_read(self.fd, &event)
+            if res == ERR_NO_EVENT:
+                break
+            elif res < 0:
+                if events:
+                    break
+                raise HciMonitorError(ERR[res])
+            elif res > 0:
+                events.append(self._parse(&event))
+        return events
+
+    cdef object _parse(self, hci_monitor_event *event):
+        address, link_type = self.links.get(event.handle, (None, None))
+
+        if event.evt == HCI_EVT_CONN_COMPLETE:
+            address = event.addr.decode("UTF-8")
+            if event.status == 0:
+                self.links[event.handle] = (address, event.link_type)
+            return ConnectionComplete(event.status, event.handle, address, event.link_type, bool(event.value))
+        elif event.evt == HCI_EVT_DISCONN_COMPLETE:
+            if event.status == 0:
+                self.links.pop(event.handle, None)
+            return DisconnectionComplete(event.status, event.handle, address, link_type, event.value)
+        else:
+            return EncryptionChange(event.status, event.handle, address, bool(event.value))
+
+def _fake_hci(connections):
+    """For tests: replace the HCI layer of conn_info_reader and hci_monitor with connections, a list of
+    (address, handle, le, rssi, lq, tpl) tuples, or restore the real layer if connections is None"""
+    fake_hci_reset()
+    if connections is None:
+        fake_hci_enable(0)
+        return
+
+    fake_hci_enable(1)
+    for address, handle, le, rssi, lq, tpl in connections:
+        py_bytes_addr = address.encode("UTF-8")
+        if fake_hci_add_connection(py_bytes_addr, handle, le, rssi, lq, tpl) < 0:
+            raise MemoryError("Too many fake connections")
+
+def _fake_hci_event(packet):
+    """For tests: send a raw HCI packet to the last hci_monitor opened on the fake layer"""
+    py_bytes_packet = bytes(packet)
+    cdef const char *data = py_bytes_packet
+    if fake_hci_event(data, len(py_bytes_packet)) < 0:
+        raise HciMonitorError("No fake monitor")
+
+def _fake_hci_requests():
+    """For tests: the number of HCI requests the fake layer answered"""
+    return fake_hci_requests()
+
 def page_timeout(py_hci_name="hci0"):
     py_bytes_hci_name = py_hci_name.encode("UTF-8")
     cdef char* hci_name = py_bytes_hci_name
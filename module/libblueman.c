@@ -132,6 +132,249 @@ int _destroy_bridge(const char* name) {
 	return 0;
 }
 
+/* The HCI calls used for connection info, replaced by the fake below in tests */
+struct hci_ops {
+	int (*open_dev)(int dev_id);
+	int (*close_dev)(int dd);
+	int (*get_conn_list)(int dd, struct hci_conn_list_req *cl);
+	int (*read_rssi)(int dd, uint16_t handle, int8_t *rssi, int to);
+	int (*read_link_quality)(int dd, uint16_t handle, uint8_t *lq, int to);
+	int (*read_transmit_power_level)(int dd, uint16_t handle, uint8_t type, int8_t *level, int to);
+	int (*open_monitor)(int dev_id);
+};
+
+static int real_get_conn_list(int dd, struct hci_conn_list_req *cl)
+{
+	return ioctl(dd, HCIGETCONNLIST, (void *) cl);
+}
+
+/* A raw HCI socket of dev_id that only receives the events hci_monitor_read handles */
+static int real_open_monitor(int dev_id)
+{
+	struct sockaddr_hci addr;
+	struct hci_filter flt;
+	int fd;
+
+	fd = socket(AF_BLUETOOTH, SOCK_RAW | SOCK_CLOEXEC | SOCK_NONBLOCK, BTPROTO_HCI);
+	if (fd < 0)
+		return ERR_SOCKET_FAILED;
+
+	/* Only events the kernel passes to sockets without CAP_NET_RAW, mode changes are not among them */
+	hci_filter_clear(&flt);
+	hci_filter_set_ptype(HCI_EVENT_PKT, &flt);
+	hci_filter_set_event(EVT_CONN_COMPLETE, &flt);
+	hci_filter_set_event(EVT_DISCONN_COMPLETE, &flt);
+	hci_filter_set_event(EVT_ENCRYPT_CHANGE, &flt);
+	if (setsockopt(fd, SOL_HCI, HCI_FILTER, &flt, sizeof(flt)) < 0) {
+		close(fd);
+		return ERR_SOCKET_FAILED;
+	}
+
+	memset(&addr, 0, sizeof(addr));
+	addr.hci_family = AF_BLUETOOTH;
+	addr.hci_dev = dev_id;
+	addr.hci_channel = HCI_CHANNEL_RAW;
+	if (bind(fd, (struct sockaddr *) &addr, sizeof(addr)) < 0) {
+		close(fd);
+		return ERR_BIND_FAILED;
+	}
+
+	return fd;
+}
+
+static const struct hci_ops real_hci = {
+	hci_open_dev,
+	hci_close_dev,
+	real_get_conn_list,
+	hci_read_rssi,
+	hci_read_link_quality,
+	hci_read_transmit_power_level,
+	real_open_monitor,
+};
+
+#define FAKE_HCI_MAX_CONNECTIONS 64
+
+struct fake_connection {
+	bdaddr_t bdaddr;
+	uint16_t handle;
+	uint8_t type;
+	int8_t rssi;
+	uint8_t lq;
+	int8_t tpl;
+};
+
+static struct fake_connection fake_connections[FAKE_HCI_MAX_CONNECTIONS];
+static int fake_connection_count = 0;
+static int fake_request_count = 0;
+/* The end of the socket pair of the last fake monitor that fake_hci_event writes to */
+static int fake_monitor_peer = -1;
+
+static int fake_open_dev(int dev_id)
+{
+	return dev_id < 0 ? -1 : 1000 + dev_id;
+}
+
+static int fake_close_dev(int dd)
+{
+	return 0;
+}
+
+static int fake_get_conn_list(int dd, struct hci_conn_list_req *cl)
+{
+	int i;
+
+	fake_request_count++;
+	for (i = 0; i < fake_connection_count && i < cl->conn_num; i++) {
+		bacpy(&cl->conn_info[i].bdaddr, &fake_connections[i].bdaddr);
+		cl->conn_info[i].handle = fake_connections[i].handle;
+		cl->conn_info[i].type = fake_connections[i].type;
+		cl->conn_info[i].out = 0;
+		cl->conn_info[i].state = 1;
+		cl->conn_info[i].link_mode = 0;
+	}
+	cl->conn_num = i;
+	return 0;
+}
+
+static struct fake_connection *fake_find(uint16_t handle)
+{
+	int i;
+
+	fake_request_count++;
+	for (i = 0; i < fake_connection_count; i++)
+		if (htobs(fake_connections[i].handle) == handle)
+			return &fake_connections[i];
+
+	errno = EIO;
+	return NULL;
+}
+
+static int fake_read_rssi(int dd, uint16_t handle, int8_t *rssi, int to)
+{
+	struct fake_connection *conn = fake_find(handle);
+	if (!conn)
+		return -1;
+	*rssi = conn->rssi;
+	return 0;
+}
+
+static int fake_read_link_quality(int dd, uint16_t handle, uint8_t *lq, int to)
+{
+	struct fake_connection *conn = fake_find(handle);
+	if (!conn)
+		return -1;
+	*lq = conn->lq;
+	return 0;
+}
+
+static int fake_read_transmit_power_level(int dd, uint16_t handle, uint8_t type, int8_t *level, int to)
+{
+	struct fake_connection *conn = fake_find(handle);
+	if (!conn)
+		return -1;
+	*level = conn->tpl;
+	return 0;
+}
+
+static int fake_open_monitor(int dev_id)
+{
+	int sv[2];
+
+	if (dev_id < 0 || socketpair(AF_UNIX, SOCK_SEQPACKET | SOCK_CLOEXEC | SOCK_NONBLOCK, 0, sv) < 0)
+		return ERR_SOCKET_FAILED;
+
+	if (fake_monitor_peer >= 0)
+		close(fake_monitor_peer);
+	fake_monitor_peer = sv[1];
+	return sv[0];
+}
+
+static const struct hci_ops fake_hci = {
+	fake_open_dev,
+	fake_close_dev,
+	fake_get_conn_list,
+	fake_read_rssi,
+	fake_read_link_quality,
+	fake_read_transmit_power_level,
+	fake_open_monitor,
+};
+
+static const struct hci_ops *hci = &real_hci;
+
+void fake_hci_enable(int enable)
+{
+	hci = enable ? &fake_hci : &real_hci;
+}
+
+int fake_hci_add_connection(const char *addr, uint16_t handle, int le, int8_t rssi, uint8_t lq, int8_t tpl)
+{
+	struct fake_connection *conn;
+
+	if (fake_connection_count == FAKE_HCI_MAX_CONNECTIONS)
+		return ERR_CANNOT_ALLOCATE;
+
+	conn = &fake_connections[fake_connection_count++];
+	str2ba(addr, &conn->bdaddr);
+	conn->handle = handle;
+	conn->type = le ? LE_LINK : ACL_LINK;
+	conn->rssi = rssi;
+	conn->lq = lq;
+	conn->tpl = tpl;
+	return 1;
+}
+
+/* Sends a raw HCI packet to the last opened fake monitor */
+int fake_hci_event(const void *packet, int len)
+{
+	if (fake_monitor_peer < 0)
+		return ERR_SOCKET_FAILED;
+	return write(fake_monitor_peer, packet, len) == len ? 1 : ERR_SOCKET_FAILED;
+}
+
+void fake_hci_reset(void)
+{
+	fake_connection_count = 0;
+	fake_request_count = 0;
+	if (fake_monitor_peer >= 0) {
+		close(fake_monitor_peer);
+		fake_monitor_peer = -1;
+	}
+}
+
+int fake_hci_requests(void)
+{
+	return fake_request_count;
+}
+
+/* Returns the connections of dev_id or NULL, the list grows until all connections fit */
+static struct hci_conn_list_req *get_conn_list(int s, int dev_id, int size)
+{
+	struct hci_conn_list_req *cl = NULL;
+
+	if (size < 1)
+		size = 1;
+
+	for (;;) {
+		free(cl);
+		if (!(cl = malloc(sizeof(*cl) + size * sizeof(struct hci_conn_info))))
+			return NULL;
+
+		cl->dev_id = dev_id;
+		cl->conn_num = size;
+
+		if (hci->get_conn_list(s, cl) < 0) {
+			free(cl);
+			return NULL;
+		}
+
+		/* A full list may have been truncated */
+		if (cl->conn_num < size || size >= 0xffff)
+			return cl;
+
+		size = size * 2 > 0xffff ? 0xffff : size * 2;
+	}
+}
+
 int find_conn(int s, int dev_id, long arg)
 {
 	struct hci_conn_list_req *cl;
@@ -139,28 +382,149 @@ int find_conn(int s, int dev_id, long arg)
 	int i;
 	int ret = 0;
 
-	if (!(cl = malloc(10 * sizeof(*ci) + sizeof(*cl))))
-		goto out;
+	if (!(cl = get_conn_list(s, dev_id, 10)))
+		return 0;
 
-	cl->dev_id = dev_id;
-	cl->conn_num = 10;
 	ci = cl->conn_info;
 
-	if (ioctl(s, HCIGETCONNLIST, (void *) cl))
-		goto out;
-
 	for (i = 0; i < cl->conn_num; i++, ci++)
 		if (!bacmp((bdaddr_t *) arg, &ci->bdaddr)) {
 			ret = 1;
-			goto out;
+			break;
 		}
 
-out:
 	free(cl);
 	return ret;
 }
 
+int conn_info_open(int dev_id)
+{
+	int dd = hci->open_dev(dev_id);
+	return dd < 0 ? ERR_HCI_DEV_OPEN_FAILED : dd;
+}
+
+void conn_info_close(int dd)
+{
+	hci->close_dev(dd);
+}
+
+/* Reads RSSI, link quality and transmit power level of all samples with one connection list request,
+ * does not need the GIL */
+int conn_info_read_all(int dd, int dev_id, struct conn_info_sample *samples, int count)
+{
+	struct hci_conn_list_req *cl;
+	struct hci_conn_info *ci;
+	bdaddr_t bdaddr;
+	uint16_t handle;
+	int i, j;
+
+	/* One more than asked for so the list is not full if only the asked for devices are connected */
+	if (!(cl = get_conn_list(dd, dev_id, count + 1)))
+		return ERR_GET_CONN_INFO_FAILED;
+
+	for (i = 0; i < count; i++) {
+		samples[i].result = ERR_NOT_CONNECTED;
+		str2ba(samples[i].addr, &bdaddr);
+
+		for (j = 0, ci = cl->conn_info; j < cl->conn_num; j++, ci++) {
+			if (ci->type != ACL_LINK || bacmp(&bdaddr, &ci->bdaddr))
+				continue;
+
+			handle = htobs(ci->handle);
+			samples[i].result = 0;
+			if (hci->read_rssi(dd, handle, &samples[i].rssi, 1000) >= 0)
+				samples[i].result |= CONN_INFO_RSSI;
+			if (hci->read_link_quality(dd, handle, &samples[i].lq, 1000) >= 0)
+				samples[i].result |= CONN_INFO_LQ;
+			if (hci->read_transmit_power_level(dd, handle, 0, &samples[i].tpl, 1000) >= 0)
+				samples[i].result |= CONN_INFO_TPL;
+			break;
+		}
+	}
+
+	free(cl);
+	return 1;
+}
+
+int hci_monitor_open(int dev_id)
+{
+	return hci->open_monitor(dev_id);
+}
+
+void hci_monitor_close(int fd)
+{
+	close(fd);
+}
 
+/* The connections of dev_id when the monitor starts, the caller frees *result */
+int hci_monitor_connections(int fd, int dev_id, struct hci_conn_list_req **result)
+{
+	if (!(*result = get_conn_list(fd, dev_id, 10)))
+		return ERR_GET_CONN_INFO_FAILED;
+	return 1;
+}
+
+/* Reads one packet without blocking, returns 1 if it was one of the monitored events,
+ * 0 for other packets and ERR_NO_EVENT if there is nothing to read */
+int hci_monitor_read(int fd, struct hci_monitor_event *event)
+{
+	unsigned char buf[HCI_MAX_EVENT_SIZE];
+	hci_event_hdr *hdr;
+	void *ptr;
+	ssize_t len;
+
+	len = read(fd, buf, sizeof(buf));
+	if (len < 0)
+		return errno == EAGAIN || errno == EWOULDBLOCK || errno == EINTR ? ERR_NO_EVENT : ERR_READ_EVENT_FAILED;
+	if (len == 0)
+		return ERR_READ_EVENT_FAILED;
+
+	if (len < 1 + HCI_EVENT_HDR_SIZE || buf[0] != HCI_EVENT_PKT)
+		return 0;
+
+	hdr = (hci_event_hdr *) (buf + 1);
+	ptr = buf + 1 + HCI_EVENT_HDR_SIZE;
+	len -= 1 + HCI_EVENT_HDR_SIZE;
+	if (len < hdr->plen)
+		return 0;
+
+	memset(event, 0, sizeof(*event));
+	event->evt = hdr->evt;
+
+	switch (hdr->evt) {
+	case EVT_CONN_COMPLETE: {
+		evt_conn_complete *ev = ptr;
+		if (hdr->plen < EVT_CONN_COMPLETE_SIZE)
+			return 0;
+		event->status = ev->status;
+		event->handle = btohs(ev->handle);
+		ba2str(&ev->bdaddr, event->addr);
+		event->link_type = ev->link_type;
+		event->value = ev->encr_mode;
+		return 1;
+	}
+	case EVT_DISCONN_COMPLETE: {
+		evt_disconn_complete *ev = ptr;
+		if (hdr->plen < EVT_DISCONN_COMPLETE_SIZE)
+			return 0;
+		event->status = ev->status;
+		event->handle = btohs(ev->handle);
+		event->value = ev->reason;
+		return 1;
+	}
+	case EVT_ENCRYPT_CHANGE: {
+		evt_encrypt_change *ev = ptr;
+		if (hdr->plen < EVT_ENCRYPT_CHANGE_SIZE)
+			return 0;
+		event->status = ev->status;
+		event->handle = btohs(ev->handle);
+		event->value = ev->encrypt;
+		return 1;
+	}
+	default:
+		return 0;
+	}
+}
 
 int connection_init(int dev_id, char *addr, struct conn_info_handles *ci)
 {
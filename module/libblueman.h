@@ -14,18 +14,57 @@
 #define ERR_CONNECT_FAILED -13
 #define ERR_CREATE_DEV_FAILED -14
 #define ERR_RELEASE_DEV_FAILED -15
+#define ERR_NO_EVENT -16
+#define ERR_READ_EVENT_FAILED -17
 
 struct conn_info_handles {
 	unsigned int handle;
 	int dd;
 };
 
+/* Flags of the values conn_info_read_all could read */
+#define CONN_INFO_RSSI 1
+#define CONN_INFO_LQ 2
+#define CONN_INFO_TPL 4
+
+struct conn_info_sample {
+	char addr[18];
+	int8_t rssi;
+	uint8_t lq;
+	int8_t tpl;
+	/* CONN_INFO_* flags or ERR_NOT_CONNECTED if there is no ACL link to addr */
+	int result;
+};
+
+/* An event of hci_monitor_read, addr is only set for connection complete events */
+struct hci_monitor_event {
+	uint8_t evt;
+	uint8_t status;
+	uint16_t handle;
+	char addr[18];
+	uint8_t link_type;
+	/* Encryption of connection and encryption change events, reason of disconnection events */
+	uint8_t value;
+};
+
 int find_conn(int s, int dev_id, long arg);
 int connection_init(int dev_id, char *addr, struct conn_info_handles *ci);
 int connection_get_rssi(struct conn_info_handles *ci, int8_t *ret_rssi);
 int connection_get_lq(struct conn_info_handles *ci, uint8_t *ret_lq);
 int connection_get_tpl(struct conn_info_handles *ci, int8_t *ret_tpl, uint8_t type);
 int connection_close(struct conn_info_handles *ci);
+int conn_info_open(int dev_id);
+int conn_info_read_all(int dd, int dev_id, struct conn_info_sample *samples, int count);
+void conn_info_close(int dd);
+int hci_monitor_open(int dev_id);
+int hci_monitor_read(int fd, struct hci_monitor_event *event);
+int hci_monitor_connections(int fd, int dev_id, struct hci_conn_list_req **result);
+void hci_monitor_close(int fd);
+void fake_hci_enable(int enable);
+int fake_hci_add_connection(const char *addr, uint16_t handle, int le, int8_t rssi, uint8_t lq, int8_t tpl);
+int fake_hci_event(const void *packet, int len);
+void fake_hci_reset(void);
+int fake_hci_requests(void);
 int get_rfcomm_channel(uint16_t uuid, char* btd_addr);
 int get_rfcomm_list(struct rfcomm_dev_list_req **result);
 int create_rfcomm_device(char *local_address, char *remote_address, int channel);
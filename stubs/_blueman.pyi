@@ -1,7 +1,13 @@
-from typing import List, Dict, Optional
+from typing import List, Dict, NamedTuple, Optional, Tuple, Union
 from typing_extensions import TypedDict
 
 ERR: Dict[int, str]
+HCI_ACL_LINK: int
+HCI_ESCO_LINK: int
+HCI_EVT_CONN_COMPLETE: int
+HCI_EVT_DISCONN_COMPLETE: int
+HCI_EVT_ENCRYPT_CHANGE: int
+HCI_SCO_LINK: int
 RFCOMM_HANGUP_NOW: int
 RFCOMM_RELEASE_ONHUP: int
 RFCOMM_REUSE_DLC: int
@@ -37,8 +43,32 @@ class BridgeException(Exception):
 
 class ConnInfoReadError(Exception): ...
 
+class HciMonitorError(Exception): ...
+
 class RFCOMMError(Exception): ...
 
+class ConnectionComplete(NamedTuple):
+    status: int
+    handle: int
+    address: str
+    link_type: int
+    encrypted: bool
+
+class DisconnectionComplete(NamedTuple):
+    status: int
+    handle: int
+    address: Optional[str]
+    link_type: Optional[int]
+    reason: int
+
+class EncryptionChange(NamedTuple):
+    status: int
+    handle: int
+    address: Optional[str]
+    encrypted: bool
+
+HciEvent = Union[ConnectionComplete, DisconnectionComplete, EncryptionChange]
+
 class conn_info:
     failed: bool
     def __init__(self, addr: str, hci_name: str) -> None: ...
@@ -48,6 +78,21 @@ class conn_info:
     def get_tpl(self) -> int: ...
     def init(self) -> None: ...
 
+class conn_info_reader:
+    def __init__(self, hci_name: str = "hci0") -> None: ...
+    def close(self) -> None: ...
+    def read(self, addresses: List[str]) -> List[Optional[Tuple[Optional[int], Optional[int], Optional[int]]]]: ...
+
+class hci_monitor:
+    def __init__(self, hci_name: str = "hci0") -> None: ...
+    def fileno(self) -> int: ...
+    def close(self) -> None: ...
+    def connections(self) -> List[Tuple[int, str, int]]: ...
+    def read(self) -> List[HciEvent]: ...
+
+def _fake_hci(connections: Optional[List[Tuple[str, int, bool, int, int, int]]]) -> None: ...
+def _fake_hci_event(packet: bytes) -> None: ...
+def _fake_hci_requests() -> int: ...
 def create_bridge(name: str = "pan1") -> None: ...
 def create_rfcomm_device(local_address: str, remote_address: str, channel: int) -> int: ...
 def destroy_bridge(name: str = "pan1") -> None: ...
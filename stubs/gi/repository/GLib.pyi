@@ -9,6 +9,10 @@ FlagsT = typing.TypeVar('FlagsT')
 
 class Error(RuntimeError):
     message: str
+    domain: str
+    code: int
+
+    def matches(self, domain: typing.Union[builtins.str, builtins.int], code: builtins.int) -> builtins.bool: ...
 
 
 class Array():
@@ -5988,7 +5988,7 @@ def bus_unwatch_name(watcher_id: builtins.int) -> None: ...
 def bus_watch_name(bus_type: BusType, name: builtins.str, flags: BusNameWatcherFlags, name_appeared_closure: typing.Optional[typing.Callable[[DBusConnection, str, str], None]], name_vanished_closure: typing.Optional[typing.Callable[[DBusConnection, str], None]]) -> builtins.int: ...
 
 
-def bus_watch_name_on_connection(connection: DBusConnection, name: builtins.str, flags: BusNameWatcherFlags, name_appeared_closure: typing.Optional[GObject.Closure], name_vanished_closure: typing.Optional[GObject.Closure]) -> builtins.int: ...
+def bus_watch_name_on_connection(connection: DBusConnection, name: builtins.str, flags: BusNameWatcherFlags, name_appeared_closure: typing.Optional[typing.Callable[[DBusConnection, str, str], None]], name_vanished_closure: typing.Optional[typing.Callable[[DBusConnection, str], None]]) -> builtins.int: ...
 
 
 def content_type_can_be_executable(type: builtins.str) -> builtins.bool: ...
@@ -2531,7 +2531,7 @@ class TreeSelection(GObject.Object):
 
 class TreeSortable(GObject.GInterface):
 
-    def get_sort_column_id(self) -> typing.Tuple[builtins.bool, builtins.int, SortType]: ...
+    def get_sort_column_id(self) -> typing.Union[typing.Tuple[builtins.int, SortType], typing.Tuple[None, None]]: ...
 
     def has_default_sort_func(self) -> builtins.bool: ...
 
@@ -0,0 +1,23 @@
+from unittest import TestCase
+
+from gi.repository import Gio, GLib
+
+from blueman.bluez.errors import parse_dbus_error, DBusFailedError, DBusTimeoutError, BluezDBusException
+
+
+class TestErrors(TestCase):
+    def test_remote_error(self):
+        error = parse_dbus_error(GLib.Error("GDBus.Error:org.bluez.Error.Failed: Input/output error"))
+        self.assertIsInstance(error, DBusFailedError)
+        self.assertEqual(error.reason, " Input/output error")
+
+    def test_timeout(self):
+        error = parse_dbus_error(GLib.Error.new_literal(Gio.io_error_quark(), "Timeout was reached",
+                                                        Gio.IOErrorEnum.TIMED_OUT))
+        self.assertIsInstance(error, DBusTimeoutError)
+
+    def test_local_error(self):
+        error = parse_dbus_error(GLib.Error.new_literal(Gio.io_error_quark(), "The connection is closed",
+                                                        Gio.IOErrorEnum.CLOSED))
+        self.assertIs(type(error), BluezDBusException)
+        self.assertEqual(error.reason, "The connection is closed")
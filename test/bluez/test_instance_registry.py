@@ -0,0 +1,49 @@
+import gc
+from unittest import TestCase
+
+from blueman.bluez.InstanceRegistry import InstanceRegistry
+
+
+class Proxy:
+    pass
+
+
+class TestInstanceRegistry(TestCase):
+    def setUp(self):
+        self.registry = InstanceRegistry("org.bluez.Device1", idle_limit=2)
+
+    def test_idle_held_weakly(self):
+        for i in range(10):
+            self.registry.add(f"/dev{i}", Proxy())
+        gc.collect()
+
+        self.assertEqual(self.registry.live, 2)
+        self.assertEqual(self.registry.peak, 2)
+        self.assertIsNone(self.registry.get("/dev0"))
+        self.assertIsNotNone(self.registry.get("/dev9"))
+
+    def test_pinned_kept(self):
+        self.registry.add("/dev0", Proxy())
+        self.registry.pin("/dev0")
+        for i in range(1, 10):
+            self.registry.add(f"/dev{i}", Proxy())
+        gc.collect()
+        self.assertIsNotNone(self.registry.get("/dev0"))
+
+        self.registry.unpin("/dev0")
+        for i in range(10, 20):
+            self.registry.add(f"/dev{i}", Proxy())
+        gc.collect()
+        self.assertIsNone(self.registry.get("/dev0"))
+
+    def test_evict_on_removal(self):
+        proxy = Proxy()
+        self.registry.add("/dev0", proxy)
+        self.registry.pin("/dev0")
+
+        self.registry.on_interfaces_removed("/dev0", ["org.bluez.MediaControl1"])
+        self.assertIs(self.registry.get("/dev0"), proxy)
+
+        self.registry.on_interfaces_removed("/dev0", ["org.bluez.Device1"])
+        self.assertIsNone(self.registry.get("/dev0"))
+        self.assertEqual(self.registry.stats(), {"live": 0, "evicted": 1, "peak": 1})
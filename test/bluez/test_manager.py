@@ -1,4 +1,7 @@
 from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from gi.repository import Gio, GLib
 
 from blueman.bluez.Manager import Manager
 from blueman.gobject import SingletonGObjectMeta
@@ -7,3 +10,80 @@ from blueman.gobject import SingletonGObjectMeta
 class TestManager(TestCase):
     def test_metaclass(self):
         self.assertIsInstance(Manager, SingletonGObjectMeta)
+
+
+def _device_object(adapter, index):
+    path = f"{adapter}/dev_{index:012X}"
+    address = ":".join(f"{index:012X}"[i:i + 2] for i in range(0, 12, 2))
+    props = {"Address": GLib.Variant("s", address), "Adapter": GLib.Variant("o", adapter)}
+
+    proxy = Mock(spec=Gio.DBusProxy)
+    proxy.get_object_path.return_value = path
+    proxy.get_cached_property.side_effect = props.get
+
+    dbus_object = Mock()
+    dbus_object.get_object_path.return_value = path
+    dbus_object.get_interface.side_effect = lambda name: proxy if name == "org.bluez.Device1" else None
+    return dbus_object
+
+
+class TestManagerIndex(TestCase):
+    DEVICES = 5000
+
+    def setUp(self):
+        self.objects = [_device_object(f"/org/bluez/hci{i % 2}", i) for i in range(self.DEVICES)]
+        object_manager = Mock()
+        object_manager.get_objects.return_value = self.objects
+
+        Manager._instance = None
+        with patch("gi.repository.Gio.DBusObjectManagerClient.new_for_bus_sync", return_value=object_manager), \
+                patch("blueman.bluez.Manager.PropertiesDispatcher"):
+            self.manager = Manager()
+
+        for dbus_object in self.objects:
+            dbus_object.get_interface("org.bluez.Device1").reset_mock()
+
+        device_patcher = patch("blueman.bluez.Manager.Device", side_effect=lambda obj_path: obj_path)
+        self.device = device_patcher.start()
+        self.addCleanup(device_patcher.stop)
+
+    def tearDown(self):
+        Manager._instance = None
+
+    def _assert_no_proxy_access(self):
+        for dbus_object in self.objects:
+            dbus_object.get_interface("org.bluez.Device1").get_cached_property.assert_not_called()
+
+    def test_find_device(self):
+        self.assertEqual(self.manager.find_device("00:00:00:00:0F:A1"), "/org/bluez/hci1/dev_000000000FA1")
+        self.assertEqual(self.manager.find_device("00:00:00:00:0F:A1", "/org/bluez/hci1"),
+                         "/org/bluez/hci1/dev_000000000FA1")
+        self.assertIsNone(self.manager.find_device("00:00:00:00:0F:A1", "/org/bluez/hci0"))
+        self.assertIsNone(self.manager.find_device("AA:BB:CC:DD:EE:FF"))
+        self.assertEqual(self.device.call_count, 2)
+        self._assert_no_proxy_access()
+
+    def test_get_devices(self):
+        self.assertEqual(len(self.manager.get_devices()), self.DEVICES)
+        self.assertEqual(len(self.manager.get_devices("/org/bluez/hci0")), self.DEVICES // 2)
+        self._assert_no_proxy_access()
+
+    def test_object_removed_and_address_changed(self):
+        path = "/org/bluez/hci0/dev_000000000002"
+        self.manager._on_device_address_changed(path, "org.bluez.Device1", {"Address": "11:22:33:44:55:66"}, [])
+        self.assertIsNone(self.manager.find_device("00:00:00:00:00:02"))
+        self.assertEqual(self.manager.find_device("11:22:33:44:55:66"), path)
+
+        self.manager._on_object_removed(None, self.objects[2])
+        self.assertIsNone(self.manager.find_device("11:22:33:44:55:66"))
+        self.assertEqual(len(self.manager.get_devices("/org/bluez/hci0")), self.DEVICES // 2 - 1)
+
+    def test_find_device_on_two_adapters(self):
+        path = "/org/bluez/hci1/dev_000000000002"
+        self.manager._on_object_added(None, _device_object("/org/bluez/hci1", 2))
+        # The device first known is found, no matter how the paths hash
+        self.assertEqual(self.manager.find_device("00:00:00:00:00:02"), "/org/bluez/hci0/dev_000000000002")
+        self.assertEqual(self.manager.find_device("00:00:00:00:00:02", "/org/bluez/hci1"), path)
+
+        self.manager._on_object_removed(None, self.objects[2])
+        self.assertEqual(self.manager.find_device("00:00:00:00:00:02"), path)
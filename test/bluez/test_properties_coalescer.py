@@ -0,0 +1,40 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from blueman.bluez.PropertiesCoalescer import PropertiesCoalescer
+
+
+@patch("gi.repository.GLib.source_remove")
+@patch("gi.repository.GLib.idle_add", return_value=1)
+class TestPropertiesCoalescer(TestCase):
+    def setUp(self):
+        self.callback = Mock()
+        self.coalescer = PropertiesCoalescer(self.callback)
+
+    def test_merge_per_object(self, idle_add, _source_remove):
+        for rssi in range(-90, -40):
+            self.coalescer.add("/org/bluez/hci0/dev_00_00_00_00_00_01", {"RSSI": rssi})
+            self.coalescer.add("/org/bluez/hci0/dev_00_00_00_00_00_02", {"RSSI": rssi, "TxPower": 4})
+        self.coalescer.add("/org/bluez/hci0/dev_00_00_00_00_00_02", {}, ["TxPower"])
+
+        self.assertEqual(idle_add.call_count, 1)
+        self.callback.assert_not_called()
+
+        self.coalescer._on_idle()
+        self.assertEqual(self.callback.call_count, 2)
+        self.callback.assert_any_call("/org/bluez/hci0/dev_00_00_00_00_00_01", {"RSSI": -41})
+        self.callback.assert_any_call("/org/bluez/hci0/dev_00_00_00_00_00_02", {"RSSI": -41})
+
+        self.coalescer.add("/org/bluez/hci0/dev_00_00_00_00_00_01", {"RSSI": -40})
+        self.assertEqual(idle_add.call_count, 2)
+
+    def test_flush_and_clear(self, _idle_add, source_remove):
+        self.coalescer.add("/org/bluez/hci0", {"Discovering": True})
+        self.coalescer.flush()
+        source_remove.assert_called_once_with(1)
+        self.callback.assert_called_once_with("/org/bluez/hci0", {"Discovering": True})
+
+        self.coalescer.add("/org/bluez/hci0", {"Discovering": False})
+        self.coalescer.clear()
+        self.coalescer.flush()
+        self.assertEqual(self.callback.call_count, 1)
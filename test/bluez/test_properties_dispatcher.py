@@ -0,0 +1,47 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from gi.repository import GLib
+
+from blueman.bluez.PropertiesDispatcher import PropertiesDispatcher
+
+
+class TestPropertiesDispatcher(TestCase):
+    def setUp(self):
+        self.bus = Mock()
+        with patch("gi.repository.Gio.bus_get_sync", return_value=self.bus):
+            self.dispatcher = PropertiesDispatcher(Mock(), "org.bluez")
+
+    def _emit(self, path, interface, changed):
+        param = GLib.Variant("(sa{sv}as)", (interface, {k: GLib.Variant("b", v) for k, v in changed.items()}, []))
+        self.dispatcher._on_signal(None, ":1.1", path, "org.freedesktop.DBus.Properties", "PropertiesChanged", param)
+
+    def test_single_match_per_interface(self):
+        self.dispatcher.add_listener("org.bluez.Device1", Mock())
+        self.dispatcher.add_listener("org.bluez.Device1", Mock())
+        self.dispatcher.add_listener("org.bluez.Adapter1", Mock())
+        self.assertEqual(self.bus.signal_subscribe.call_count, 2)
+
+    def test_unsubscribe_last(self):
+        first = self.dispatcher.add_listener("org.bluez.Device1", Mock())
+        second = self.dispatcher.add_listener("org.bluez.Device1", Mock())
+        self.dispatcher.remove_listener(first)
+        self.bus.signal_unsubscribe.assert_not_called()
+        self.dispatcher.remove_listener(second)
+        self.bus.signal_unsubscribe.assert_called_once()
+
+    def test_filters(self):
+        everything = Mock()
+        connected = Mock()
+        hci1 = Mock()
+        self.dispatcher.add_listener("org.bluez.Device1", everything)
+        self.dispatcher.add_listener("org.bluez.Device1", connected, properties=("Connected",))
+        self.dispatcher.add_listener("org.bluez.Device1", hci1, path_prefix="/org/bluez/hci1/")
+
+        self._emit("/org/bluez/hci0/dev_00_00_00_00_00_01", "org.bluez.Device1", {"Paired": True})
+        self._emit("/org/bluez/hci0/dev_00_00_00_00_00_01", "org.bluez.Device1", {"Connected": True, "Paired": True})
+
+        self.assertEqual(everything.call_count, 2)
+        connected.assert_called_once_with("/org/bluez/hci0/dev_00_00_00_00_00_01", "org.bluez.Device1",
+                                          {"Connected": True}, [])
+        hci1.assert_not_called()
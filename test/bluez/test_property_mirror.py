@@ -0,0 +1,93 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from gi.repository import GLib
+
+from blueman.bluez.PropertyMirror import PropertyMirror
+
+
+class TestPropertyMirror(TestCase):
+    def setUp(self):
+        self.bus = Mock()
+        self.bus.call_sync.return_value = GLib.Variant("(a{oa{sa{sv}}})", ({
+            "/org/bluez/hci0/dev_00_00_00_00_00_01": {
+                "org.bluez.Device1": {
+                    "Alias": GLib.Variant("s", "Mouse"),
+                    "Connected": GLib.Variant("b", False),
+                }
+            }
+        },))
+
+        with patch("gi.repository.Gio.bus_get_sync", return_value=self.bus), \
+                patch("gi.repository.Gio.bus_watch_name_on_connection"), \
+                patch("blueman.bluez.PropertyMirror.PropertiesDispatcher"):
+            self.mirror = PropertyMirror(Mock(), "org.bluez")
+
+    def test_seed_once(self):
+        props = self.mirror.get_interface_properties("/org/bluez/hci0/dev_00_00_00_00_00_01", "org.bluez.Device1")
+        self.assertEqual(props, {"Alias": "Mouse", "Connected": False})
+        self.mirror.get_interface_properties("/org/bluez/hci0/dev_00_00_00_00_00_01", "org.bluez.Device1")
+        self.assertEqual(self.bus.call_sync.call_count, 1)
+
+    def test_unknown_object(self):
+        self.assertIsNone(self.mirror.get_interface_properties("/org/bluez/hci1", "org.bluez.Adapter1"))
+
+    def test_properties_changed(self):
+        path = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+        self.mirror.get_interface_properties(path, "org.bluez.Device1")
+        self.mirror.update(path, "org.bluez.Device1", {"Connected": True}, ["Alias"])
+        self.assertEqual(self.mirror.get_interface_properties(path, "org.bluez.Device1"), {"Connected": True})
+
+    def test_interfaces_added_removed(self):
+        path = "/org/bluez/hci0/dev_00_00_00_00_00_02"
+        self.mirror.get_interface_properties(path, "org.bluez.Device1")
+        self.mirror._on_interfaces_added(
+            None, ":1.1", "/", "org.freedesktop.DBus.ObjectManager", "InterfacesAdded",
+            GLib.Variant("(oa{sa{sv}})", (path, {"org.bluez.Device1": {"Alias": GLib.Variant("s", "Phone")}})))
+        self.assertEqual(self.mirror.get_interface_properties(path, "org.bluez.Device1"), {"Alias": "Phone"})
+
+        self.mirror._on_interfaces_removed(
+            None, ":1.1", "/", "org.freedesktop.DBus.ObjectManager", "InterfacesRemoved",
+            GLib.Variant("(oas)", (path, ["org.bluez.Device1"])))
+        self.assertIsNone(self.mirror.get_interface_properties(path, "org.bluez.Device1"))
+
+    def test_name_vanished(self):
+        path = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+        self.mirror.get_interface_properties(path, "org.bluez.Device1")
+        self.mirror._on_name_vanished(None, "org.bluez")
+        self.mirror.get_interface_properties(path, "org.bluez.Device1")
+        self.assertEqual(self.bus.call_sync.call_count, 2)
+
+    def test_peek_seeds_in_background(self):
+        path = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+        self.assertIsNone(self.mirror.peek_interface_properties(path, "org.bluez.Device1"))
+        self.assertIsNone(self.mirror.peek_interface_properties(path, "org.bluez.Device1"))
+        self.bus.call_sync.assert_not_called()
+        self.assertEqual(self.bus.call.call_count, 1)
+
+        on_reply = self.bus.call.call_args[0][-2]
+        self.bus.call_finish.return_value = self.bus.call_sync.return_value
+        on_reply(self.bus, Mock(), None)
+        self.assertEqual(self.mirror.peek_interface_properties(path, "org.bluez.Device1"),
+                         {"Alias": "Mouse", "Connected": False})
+
+    def test_seed_failure(self):
+        path = "/org/bluez/hci0/dev_00_00_00_00_00_01"
+        snapshot = self.bus.call_sync.return_value
+        self.bus.call_sync.side_effect = GLib.Error.new_literal(GLib.quark_from_string("test"), "No reply", 0)
+
+        with self.assertLogs(level="WARNING") as logs:
+            for _read in range(3):
+                self.assertIsNone(self.mirror.get_interface_properties(path, "org.bluez.Device1"))
+                self.assertIsNone(self.mirror.peek_interface_properties(path, "org.bluez.Device1"))
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(self.bus.call_sync.call_count, 1)
+        self.bus.call.assert_not_called()
+
+        # A new owner gets a new snapshot
+        self.bus.call_sync.side_effect = None
+        self.bus.call_sync.return_value = snapshot
+        self.mirror._on_name_appeared(None, "org.bluez", ":1.2")
+        self.assertEqual(self.mirror.get_interface_properties(path, "org.bluez.Device1"),
+                         {"Alias": "Mouse", "Connected": False})
+        self.assertEqual(self.bus.call_sync.call_count, 2)
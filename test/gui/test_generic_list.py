@@ -0,0 +1,58 @@
+import sys
+from unittest import TestCase, skipUnless
+
+import gi
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+
+from blueman.gui.GenericList import GenericList
+
+
+@skipUnless(Gtk.init_check(sys.argv)[0], "no display")
+class TestGenericList(TestCase):
+    def setUp(self):
+        self.list = GenericList([
+            {"id": "name", "type": str, "indexed": True},
+            {"id": "kind", "type": str},
+            {"id": "value", "type": int},
+        ])
+        self.changes = []
+        self.list.liststore.connect("row-changed", lambda _model, path, _iter: self.changes.append(path))
+        for i in range(10):
+            self.list.append(name=f"row{i}", kind="even" if i % 2 == 0 else "odd", value=i)
+
+    def tearDown(self):
+        self.list.destroy()
+
+    def test_batched_set(self):
+        self.changes.clear()
+        self.list.set(3, name="three", kind="odd", value=33)
+        self.assertEqual(len(self.changes), 1)
+        self.assertEqual(self.list.get(3), {"name": "three", "kind": "odd", "value": 33})
+        self.assertEqual(self.list.get(3, "value", "unknown"), {"value": 33})
+
+    def test_indexed_lookup(self):
+        self.assertEqual(self.list.get_conditional(name="row4"), [4])
+        self.assertEqual(self.list.get_conditional(name="row4", kind="odd"), [])
+        self.assertEqual(self.list.get_conditional(kind="odd"), [1, 3, 5, 7, 9])
+
+    def test_index_follows_changes(self):
+        self.list.set(2, name="renamed")
+        self.assertEqual(self.list.get_conditional(name="row2"), [])
+        self.assertEqual(self.list.get_conditional(name="renamed"), [2])
+
+        self.list.delete(0)
+        self.assertEqual(self.list.get_conditional(name="renamed"), [1])
+        self.assertEqual(len(self.list.get_indexed("name", "row0")), 0)
+
+        tree_iter = self.list.prepend(name="row0", value=100)
+        self.assertTrue(self.list.compare(self.list.get_indexed("name", "row0")[0], tree_iter))
+
+        self.list.clear()
+        self.assertEqual(self.list.get_conditional(name="row5"), [])
+
+    def test_index_survives_sorting(self):
+        self.list.liststore.set_sort_column_id(self.list.ids["value"], Gtk.SortType.DESCENDING)
+        self.assertEqual(self.list.get_conditional(name="row9"), [0])
+        self.assertEqual(self.list.get_conditional(name="row0"), [9])
+        self.assertEqual(self.list.get(self.list.get_indexed("name", "row7")[0], "value"), {"value": 7})
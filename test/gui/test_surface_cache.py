@@ -0,0 +1,51 @@
+from unittest import TestCase
+
+from blueman.gui.SurfaceCache import SurfaceCache
+
+
+class TestSurfaceCache(TestCase):
+    def setUp(self):
+        self.rendered = []
+
+        def render(key):
+            self.rendered.append(key)
+            return object()
+
+        self.cache = SurfaceCache(render)
+
+    def test_lookup(self):
+        key = ("phone", True, False, False, 1, 48)
+        surface = self.cache.get(key)
+        for _ in range(24):
+            self.assertIs(self.cache.get(key), surface)
+
+        self.assertEqual(self.rendered, [key])
+        self.assertEqual((self.cache.hits, self.cache.misses), (24, 1))
+
+    def test_keys(self):
+        self.cache.get(("phone", True, False, False, 1, 48))
+        self.cache.get(("phone", True, True, False, 1, 48))
+        self.cache.get(("phone", True, False, False, 2, 48))
+        self.assertEqual(len(self.cache), 3)
+        self.assertEqual(self.cache.misses, 3)
+
+    def test_clear(self):
+        key = ("computer", False, False, True, 1, 48)
+        first = self.cache.get(key)
+        self.cache.clear()
+        self.assertNotIn(key, self.cache)
+        self.assertIsNot(self.cache.get(key), first)
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 2))
+
+        self.cache.reset_stats()
+        self.assertEqual((self.cache.hits, self.cache.misses), (0, 0))
+
+    def test_preload(self):
+        keys = [("rssi", level, 1) for level in range(10, 101, 10)]
+        self.cache.preload(keys)
+        self.assertEqual(self.rendered, keys)
+
+        self.cache.preload(keys)
+        self.cache.get(("rssi", 50, 1))
+        self.assertEqual(len(self.rendered), 10)
+        self.assertEqual((self.cache.hits, self.cache.misses), (1, 0))
@@ -0,0 +1,146 @@
+import sys
+from unittest import TestCase, skipUnless
+from unittest.mock import patch
+
+import gi
+gi.require_version("Gtk", "3.0")
+from gi.repository import Gtk
+
+from blueman.main.indicators.GtkStatusIcon import GtkStatusIcon, build_menu, patch_menu, update_countdowns
+
+
+def item(text, **kwargs):
+    return dict({"text": text, "markup": False, "icon_name": "blueman", "sensitive": True}, **kwargs)
+
+
+@skipUnless(Gtk.init_check(sys.argv)[0], "no display")
+class TestPatchMenu(TestCase):
+    def setUp(self):
+        self.activated = []
+        self.menu = build_menu([item("A"), {}, item("B")], lambda *indexes: self.activated.append(indexes))
+
+    def labels(self):
+        return [gtk_item.get_label() if isinstance(gtk_item, Gtk.ImageMenuItem) else None
+                for gtk_item in self.menu.get_children()]
+
+    def patch(self, *patches):
+        patch_menu(self.menu, patches, lambda *indexes: self.activated.append(indexes))
+
+    def test_update_in_place(self):
+        first = self.menu.get_children()[0]
+        self.patch(("update", 0, item("A2", tooltip="Tip", sensitive=False)))
+
+        self.assertIs(self.menu.get_children()[0], first)
+        self.assertEqual(self.labels(), ["A2", None, "B"])
+        self.assertEqual(first.get_tooltip_text(), "Tip")
+        self.assertFalse(first.get_sensitive())
+
+        self.patch(("update", 0, item("A3")))
+        self.assertIsNone(first.get_tooltip_text())
+
+    def test_insert_remove(self):
+        self.patch(("remove", 1, {}), ("insert", 0, item("Z")))
+        self.assertEqual(self.labels(), ["Z", "A", "B"])
+
+        # Items activate with their current index
+        self.menu.get_children()[2].activate()
+        self.assertEqual(self.activated, [(2,)])
+
+    def test_replace_separator(self):
+        self.patch(("update", 1, item("S")), ("update", 2, {}))
+        self.assertEqual(self.labels(), ["A", "S", None])
+
+    @patch("blueman.main.indicators.GtkStatusIcon.time.time", return_value=1000.0)
+    def test_countdown(self, clock):
+        countdown = item("Discoverable… 60s", countdown="Discoverable… %ss", deadline=1059.5)
+        self.patch(("update", 0, countdown))
+        self.assertEqual(self.labels(), ["Discoverable… 60s", None, "B"])
+
+        clock.return_value = 1030.2
+        self.assertTrue(update_countdowns(self.menu, [countdown, {}, item("B")]))
+        self.assertEqual(self.labels(), ["Discoverable… 30s", None, "B"])
+
+        clock.return_value = 1070.0
+        self.assertFalse(update_countdowns(self.menu, [countdown, {}, item("B")]))
+        self.assertEqual(self.labels(), ["Discoverable… 0s", None, "B"])
+
+        self.assertFalse(update_countdowns(self.menu, [item("A"), {}, item("B")]))
+
+    def test_submenu(self):
+        self.patch(("update", 2, item("B", submenu=[item("X"), item("Y")])))
+        submenu = self.menu.get_children()[2].get_submenu()
+        submenu.get_children()[1].activate()
+        self.assertEqual(self.activated, [(2, 1)])
+
+        self.patch(("insert", 0, item("Z")))
+        submenu.get_children()[1].activate()
+        self.assertEqual(self.activated[-1], (3, 1))
+
+        self.patch(("update", 3, item("B")))
+        self.assertIsNone(self.menu.get_children()[3].get_submenu())
+
+
+class TestGtkStatusIcon(TestCase):
+    """The bookkeeping of when widgets are built or patched, without widgets"""
+
+    def setUp(self):
+        for name in ("build_menu", "patch_menu", "update_countdowns"):
+            patcher = patch(f"blueman.main.indicators.GtkStatusIcon.{name}")
+            setattr(self, name, patcher.start())
+            self.addCleanup(patcher.stop)
+        self.update_countdowns.return_value = False
+        self.menu = self.build_menu.return_value
+        self.menu.get_visible.return_value = False
+
+        patcher = patch.object(Gtk, "StatusIcon")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.icon = GtkStatusIcon("blueman", lambda *_indexes: None, lambda: None)
+        self.icon.set_menu([item("Discoverable"), {}, item("Devices"), {}, item("Exit")])
+
+    def storm(self, rounds):
+        for second in range(rounds):
+            self.icon.patch_menu([("update", 0, item(f"Discoverable for {60 - second % 60} s"))])
+            self.icon.patch_menu([("insert", 3, item(f"Connected {second}"))])
+            self.icon.patch_menu([("update", 3, item(f"Connected {second}", tooltip="Signal"))])
+            self.icon.patch_menu([("remove", 3, {})])
+
+    def built_labels(self):
+        return [menu_item["text"] for menu_item in self.build_menu.call_args[0][0] if menu_item]
+
+    def test_no_widgets_until_popup(self):
+        self.storm(500)
+        self.build_menu.assert_not_called()
+
+        self.assertIs(self.icon._materialize(), self.menu)
+        self.assertEqual(self.build_menu.call_count, 1)
+        self.assertEqual(self.built_labels(), ["Discoverable for 41 s", "Devices", "Exit"])
+        self.patch_menu.assert_not_called()
+
+    def test_patch_since_popup(self):
+        self.icon._materialize()
+        patches = [("update", 0, item("Discoverable for 3 s")), ("insert", 3, item("Connected"))]
+        self.icon.patch_menu(patches)
+        self.patch_menu.assert_not_called()
+
+        # Only the changes since the last popup are applied to the widgets
+        self.icon._materialize()
+        self.assertEqual(self.build_menu.call_count, 1)
+        self.patch_menu.assert_called_once_with(self.menu, patches, self.icon._on_activate)
+
+        # Many changes since the last popup build the menu anew, once
+        self.storm(500)
+        self.icon._materialize()
+        self.assertEqual(self.build_menu.call_count, 2)
+        self.assertEqual(self.patch_menu.call_count, 1)
+        self.menu.destroy.assert_called_once()
+        self.assertEqual(self.built_labels(), ["Discoverable for 41 s", "Devices", "Connected", "Exit"])
+
+    def test_open_menu_follows(self):
+        self.icon._materialize()
+        self.menu.get_visible.return_value = True
+
+        self.icon.patch_menu([("remove", 1, {})])
+        self.patch_menu.assert_called_once_with(self.menu, [("remove", 1, {})], self.icon._on_activate)
+        self.assertEqual(self.build_menu.call_count, 1)
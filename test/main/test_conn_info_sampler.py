@@ -0,0 +1,92 @@
+import threading
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from _blueman import ConnInfoReadError, _fake_hci
+from blueman.main import ConnInfoSampler as sampler_module
+from blueman.main.ConnInfoSampler import ConnInfoSampler, ConnInfoSample, backoff_interval
+
+
+class TestConnInfoSampler(TestCase):
+    def setUp(self):
+        _fake_hci([("00:11:22:33:44:55", 1, False, -20, 200, 4), ("00:11:22:33:44:66", 2, True, -30, 180, 2)])
+        self.addCleanup(_fake_hci, None)
+        self.delivered = []
+        self.event = threading.Event()
+
+        def idle_add(callback):
+            self.delivered.append(callback.args[0])
+            self.event.set()
+
+        patcher = patch.object(sampler_module, "GLib", Mock(idle_add=idle_add))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.sampler = ConnInfoSampler.get_instance("hci0")
+        self.addCleanup(self.sampler.stop)
+
+    def wait(self):
+        self.assertTrue(self.event.wait(5))
+        self.event.clear()
+
+    def test_backoff(self):
+        self.assertEqual(backoff_interval(0, False), 1.0)
+        self.assertEqual(backoff_interval(5, False), 2.0)
+        self.assertEqual(backoff_interval(1000, False), 8.0)
+        self.assertEqual(backoff_interval(0, True), 30.0)
+
+    def test_instances(self):
+        self.assertIs(ConnInfoSampler.get_instance("hci0"), self.sampler)
+        self.assertIsNot(ConnInfoSampler.get_instance("hci1"), self.sampler)
+        ConnInfoSampler.get_instance("hci1").stop()
+
+    def test_samples(self):
+        self.sampler.add("00:11:22:33:44:55")
+        self.wait()
+        self.assertEqual(self.delivered[-1], {"00:11:22:33:44:55": ConnInfoSample(False, -20, 200, 4)})
+
+        # One pass reads all devices, LE links have no connection info
+        self.sampler.add("00:11:22:33:44:66")
+        self.wait()
+        self.assertEqual(self.delivered[-1], {"00:11:22:33:44:55": ConnInfoSample(False, -20, 200, 4),
+                                              "00:11:22:33:44:66": ConnInfoSample(True)})
+
+        self.sampler.remove("00:11:22:33:44:55")
+        self.sampler.set_hidden(False)
+        self.wait()
+        self.assertEqual(list(self.delivered[-1]), ["00:11:22:33:44:66"])
+
+    @patch.object(sampler_module, "conn_info_reader", side_effect=ConnInfoReadError("Failed to open"))
+    def test_open_failure_logged_once(self, reader):
+        with self.assertLogs(level="WARNING") as logs:
+            self.sampler.add("00:11:22:33:44:55")
+            self.wait()
+            self.sampler.set_hidden(False)
+            self.wait()
+
+        self.assertGreaterEqual(reader.call_count, 2)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(self.delivered[-1], {"00:11:22:33:44:55": ConnInfoSample(True)})
+
+    @patch.object(sampler_module, "conn_info_reader")
+    def test_read_failure_logged_once(self, reader):
+        reader.return_value.read.side_effect = ConnInfoReadError("Failed to read")
+        with self.assertLogs(level="WARNING") as logs:
+            self.sampler.add("00:11:22:33:44:55")
+            self.wait()
+            self.sampler.set_hidden(False)
+            self.wait()
+
+        self.assertGreaterEqual(reader.return_value.read.call_count, 2)
+        self.assertEqual(len(logs.records), 1)
+        self.assertEqual(self.delivered[-1], {"00:11:22:33:44:55": ConnInfoSample(True)})
+
+    def test_deliver_after_stop(self):
+        handler = Mock()
+        self.sampler.connect_signal("samples", handler)
+        self.sampler._deliver({"00:11:22:33:44:55": ConnInfoSample(True)})
+        handler.assert_called_once()
+
+        self.sampler.stop()
+        self.sampler._deliver({"00:11:22:33:44:55": ConnInfoSample(True)})
+        handler.assert_called_once()
@@ -0,0 +1,61 @@
+from unittest import TestCase
+
+from gi.repository import GLib
+
+from _blueman import DisconnectionComplete, _fake_hci, _fake_hci_event
+from blueman.main.HciMonitor import HciMonitor, HciLink
+from test.module.test_hci_monitor import conn_complete, disconn_complete, encrypt_change
+
+
+class TestHciMonitor(TestCase):
+    def setUp(self):
+        _fake_hci([("00:11:22:33:44:55", 1, False, -20, 200, 4), ("00:11:22:33:44:66", 2, True, -30, 180, 2)])
+        self.addCleanup(_fake_hci, None)
+        self.monitor = HciMonitor.get_instance("hci0")
+        self.addCleanup(self.monitor.stop)
+        self.events = []
+        self.monitor.connect_signal("event", lambda _monitor, event: self.events.append(event))
+
+    def dispatch(self, *packets):
+        for packet in packets:
+            _fake_hci_event(packet)
+        count = len(self.events) + len(packets)
+        context = GLib.MainContext.default()
+        for _ in range(100):
+            if len(self.events) >= count:
+                break
+            context.iteration(False)
+
+    def test_instances(self):
+        self.assertTrue(self.monitor.available)
+        self.assertIs(HciMonitor.get_instance("hci0"), self.monitor)
+        self.monitor.stop()
+        self.assertFalse(self.monitor.available)
+        self.assertIsNot(HciMonitor.get_instance("hci0"), self.monitor)
+        HciMonitor.get_instance("hci0").stop()
+
+    def test_failed_instance_not_kept(self):
+        # The fake layer cannot open a monitor for a negative device id
+        monitor = HciMonitor.get_instance("hci-1")
+        self.assertFalse(monitor.available)
+        self.assertIsNot(HciMonitor.get_instance("hci-1"), monitor)
+
+    def test_links(self):
+        # LE links are not followed
+        self.assertEqual(self.monitor.links, {"00:11:22:33:44:55": HciLink(1)})
+
+        self.dispatch(conn_complete(3, "00:11:22:33:44:77"), encrypt_change(3, True))
+        self.assertEqual(self.monitor.links["00:11:22:33:44:77"], HciLink(3, encrypted=True))
+
+        self.dispatch(disconn_complete(1))
+        self.assertEqual(list(self.monitor.links), ["00:11:22:33:44:77"])
+        self.assertIsInstance(self.events[-1], DisconnectionComplete)
+        self.assertEqual(self.events[-1].address, "00:11:22:33:44:55")
+        self.assertEqual(len(self.events), 4)
+
+    def test_links_updated_before_event(self):
+        linked = []
+        address = "00:11:22:33:44:55"
+        self.monitor.connect_signal("event", lambda monitor, _event: linked.append(address in monitor.links))
+        self.dispatch(disconn_complete(1))
+        self.assertEqual(linked, [False])
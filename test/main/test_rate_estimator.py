@@ -0,0 +1,70 @@
+from unittest import TestCase
+
+from blueman.main.RateEstimator import RateEstimator
+
+
+class TestRateEstimator(TestCase):
+    def setUp(self):
+        self.now = 100.0
+        self.estimator = RateEstimator(window=3.0, halflife=1.0, size=8, clock=lambda: self.now)
+
+    def feed(self, values, interval=1.0):
+        rate = 0.0
+        for value in values:
+            rate = self.estimator.add(value)
+            self.now += interval
+        return rate
+
+    def test_moving_average(self):
+        self.assertEqual(self.estimator.add(1000), 0.0)
+        self.now += 1
+        self.assertEqual(self.estimator.add(1500), 500.0)
+        self.now += 1
+        self.assertEqual(self.estimator.add(2500), 750.0)
+
+    def test_window(self):
+        # Only the samples of the last three seconds count
+        self.feed([0, 100, 200, 300, 400, 1000, 1600, 2200])
+        self.assertEqual(self.estimator.rate, 600.0)
+        self.assertEqual(len(self.estimator), 4)
+
+    def test_ring_buffer(self):
+        estimator = RateEstimator(window=60.0, size=8, clock=lambda: self.now)
+        for value in range(0, 10000, 100):
+            estimator.add(value)
+            self.now += 0.1
+        self.assertEqual(len(estimator), 8)
+        self.assertAlmostEqual(estimator.rate, 1000.0)
+
+    def test_ewma(self):
+        self.feed([0, 1000])
+        self.assertEqual(self.estimator.ewma, 1000.0)
+        # Half way to the new rate after one halflife
+        self.feed([1000 + 3000])
+        self.assertEqual(self.estimator.ewma, 2000.0)
+
+    def test_eta(self):
+        self.assertIsNone(self.estimator.eta(1000))
+        self.feed([0, 100, 300])
+        self.assertEqual(self.estimator.eta(1500), 10.0)
+        self.assertAlmostEqual(self.estimator.eta(1500, smoothed=True), 1500 / 150)
+
+    def test_counter_reset(self):
+        self.feed([0, 1000, 2000])
+        self.feed([500, 1500])
+        self.assertEqual(self.estimator.total, 3500)
+        self.assertEqual(self.estimator.rate, (3500 - 1000) / 3)
+
+    def test_clock_does_not_advance(self):
+        self.estimator.add(0)
+        self.now += 1
+        self.estimator.add(100)
+        self.estimator.add(200)
+        self.assertEqual(self.estimator.rate, 200.0)
+        self.assertEqual(len(self.estimator), 2)
+
+    def test_reset(self):
+        self.feed([0, 1000, 2000])
+        self.estimator.reset()
+        self.assertEqual((self.estimator.rate, self.estimator.ewma, len(self.estimator)), (0.0, 0.0, 0))
+        self.assertEqual(self.estimator.add(5000), 0.0)
@@ -0,0 +1,162 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from _blueman import ConnectionComplete
+from blueman.main import StatsPoller as poller_module
+from blueman.main.StatsPoller import StatsPoller, FAST_INTERVAL, MAX_INTERVAL
+
+
+class FakeLoop:
+    """Runs the timeouts of the poller on a clock of its own"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.timeouts = {}
+        self.next_id = 1
+
+    def timeout_add(self, interval, callback):
+        self.timeouts[self.next_id] = (self.now + interval / 1000, callback)
+        self.next_id += 1
+        return self.next_id - 1
+
+    def source_remove(self, source_id):
+        del self.timeouts[source_id]
+
+    def run(self, seconds):
+        end = self.now + seconds
+        while self.timeouts:
+            source_id, (due, callback) = min(self.timeouts.items(), key=lambda item: item[1][0])
+            if due > end:
+                break
+            self.now = due
+            del self.timeouts[source_id]
+            if callback():
+                self.timeout_add(0, callback)
+        self.now = end
+
+
+class FakeAdapter:
+    """device_info of an adapter, counting how often it is read"""
+
+    def __init__(self):
+        self.tx = 0
+        self.rx = 0
+        self.reads = 0
+        self.flowing = False
+
+    def read_counters(self, _hci):
+        self.reads += 1
+        if self.flowing:
+            self.tx += 1000
+            self.rx += 4000
+        return self.tx, self.rx
+
+
+class TestStatsPoller(TestCase):
+    def setUp(self):
+        self.loop = FakeLoop()
+        glib = Mock(timeout_add=self.loop.timeout_add, source_remove=self.loop.source_remove)
+        patcher = patch.object(poller_module, "GLib", glib)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.adapter = FakeAdapter()
+        self.poller = StatsPoller(self.adapter.read_counters, clock=lambda: self.loop.now, follow_links=False)
+        self.updates = []
+        self.poller.connect_signal("update", lambda _poller, *args: self.updates.append(args))
+
+    def wakeups(self, seconds):
+        reads = self.adapter.reads
+        self.loop.run(seconds)
+        return self.adapter.reads - reads
+
+    def test_fast_while_flowing(self):
+        self.adapter.flowing = True
+        self.poller.set_adapter("hci0")
+        self.assertEqual(self.wakeups(10), 10)
+        self.assertEqual(self.poller.interval, FAST_INTERVAL)
+        self.assertEqual(self.updates[-1][2:], (1000.0, 4000.0))
+
+    def test_backoff(self):
+        self.poller.set_adapter("hci0")
+        # 1, 2, 4, 8 and then every 16 seconds
+        self.assertEqual(self.wakeups(15), 4)
+        self.assertEqual(self.wakeups(16 * 10), 10)
+        self.assertEqual(self.poller.interval, MAX_INTERVAL)
+        self.assertEqual(self.updates[-1][2:], (0.0, 0.0))
+
+        # Traffic is noticed within the interval and polled fast again
+        self.adapter.flowing = True
+        self.wakeups(16)
+        self.assertEqual(self.poller.interval, FAST_INTERVAL)
+        self.assertEqual(self.wakeups(5), 5)
+
+    def test_suspended(self):
+        self.adapter.flowing = True
+        self.poller.set_adapter("hci0")
+        self.wakeups(3)
+
+        self.poller.set_suspended("hidden", True)
+        self.assertEqual(self.updates[-1], (self.adapter.tx, self.adapter.rx, 0.0, 0.0))
+        self.assertEqual(self.wakeups(3600), 0)
+
+        # All reasons have to go
+        self.poller.set_suspended("disabled", True)
+        self.poller.set_suspended("hidden", False)
+        self.assertEqual(self.wakeups(60), 0)
+
+        self.poller.set_suspended("disabled", False)
+        self.assertEqual(self.adapter.reads, 5)
+        self.assertEqual(self.wakeups(3), 3)
+
+    def test_no_adapter(self):
+        self.poller.set_adapter(None)
+        self.assertEqual(self.wakeups(60), 0)
+
+    def test_wake(self):
+        self.poller.set_adapter("hci0")
+        self.wakeups(60)
+        self.poller.wake()
+        self.assertEqual(self.poller.interval, FAST_INTERVAL)
+        self.assertEqual(self.wakeups(1), 1)
+
+    def test_stop(self):
+        self.poller.set_adapter("hci0")
+        self.poller.stop()
+        self.assertEqual(self.loop.timeouts, {})
+
+
+class TestStatsPollerLinks(TestCase):
+    def setUp(self):
+        self.loop = FakeLoop()
+        glib = Mock(timeout_add=self.loop.timeout_add, source_remove=self.loop.source_remove)
+        patcher = patch.object(poller_module, "GLib", glib)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.monitor = Mock(links={}, available=True)
+        patcher = patch.object(poller_module.HciMonitor, "get_instance", return_value=self.monitor)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.adapter = FakeAdapter()
+        self.poller = StatsPoller(self.adapter.read_counters, clock=lambda: self.loop.now)
+        self.updates = []
+        self.poller.connect_signal("update", lambda _poller, *args: self.updates.append(args))
+        self.poller.set_adapter("hci0")
+
+    def test_counters_move_without_links(self):
+        # A device search shows up in the counters of an adapter without links
+        self.adapter.flowing = True
+        reads = self.adapter.reads
+        self.loop.run(5)
+        self.assertEqual(self.adapter.reads - reads, 5)
+        self.assertEqual(self.updates[-1][2:], (1000.0, 4000.0))
+
+    def test_link_up_wakes(self):
+        self.loop.run(60)
+        self.assertEqual(self.poller.interval, MAX_INTERVAL)
+
+        on_event = self.monitor.connect_signal.call_args[0][1]
+        on_event(self.monitor, ConnectionComplete(0, 1, "00:11:22:33:44:55", 1, False))
+        self.assertEqual(self.poller.interval, FAST_INTERVAL)
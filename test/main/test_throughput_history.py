@@ -0,0 +1,91 @@
+from unittest import TestCase
+
+from blueman.main.ThroughputHistory import RESOLUTIONS, Series, ThroughputHistory
+
+
+class TestSeries(TestCase):
+    def test_spread(self):
+        series = Series(1, 4)
+        # 300 bytes from 10.5 to 13.5 are 50, 100, 100 and 50 bytes per bucket
+        series.add(10.5, 13.5, 300, 600)
+        tx, rx = series.rates()
+        self.assertEqual(tx, [50.0, 100.0, 100.0, 50.0])
+        self.assertEqual(rx, [100.0, 200.0, 200.0, 100.0])
+
+    def test_gap(self):
+        series = Series(1, 4)
+        series.add(10, 11, 100, 100)
+        series.advance(13.5)
+        tx, _rx = series.rates()
+        self.assertEqual(tx, [100.0, 0.0, 0.0, 0.0])
+
+        # After more than size buckets without data nothing is left
+        series.advance(20)
+        self.assertEqual(series.rates()[0], [0.0] * 4)
+
+    def test_span_longer_than_ring(self):
+        series = Series(1, 4)
+        series.add(0, 8, 800, 0)
+        # Only the share of the buckets that are kept is counted, the newest one starts at 8
+        self.assertEqual(series.rates()[0], [100.0, 100.0, 100.0, 0.0])
+
+    def test_rate_per_second(self):
+        series = Series(60, 2)
+        series.add(0, 60, 600, 0)
+        self.assertEqual(series.rates()[0], [10.0, 0.0])
+
+
+class TestThroughputHistory(TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.history = ThroughputHistory(clock=lambda: self.now, wall_clock=lambda: self.now + 1e9)
+
+    def test_rollups(self):
+        self.history.add(0, 0, now=1000)
+        for second in range(1, 121):
+            self.history.add(second * 10, second * 20, now=1000 + second)
+        self.now = 1120.5
+
+        tx, rx = self.history.get_series(1)
+        self.assertEqual(tx[-3:], [10.0, 10.0, 0.0])
+        self.assertEqual(rx[-3:], [20.0, 20.0, 0.0])
+
+        # The minutes started at 960, 1020 and 1080
+        tx, _rx = self.history.get_series(60)
+        self.assertEqual([round(value, 2) for value in tx[-3:]], [3.33, 10.0, 6.67])
+
+        tx, _rx = self.history.get_series(3600)
+        self.assertAlmostEqual(sum(tx) * 3600, 1200.0)
+
+    def test_counter_reset(self):
+        self.history.add(1000, 1000, now=1000)
+        self.history.add(300, 400, now=1001)
+        self.now = 1001
+        tx, rx = self.history.get_series(1)
+        self.assertEqual(tx[-2:], [300.0, 0.0])
+        self.assertEqual(rx[-2:], [400.0, 0.0])
+
+    def test_unknown_resolution(self):
+        self.assertRaises(KeyError, self.history.get_series, 5)
+
+    def test_export(self):
+        self.history.add(0, 0, now=1000)
+        self.history.add(100, 200, now=1001)
+        self.now = 1001.5
+
+        rows = self.history.export()
+        self.assertEqual([row[0] for row in rows], [resolution for resolution, _size in RESOLUTIONS])
+        for (resolution, end, tx, rx), (_resolution, size) in zip(rows, RESOLUTIONS):
+            self.assertEqual(len(tx), size)
+            self.assertEqual(len(rx), size)
+            # The newest bucket ends in wall clock time at the end of the current bucket
+            self.assertEqual(end, (1001.5 // resolution + 1) * resolution + 1e9)
+
+        self.assertEqual(rows[0][2][-2:], [100.0, 0.0])
+
+    def test_fixed_memory(self):
+        for second in range(10000):
+            self.history.add(second * 10, second * 10, now=1000 + second)
+        for series, (_resolution, size) in zip(self.history.series, RESOLUTIONS):
+            self.assertEqual(len(series.tx), size)
+            self.assertEqual(len(series.rx), size)
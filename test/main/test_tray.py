@@ -0,0 +1,128 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from gi.repository import Gio, GLib
+
+from blueman.main import Tray as tray_module
+from blueman.main.Tray import BluemanTray
+from blueman.main.MenuProtocol import MENU_PROTOCOL
+
+
+def state(revision, implementation="GtkStatusIcon", text="Bluetooth Enabled"):
+    return GLib.Variant("(a{sv})", ({
+        "Implementation": GLib.Variant("s", implementation),
+        "IconName": GLib.Variant("s", "blueman-tray"),
+        "Text": GLib.Variant("s", text),
+        "Visibility": GLib.Variant("b", True),
+        "MenuProtocol": GLib.Variant("u", MENU_PROTOCOL),
+        "MenuRevision": GLib.Variant("u", revision),
+        "Menu": GLib.Variant("aa{sv}", [{"text": GLib.Variant("s", "Exit")}]),
+    },))
+
+
+def menu_patched(revision):
+    return GLib.Variant("((ua(sua{sv})))", ((revision, [("update", 0, {"text": GLib.Variant("s", "Quit")})]),))
+
+
+class TestTray(TestCase):
+    def setUp(self):
+        self.indicators = {"GtkStatusIcon": Mock(), "AppIndicator": Mock()}
+        module = Mock(**self.indicators)
+        patcher = patch.object(tray_module, "import_module", return_value=module)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        glib = Mock(Error=GLib.Error, timeout_add_seconds=Mock(return_value=1))
+        patcher = patch.object(tray_module, "GLib", glib)
+        self.glib = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.applet = Mock()
+        self.tray = BluemanTray()
+        self.tray._applet = self.applet
+
+    def reply(self, variant):
+        self.applet.call_finish.return_value = variant
+        self.tray._on_state(self.applet, Mock())
+
+    def test_state(self):
+        self.reply(state(3))
+        indicator = self.indicators["GtkStatusIcon"].return_value
+        indicator.set_text.assert_called_once_with("Bluetooth Enabled")
+        indicator.set_visibility.assert_called_once_with(True)
+        indicator.set_menu.assert_called_once_with([{"text": "Exit"}])
+        self.applet.GetMenu.assert_not_called()
+
+        self.tray.on_signal(self.applet, "", "MenuChanged", GLib.Variant("(aa{sv})", ([],)))
+        self.assertEqual(indicator.set_menu.call_count, 1)
+
+        self.tray.on_signal(self.applet, "", "MenuPatched", menu_patched(4))
+        indicator.patch_menu.assert_called_once_with([("update", 0, {"text": "Quit"})])
+
+    def test_revision_gap(self):
+        self.reply(state(3))
+        self.tray.on_signal(self.applet, "", "MenuPatched", menu_patched(6))
+        self.applet.call.assert_called_once()
+        self.assertEqual(self.applet.call.call_args[0][0], "GetState")
+
+        # Patches that arrive before the reply are part of it
+        self.tray.on_signal(self.applet, "", "MenuPatched", menu_patched(7))
+        self.assertEqual(self.applet.call.call_count, 1)
+        self.indicators["GtkStatusIcon"].return_value.patch_menu.assert_not_called()
+
+    def test_legacy_applet(self):
+        self.applet.call_finish.side_effect = GLib.Error.new_literal(
+            Gio.dbus_error_quark(), "No such method", Gio.DBusError.UNKNOWN_METHOD)
+        self.applet.GetStatusIconImplementation.return_value = "GtkStatusIcon"
+        self.applet.GetMenu.return_value = [{"text": "Exit"}]
+        self.tray._on_state(self.applet, Mock())
+
+        indicator = self.indicators["GtkStatusIcon"].return_value
+        indicator.set_menu.assert_called_once_with([{"text": "Exit"}])
+        self.tray.on_signal(self.applet, "", "MenuChanged", GLib.Variant("(aa{sv})", ([],)))
+        indicator.set_menu.assert_called_with([])
+
+    def test_applet_restart(self):
+        self.reply(state(3))
+        indicator = self.indicators["GtkStatusIcon"].return_value
+
+        self.tray._on_name_vanished(Mock(), "org.blueman.Applet")
+        indicator.set_visibility.assert_called_with(False)
+        self.glib.timeout_add_seconds.assert_called_once()
+
+        self.tray._on_name_appeared(Mock(), "org.blueman.Applet", ":1.2")
+        self.glib.source_remove.assert_called_once_with(1)
+        self.reply(state(0, text="Bluetooth Disabled"))
+
+        # The indicator is updated in place
+        self.assertEqual(self.indicators["GtkStatusIcon"].call_count, 1)
+        indicator.set_text.assert_called_with("Bluetooth Disabled")
+        indicator.set_visibility.assert_called_with(True)
+
+    def test_implementation_change(self):
+        self.reply(state(3))
+        self.reply(state(3, implementation="AppIndicator"))
+        self.indicators["GtkStatusIcon"].return_value.set_visibility.assert_called_with(False)
+        self.indicators["AppIndicator"].return_value.set_menu.assert_called_once()
+
+    def test_first_state_failure(self):
+        self.applet.call_finish.side_effect = GLib.Error.new_literal(
+            Gio.dbus_error_quark(), "Timeout", Gio.DBusError.TIMEOUT)
+        self.tray.quit = Mock()
+
+        with self.assertLogs(level="WARNING"):
+            self.tray._on_state(self.applet, Mock())
+        self.glib.timeout_add_seconds.assert_called_once()
+        self.tray.quit.assert_not_called()
+
+        # The retry fetches the state again
+        self.tray._on_retry_timeout()
+        self.applet.call.assert_called_once()
+        self.assertEqual(self.applet.call.call_args[0][0], "GetState")
+
+        with self.assertLogs(level="WARNING"):
+            for _attempt in range(tray_module.STATE_RETRIES - 1):
+                self.tray._on_state(self.applet, Mock())
+                self.tray._on_retry_timeout()
+        self.tray.quit.assert_called_once()
+        self.assertIsNone(self.tray.indicator)
@@ -0,0 +1,289 @@
+"""Measure blueman against the fake BlueZ and obexd services on a private bus.
+
+    python3 -m test.mock.benchmark --devices 1000 --storm 10
+    python3 -m test.mock.benchmark --rows 1000 generic-list
+    python3 -m test.mock.benchmark --samples 100000 rate
+
+For every benchmark the wall time and the number of D-Bus round trips to the fake services is reported.
+Benchmarks that need something unavailable, e.g. a display for Gtk, are reported as skipped.
+"""
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from gi.repository import Gio, GLib
+
+from test.mock.bluez import FakeBluez, device_address
+from test.mock.obex import FakeObex
+from test.mock.scenarios import property_storm
+from test.mock.service import PrivateBus
+
+
+class Skipped(Exception):
+    pass
+
+
+def run_until(predicate, timeout=30.0):
+    """Iterate the default main context until predicate is true"""
+    context = GLib.MainContext.default()
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Condition not met in time")
+        if not context.iteration(False):
+            time.sleep(0.001)
+
+
+def run_pending():
+    context = GLib.MainContext.default()
+    while context.pending():
+        context.iteration(False)
+
+
+def require_display():
+    import gi
+    try:
+        gi.require_version("Gtk", "3.0")
+    except ValueError as e:
+        raise Skipped(str(e))
+    from gi.repository import Gtk
+    if not Gtk.init_check(sys.argv)[0]:
+        raise Skipped("no display")
+
+
+def bench_manager(args, bluez, _obex):
+    from blueman.bluez.Manager import Manager
+
+    manager = Manager()
+    # Proxies have to cope with changes that arrive while they are created
+    storm = threading.Thread(target=property_storm, args=(bluez, args.storm))
+    storm.start()
+    adapters = manager.get_adapters()
+    devices = [manager.get_devices(adapter.get_object_path()) for adapter in adapters]
+    storm.join()
+    run_pending()
+
+    before = bluez.round_trips
+    for adapter in adapters:
+        manager.get_devices(adapter.get_object_path())
+    for index in range(0, args.devices, max(1, args.devices // 100)):
+        manager.find_device(device_address(index))
+    lookups = bluez.round_trips - before
+
+    for device in devices[0][:100]:
+        device["Alias"]
+    return f"{len(adapters)} adapters, {sum(len(d) for d in devices)} devices, {lookups} round trips for lookups"
+
+
+def bench_device_list(_args, _bluez, _obex):
+    require_display()
+
+    from blueman.gui.DeviceSelectorList import DeviceSelectorList
+
+    device_list = DeviceSelectorList("hci0")
+    device_list.display_known_devices()
+    run_pending()
+    rows = len(device_list.liststore)
+    device_list.destroy()
+    return f"{rows} rows"
+
+
+def bench_generic_list(args, _bluez, _obex):
+    require_display()
+
+    from blueman.gui.GenericList import GenericList
+
+    values = {f"column{i}": i for i in range(8)}
+    generic_list = GenericList([{"id": key, "type": int} for key in values])
+    rows = [generic_list.append() for _ in range(args.rows)]
+    changes = Counter()
+    generic_list.liststore.connect("row-changed", lambda *_args: changes.update(("row-changed",)))
+
+    def per_column(tree_iter):
+        for key, value in values.items():
+            generic_list.liststore.set(tree_iter, generic_list.ids[key], value)
+        for key in values:
+            generic_list.liststore.get(tree_iter, generic_list.ids[key])
+
+    def batched(tree_iter):
+        generic_list.set(tree_iter, **values)
+        generic_list.get(tree_iter, *values)
+
+    results = []
+    for name, update in (("per column", per_column), ("batched", batched)):
+        changes.clear()
+        start = time.perf_counter()
+        for tree_iter in rows:
+            update(tree_iter)
+        per_row = (time.perf_counter() - start) / len(rows) * 1000000
+        results.append(f"{name} {changes['row-changed']} row-changed {per_row:.1f} µs/row")
+
+    generic_list.destroy()
+    return f"{args.rows} rows of {len(values)} columns, " + ", ".join(results)
+
+
+def bench_rate(args, _bluez, _obex):
+    from blueman.main.RateEstimator import RateEstimator
+
+    results = []
+    # The cost of a sample must not depend on how many samples the window holds
+    for window in (10, 1000):
+        estimator = RateEstimator(window=window / 1000, size=window + 1)
+        start = time.perf_counter()
+        for i in range(args.samples):
+            estimator.add(i * 100, i / 1000)
+            estimator.ewma
+            estimator.eta(1000000)
+        per_sample = (time.perf_counter() - start) / args.samples * 1000000
+        results.append(f"{window} sample window {per_sample:.2f} µs/sample")
+    return f"{args.samples} samples, " + ", ".join(results)
+
+
+def bench_storm(args, bluez, _obex):
+    from blueman.bluez.Device import AnyDevice
+
+    counts = Counter()
+    any_device = AnyDevice()
+    any_device.connect_signal("property-changed", lambda *_args: counts.update(("single",)))
+    any_device.connect_signal("properties-changed", lambda *_args: counts.update(("batched",)))
+    run_pending()
+
+    signals = property_storm(bluez, args.storm)
+    run_until(lambda: counts["single"] >= 4 * signals)
+    run_pending()
+    any_device.close()
+    return f"{signals} signals, {counts['single']} property-changed, {counts['batched']} properties-changed"
+
+
+def bench_applet(_args, _bluez, _obex):
+    try:
+        from blueman.main.Applet import BluemanApplet
+    except ImportError as e:
+        raise Skipped(str(e))
+
+    menu_changes = []
+    bus = Gio.bus_get_sync(Gio.BusType.SESSION)
+    subscription = bus.signal_subscribe(None, "org.blueman.Applet", "MenuChanged", "/org/blueman/Applet", None,
+                                        Gio.DBusSignalFlags.NONE, lambda *args: menu_changes.append(args))
+
+    applet = BluemanApplet()
+    run_until(lambda: applet.plugin_run_state_changed)
+    run_pending()
+    # The bus delivers messages in order, so the signals emitted so far have arrived with the reply
+    bus.call_sync("org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "GetId", None, None,
+                  Gio.DBusCallFlags.NONE, -1, None)
+    run_pending()
+    bus.signal_unsubscribe(subscription)
+    return f"{len(applet.Plugins.get_loaded())} plugins, {len(menu_changes)} MenuChanged"
+
+
+def bench_transfer(args, _bluez, obex):
+    from blueman.bluez.obex.Client import Client
+    from blueman.bluez.obex.Manager import Manager
+    from blueman.bluez.obex.ObjectPush import ObjectPush
+
+    manager = Manager()
+    client = Client()
+    sessions = []
+    completed = []
+    manager.connect_signal("session-added", lambda _manager, path: sessions.append(path))
+    manager.connect_signal("transfer-completed", lambda _manager, path, success: completed.append(success))
+
+    with tempfile.NamedTemporaryFile() as f:
+        f.write(os.urandom(args.transfer_size))
+        f.flush()
+
+        for i in range(args.transfers):
+            client.create_session(device_address(i))
+            run_until(lambda: len(sessions) > i)
+            ObjectPush(obj_path=sessions[i]).send_file(f.name)
+            run_until(lambda: len(completed) > i)
+            client.remove_session(sessions[i])
+
+    run_pending()
+    return f"{completed.count(True)}/{args.transfers} transfers of {args.transfer_size} bytes"
+
+
+BENCHMARKS = {
+    "manager": bench_manager,
+    "device-list": bench_device_list,
+    "generic-list": bench_generic_list,
+    "rate": bench_rate,
+    "storm": bench_storm,
+    "applet": bench_applet,
+    "transfer": bench_transfer,
+}
+
+
+def compile_schemas(directory):
+    source = os.path.join(os.path.dirname(__file__), "..", "..", "data", "org.blueman.gschema.xml")
+    if shutil.which("glib-compile-schemas") is None:
+        return False
+    shutil.copy(source, directory)
+    subprocess.run(["glib-compile-schemas", directory], check=True)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--adapters", type=int, default=2)
+    parser.add_argument("--devices", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=1000, help="rows of the generic-list benchmark")
+    parser.add_argument("--samples", type=int, default=100000, help="samples of the rate benchmark")
+    parser.add_argument("--storm", type=int, default=5, help="rounds of property changes on every device")
+    parser.add_argument("--transfers", type=int, default=3)
+    parser.add_argument("--transfer-size", type=int, default=1024 * 1024)
+    parser.add_argument("benchmarks", nargs="*", metavar="BENCHMARK",
+                        help=f"benchmarks to run out of {', '.join(BENCHMARKS)}, all by default")
+    args = parser.parse_args()
+
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    schema_dir = tempfile.mkdtemp(prefix="blueman-test-schemas-")
+    with PrivateBus() as bus:
+        os.environ.update(bus.environment)
+        os.environ["GSETTINGS_BACKEND"] = "memory"
+        if compile_schemas(schema_dir):
+            os.environ["GSETTINGS_SCHEMA_DIR"] = schema_dir
+
+        bluez = FakeBluez(bus.address, adapters=args.adapters, devices=args.devices)
+        obex = FakeObex(bus.address)
+        bluez.start()
+        obex.start()
+
+        failed = False
+        print(f"{'benchmark':<12} {'wall ms':>10} {'round trips':>12}  result")
+        for name in args.benchmarks or BENCHMARKS:
+            bluez.reset_calls()
+            obex.reset_calls()
+            start = time.perf_counter()
+            try:
+                result = BENCHMARKS[name](args, bluez, obex)
+            except Skipped as e:
+                print(f"{name:<12} {'-':>10} {'-':>12}  skipped: {e}")
+                continue
+            except Exception as e:
+                print(f"{name:<12} {'-':>10} {'-':>12}  failed: {e!r}")
+                failed = True
+                continue
+            elapsed = (time.perf_counter() - start) * 1000
+            round_trips = bluez.round_trips + obex.round_trips
+            print(f"{name:<12} {elapsed:>10.1f} {round_trips:>12}  {result}")
+
+        obex.stop()
+        bluez.stop()
+
+    shutil.rmtree(schema_dir, ignore_errors=True)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,220 @@
+from gi.repository import GLib
+
+from test.mock.service import MockService, MockError
+
+
+def device_address(index):
+    return ":".join(f"{index:012X}"[i:i + 2] for i in range(0, 12, 2))
+
+
+class FakeBluez(MockService):
+    """Enough of org.bluez for blueman: adapters, devices, networks, batteries and the agent manager"""
+
+    BUS_NAME = "org.bluez"
+
+    INTERFACES = {
+        "org.bluez.AgentManager1": {
+            "methods": {
+                "RegisterAgent": (("o", "s"), ()),
+                "UnregisterAgent": (("o",), ()),
+                "RequestDefaultAgent": (("o",), ()),
+            },
+        },
+        "org.bluez.Adapter1": {
+            "methods": {
+                "StartDiscovery": ((), ()),
+                "StopDiscovery": ((), ()),
+                "RemoveDevice": (("o",), ()),
+                "SetDiscoveryFilter": (("a{sv}",), ()),
+                "GetDiscoveryFilters": ((), ("as",)),
+            },
+            "properties": {
+                "Address": "s",
+                "AddressType": "s",
+                "Name": "s",
+                "Alias": "s",
+                "Class": "u",
+                "Powered": "b",
+                "Discoverable": "b",
+                "DiscoverableTimeout": "u",
+                "Pairable": "b",
+                "PairableTimeout": "u",
+                "Discovering": "b",
+                "UUIDs": "as",
+            },
+        },
+        "org.bluez.Device1": {
+            "methods": {
+                "Connect": ((), ()),
+                "Disconnect": ((), ()),
+                "ConnectProfile": (("s",), ()),
+                "DisconnectProfile": (("s",), ()),
+                "Pair": ((), ()),
+                "CancelPairing": ((), ()),
+            },
+            "properties": {
+                "Address": "s",
+                "AddressType": "s",
+                "Name": "s",
+                "Alias": "s",
+                "Icon": "s",
+                "Class": "u",
+                "Appearance": "q",
+                "UUIDs": "as",
+                "Paired": "b",
+                "Connected": "b",
+                "Trusted": "b",
+                "Blocked": "b",
+                "LegacyPairing": "b",
+                "RSSI": "n",
+                "TxPower": "n",
+                "ManufacturerData": "a{qv}",
+                "ServiceData": "a{sv}",
+                "ServicesResolved": "b",
+                "Adapter": "o",
+            },
+        },
+        "org.bluez.Network1": {
+            "methods": {
+                "Connect": (("s",), ("s",)),
+                "Disconnect": ((), ()),
+            },
+            "properties": {
+                "Connected": "b",
+                "Interface": "s",
+                "UUID": "s",
+            },
+        },
+        "org.bluez.Battery1": {
+            "properties": {
+                "Percentage": "y",
+            },
+        },
+    }
+
+    def __init__(self, address, adapters=1, devices=0):
+        super().__init__(address)
+        self._adapters = adapters
+        self._devices = devices
+
+    def setup(self):
+        self.add_object("/org/bluez", {"org.bluez.AgentManager1": {}})
+        for index in range(self._adapters):
+            self.add_adapter(index)
+        self.add_devices(self._devices)
+
+    def add_adapter(self, index):
+        path = f"/org/bluez/hci{index}"
+        self.add_object(path, {"org.bluez.Adapter1": {
+            "Address": device_address(0xA0000000 + index),
+            "AddressType": "public",
+            "Name": f"blueman-test-{index}",
+            "Alias": f"blueman-test-{index}",
+            "Class": 0x6c010c,
+            "Powered": True,
+            "Discoverable": False,
+            "DiscoverableTimeout": 180,
+            "Pairable": True,
+            "PairableTimeout": 0,
+            "Discovering": False,
+            "UUIDs": ["00001105-0000-1000-8000-00805f9b34fb"],
+        }})
+        return path
+
+    def add_device(self, adapter_path, index, network=False, battery=False):
+        address = device_address(index)
+        path = f"{adapter_path}/dev_{address.replace(':', '_')}"
+        interfaces = {"org.bluez.Device1": {
+            "Address": address,
+            "AddressType": "public",
+            "Name": f"Device {index}",
+            "Alias": f"Device {index}",
+            "Icon": "phone",
+            "Class": 0x5a020c,
+            "UUIDs": ["00001105-0000-1000-8000-00805f9b34fb", "00001116-0000-1000-8000-00805f9b34fb"],
+            "Paired": index % 2 == 0,
+            "Connected": False,
+            "Trusted": False,
+            "Blocked": False,
+            "LegacyPairing": False,
+            "ServicesResolved": False,
+            "Adapter": adapter_path,
+        }}
+        if network:
+            interfaces["org.bluez.Network1"] = {"Connected": False, "Interface": "",
+                                                "UUID": "00001116-0000-1000-8000-00805f9b34fb"}
+        if battery:
+            interfaces["org.bluez.Battery1"] = {"Percentage": 50 + index % 50}
+
+        self.add_object(path, interfaces)
+        return path
+
+    def add_devices(self, count, adapters=None):
+        """Spread count devices over the adapters, every fourth one has a network and every third a battery"""
+        adapter_paths = adapters or sorted(path for path, interfaces in self.objects.items()
+                                           if "org.bluez.Adapter1" in interfaces)
+        start = sum(1 for interfaces in self.objects.values() if "org.bluez.Device1" in interfaces)
+        return [self.add_device(adapter_paths[index % len(adapter_paths)], index,
+                                network=index % 4 == 0, battery=index % 3 == 0)
+                for index in range(start, start + count)]
+
+    def device_paths(self):
+        return sorted(path for path, interfaces in self.objects.items() if "org.bluez.Device1" in interfaces)
+
+    def _require(self, object_path, interface_name):
+        if interface_name not in self.objects.get(object_path, {}):
+            raise MockError("org.bluez.Error.DoesNotExist", object_path)
+
+    def handle_AgentManager1_RegisterAgent(self, _object_path, _agent_path, _capability):
+        return None
+
+    def handle_AgentManager1_UnregisterAgent(self, _object_path, _agent_path):
+        return None
+
+    def handle_AgentManager1_RequestDefaultAgent(self, _object_path, _agent_path):
+        return None
+
+    def handle_Adapter1_StartDiscovery(self, object_path):
+        self.set_properties(object_path, "org.bluez.Adapter1", {"Discovering": True})
+
+    def handle_Adapter1_StopDiscovery(self, object_path):
+        if not self.get_property(object_path, "org.bluez.Adapter1", "Discovering"):
+            raise MockError("org.bluez.Error.Failed", "No discovery started")
+        self.set_properties(object_path, "org.bluez.Adapter1", {"Discovering": False})
+
+    def handle_Adapter1_SetDiscoveryFilter(self, _object_path, _discovery_filter):
+        return None
+
+    def handle_Adapter1_GetDiscoveryFilters(self, _object_path):
+        return GLib.Variant("(as)", (["UUIDs", "RSSI", "Pathloss", "Transport", "DuplicateData"],))
+
+    def handle_Adapter1_RemoveDevice(self, _object_path, device_path):
+        self._require(device_path, "org.bluez.Device1")
+        self.remove_object(device_path)
+
+    def handle_Device1_Connect(self, object_path):
+        self.set_properties(object_path, "org.bluez.Device1", {"Connected": True, "ServicesResolved": True})
+
+    def handle_Device1_Disconnect(self, object_path):
+        self.set_properties(object_path, "org.bluez.Device1", {"Connected": False, "ServicesResolved": False})
+
+    def handle_Device1_ConnectProfile(self, object_path, _uuid):
+        self.handle_Device1_Connect(object_path)
+
+    def handle_Device1_DisconnectProfile(self, object_path, _uuid):
+        self.handle_Device1_Disconnect(object_path)
+
+    def handle_Device1_Pair(self, object_path):
+        if self.get_property(object_path, "org.bluez.Device1", "Paired"):
+            raise MockError("org.bluez.Error.AlreadyExists", "Already Exists")
+        self.set_properties(object_path, "org.bluez.Device1", {"Paired": True})
+
+    def handle_Device1_CancelPairing(self, _object_path):
+        return None
+
+    def handle_Network1_Connect(self, object_path, _uuid):
+        self.set_properties(object_path, "org.bluez.Network1", {"Connected": True, "Interface": "bnep0"})
+        return GLib.Variant("(s)", ("bnep0",))
+
+    def handle_Network1_Disconnect(self, object_path):
+        self.set_properties(object_path, "org.bluez.Network1", {"Connected": False, "Interface": ""})
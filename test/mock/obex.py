@@ -0,0 +1,132 @@
+import os
+
+from gi.repository import GLib
+
+from test.mock.service import MockService, MockError
+
+
+class FakeObex(MockService):
+    """Enough of org.bluez.obex for sending files: the client, object push sessions and transfers.
+
+    Transfers progress by chunk_size bytes every interval milliseconds.
+    """
+
+    BUS_NAME = "org.bluez.obex"
+
+    INTERFACES = {
+        "org.bluez.obex.AgentManager1": {
+            "methods": {
+                "RegisterAgent": (("o",), ()),
+                "UnregisterAgent": (("o",), ()),
+            },
+        },
+        "org.bluez.obex.Client1": {
+            "methods": {
+                "CreateSession": (("s", "a{sv}"), ("o",)),
+                "RemoveSession": (("o",), ()),
+            },
+        },
+        "org.bluez.obex.Session1": {
+            "properties": {
+                "Source": "s",
+                "Destination": "s",
+                "Target": "s",
+                "Root": "s",
+            },
+        },
+        "org.bluez.obex.ObjectPush1": {
+            "methods": {
+                "SendFile": (("s",), ("o", "a{sv}")),
+            },
+        },
+        "org.bluez.obex.Transfer1": {
+            "methods": {
+                "Cancel": ((), ()),
+            },
+            "properties": {
+                "Status": "s",
+                "Session": "o",
+                "Name": "s",
+                "Type": "s",
+                "Size": "t",
+                "Filename": "s",
+                "Transferred": "t",
+            },
+        },
+    }
+
+    def __init__(self, address, chunk_size=64 * 1024, interval=10):
+        super().__init__(address)
+        self.chunk_size = chunk_size
+        self.interval = interval
+        self._sessions = 0
+        self._transfers = 0
+
+    def setup(self):
+        self.add_object("/org/bluez/obex", {"org.bluez.obex.AgentManager1": {}, "org.bluez.obex.Client1": {}})
+
+    def handle_AgentManager1_RegisterAgent(self, _object_path, _agent_path):
+        return None
+
+    def handle_AgentManager1_UnregisterAgent(self, _object_path, _agent_path):
+        return None
+
+    def handle_Client1_CreateSession(self, _object_path, destination, options):
+        self._sessions += 1
+        path = f"/org/bluez/obex/client/session{self._sessions}"
+        self.add_object(path, {
+            "org.bluez.obex.Session1": {
+                "Source": options.get("Source", "00:00:00:00:00:00"),
+                "Destination": destination,
+                "Target": options.get("Target", "opp"),
+                "Root": "",
+            },
+            "org.bluez.obex.ObjectPush1": {},
+        })
+        return GLib.Variant("(o)", (path,))
+
+    def handle_Client1_RemoveSession(self, _object_path, session_path):
+        if session_path not in self.objects:
+            raise MockError("org.bluez.obex.Error.InvalidArguments", "Invalid path")
+        for path in [path for path in self.objects if path.startswith(f"{session_path}/")]:
+            self.remove_object(path)
+        self.remove_object(session_path)
+
+    def handle_ObjectPush1_SendFile(self, object_path, file_name):
+        size = os.path.getsize(file_name) if os.path.exists(file_name) else 1024 * 1024
+        self._transfers += 1
+        path = f"{object_path}/transfer{self._transfers}"
+        props = {
+            "Status": "queued",
+            "Session": object_path,
+            "Name": os.path.basename(file_name),
+            "Type": "",
+            "Size": size,
+            "Filename": file_name,
+            "Transferred": 0,
+        }
+        self.add_object(path, {"org.bluez.obex.Transfer1": props})
+        self.timeout_add(self.interval, self._progress, path)
+
+        variants = {key: GLib.Variant(self.INTERFACES["org.bluez.obex.Transfer1"]["properties"][key], value)
+                    for key, value in props.items()}
+        return GLib.Variant("(oa{sv})", (path, variants))
+
+    def handle_Transfer1_Cancel(self, object_path):
+        self.set_properties(object_path, "org.bluez.obex.Transfer1", {"Status": "error"})
+        self.remove_object(object_path)
+
+    def _progress(self, path):
+        if path not in self.objects:
+            return False
+
+        size = self.get_property(path, "org.bluez.obex.Transfer1", "Size")
+        transferred = min(size, self.get_property(path, "org.bluez.obex.Transfer1", "Transferred") + self.chunk_size)
+        self.set_properties(path, "org.bluez.obex.Transfer1", {"Status": "active", "Transferred": transferred})
+
+        if transferred < size:
+            return True
+
+        self.set_properties(path, "org.bluez.obex.Transfer1", {"Status": "complete"})
+        self.remove_object(path)
+        return False
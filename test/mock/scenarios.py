@@ -0,0 +1,50 @@
+from gi.repository import GLib
+
+
+def populate(bluez, devices, adapters=None):
+    """Add devices spread over the adapters and return their object paths"""
+    return bluez.invoke(bluez.add_devices, devices, adapters)
+
+
+def property_storm(bluez, rounds, paths=None):
+    """Emit what discovery in a crowded place looks like: every device changes RSSI, TxPower,
+    ManufacturerData and ServiceData in every round, one PropertiesChanged per device and round.
+
+    Returns the number of PropertiesChanged signals emitted.
+    """
+    def storm():
+        targets = paths or bluez.device_paths()
+        for i in range(rounds):
+            for path in targets:
+                bluez.set_properties(path, "org.bluez.Device1", {
+                    "RSSI": -40 - (i % 50),
+                    "TxPower": i % 10,
+                    "ManufacturerData": {0x004c: GLib.Variant("ay", bytes([i % 256]) * 8)},
+                    "ServiceData": {"0000fe9f-0000-1000-8000-00805f9b34fb": GLib.Variant("ay", bytes([i % 256]))},
+                })
+        return rounds * len(targets)
+
+    return bluez.invoke(storm)
+
+
+def connection_storm(bluez, paths=None):
+    """Connect and disconnect every device once"""
+    def storm():
+        targets = paths or bluez.device_paths()
+        for path in targets:
+            bluez.handle_Device1_Connect(path)
+        for path in targets:
+            bluez.handle_Device1_Disconnect(path)
+        return 2 * len(targets)
+
+    return bluez.invoke(storm)
+
+
+def remove_devices(bluez, paths=None):
+    def remove():
+        targets = paths or bluez.device_paths()
+        for path in targets:
+            bluez.remove_object(path)
+        return len(targets)
+
+    return bluez.invoke(remove)
@@ -0,0 +1,256 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from collections import Counter
+
+from gi.repository import Gio, GLib
+
+BUS_CONFIG = """<!DOCTYPE busconfig PUBLIC "-//freedesktop//DTD D-Bus Bus Configuration 1.0//EN"
+ "http://www.freedesktop.org/standards/dbus/1.0/busconfig.dtd">
+<busconfig>
+  <type>session</type>
+  <listen>unix:dir={directory}</listen>
+  <auth>EXTERNAL</auth>
+  <policy context="default">
+    <allow send_destination="*" eavesdrop="true"/>
+    <allow eavesdrop="true"/>
+    <allow own="*"/>
+  </policy>
+  <!-- Every proxy adds match rules, the default of 512 per connection runs out at a few hundred devices -->
+  <limit name="max_match_rules_per_connection">65536</limit>
+</busconfig>
+"""
+
+
+def dbus_daemon_available():
+    return shutil.which("dbus-daemon") is not None
+
+
+class PrivateBus:
+    """A dbus-daemon of our own that stands in for both the system and the session bus"""
+
+    def __init__(self):
+        self.address = None
+        self._directory = None
+        self._process = None
+
+    def start(self):
+        self._directory = tempfile.mkdtemp(prefix="blueman-test-bus-")
+        config = os.path.join(self._directory, "bus.conf")
+        with open(config, "w") as f:
+            f.write(BUS_CONFIG.format(directory=self._directory))
+
+        self._process = subprocess.Popen(["dbus-daemon", "--nofork", "--print-address=1", f"--config-file={config}"],
+                                         stdout=subprocess.PIPE, universal_newlines=True)
+        self.address = self._process.stdout.readline().strip()
+        if not self.address:
+            self.stop()
+            raise RuntimeError("dbus-daemon did not start")
+        return self.address
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process.stdout.close()
+            self._process = None
+        if self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+
+    @property
+    def environment(self):
+        return {"DBUS_SYSTEM_BUS_ADDRESS": self.address, "DBUS_SESSION_BUS_ADDRESS": self.address}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *_args):
+        self.stop()
+
+
+def _interface_xml(name, interface):
+    xml = f"<interface name='{name}'>"
+    for method, (in_args, out_args) in interface.get("methods", {}).items():
+        xml += f"<method name='{method}'>"
+        xml += "".join(f"<arg type='{arg}' direction='in'/>" for arg in in_args)
+        xml += "".join(f"<arg type='{arg}' direction='out'/>" for arg in out_args)
+        xml += "</method>"
+    for prop, signature in interface.get("properties", {}).items():
+        xml += f"<property name='{prop}' type='{signature}' access='readwrite'/>"
+    for signal, args in interface.get("signals", {}).items():
+        xml += f"<signal name='{signal}'>" + "".join(f"<arg type='{arg}'/>" for arg in args) + "</signal>"
+    return xml + "</interface>"
+
+
+OBJECT_MANAGER = {
+    "methods": {"GetManagedObjects": ((), ("a{oa{sa{sv}}}",))},
+    "signals": {"InterfacesAdded": ("o", "a{sa{sv}}"), "InterfacesRemoved": ("o", "as")},
+}
+
+
+class MockService(threading.Thread):
+    """A fake D-Bus service exporting an ObjectManager at / running on a thread of its own.
+
+    Subclasses describe their interfaces in INTERFACES (methods, properties and signals with their signatures)
+    and implement methods as handle_<Interface>_<Method>(object_path, *args), the interface name without its
+    prefix up to the last dot. Every method call including property access is counted in calls, which is the
+    number of round trips clients made to the service.
+    """
+
+    INTERFACES = {}
+    BUS_NAME = ""
+
+    def __init__(self, address):
+        super().__init__(daemon=True)
+        self.address = address
+        self.calls = Counter()
+        self.objects = {}
+
+        self._context = GLib.MainContext()
+        self._loop = GLib.MainLoop(self._context)
+        self._ready = threading.Event()
+        self._registrations = {}
+        self._interface_info = {}
+        self._bus = None
+
+    # Runs in the service thread
+
+    def run(self):
+        self._context.push_thread_default()
+
+        self._bus = Gio.DBusConnection.new_for_address_sync(
+            self.address,
+            Gio.DBusConnectionFlags.AUTHENTICATION_CLIENT | Gio.DBusConnectionFlags.MESSAGE_BUS_CONNECTION,
+            None, None)
+
+        node_xml = "<node>" + _interface_xml("org.freedesktop.DBus.ObjectManager", OBJECT_MANAGER)
+        node_xml += "".join(_interface_xml(name, interface) for name, interface in self.INTERFACES.items())
+        node = Gio.DBusNodeInfo.new_for_xml(node_xml + "</node>")
+        self._interface_info = {info.name: info for info in node.interfaces}
+
+        self._bus.register_object("/", self._interface_info["org.freedesktop.DBus.ObjectManager"],
+                                  self._on_method_call, None, None)
+        self.setup()
+
+        self._bus.call_sync("org.freedesktop.DBus", "/org/freedesktop/DBus", "org.freedesktop.DBus", "RequestName",
+                            GLib.Variant("(su)", (self.BUS_NAME, 0x4)), None, Gio.DBusCallFlags.NONE, -1, None)
+
+        self._ready.set()
+        self._loop.run()
+        self._context.pop_thread_default()
+
+    def setup(self):
+        """Create the initial objects"""
+
+    def add_object(self, object_path, interfaces):
+        """interfaces maps interface names to dicts of property names and plain values"""
+        obj = self.objects.setdefault(object_path, {})
+        added = {}
+        for name, props in interfaces.items():
+            signatures = self.INTERFACES[name].get("properties", {})
+            obj[name] = {key: GLib.Variant(signatures[key], value) for key, value in props.items()}
+            added[name] = obj[name]
+            self._registrations[(object_path, name)] = self._bus.register_object(
+                object_path, self._interface_info[name], self._on_method_call, None, None)
+
+        self._bus.emit_signal(None, "/", "org.freedesktop.DBus.ObjectManager", "InterfacesAdded",
+                              GLib.Variant("(oa{sa{sv}})", (object_path, added)))
+
+    def remove_object(self, object_path):
+        interfaces = self.objects.pop(object_path, {})
+        for name in interfaces:
+            self._bus.unregister_object(self._registrations.pop((object_path, name)))
+
+        self._bus.emit_signal(None, "/", "org.freedesktop.DBus.ObjectManager", "InterfacesRemoved",
+                              GLib.Variant("(oas)", (object_path, list(interfaces))))
+
+    def set_properties(self, object_path, interface_name, changed):
+        signatures = self.INTERFACES[interface_name]["properties"]
+        variants = {key: GLib.Variant(signatures[key], value) for key, value in changed.items()}
+        self.objects[object_path][interface_name].update(variants)
+        self._bus.emit_signal(None, object_path, "org.freedesktop.DBus.Properties", "PropertiesChanged",
+                              GLib.Variant("(sa{sv}as)", (interface_name, variants, [])))
+
+    def get_property(self, object_path, interface_name, name):
+        return self.objects[object_path][interface_name][name].unpack()
+
+    def emit_signal(self, object_path, interface_name, signal_name, param):
+        self._bus.emit_signal(None, object_path, interface_name, signal_name, param)
+
+    def timeout_add(self, interval, callback, *args):
+        source = GLib.timeout_source_new(interval)
+        source.set_callback(lambda *_data: callback(*args))
+        return source.attach(self._context)
+
+    def _on_method_call(self, _connection, _sender, object_path, interface_name, method_name, parameters,
+                        invocation):
+        self.calls[f"{interface_name}.{method_name}"] += 1
+        args = parameters.unpack()
+
+        try:
+            if interface_name == "org.freedesktop.DBus.Properties":
+                result = self._handle_properties(object_path, method_name, *args)
+            elif interface_name == "org.freedesktop.DBus.ObjectManager":
+                result = GLib.Variant("(a{oa{sa{sv}}})", (self.objects,))
+            else:
+                handler = getattr(self, f"handle_{interface_name.rsplit('.', 1)[-1]}_{method_name}", None)
+                result = handler(object_path, *args) if handler else None
+        except MockError as e:
+            invocation.return_dbus_error(e.name, e.message)
+        else:
+            invocation.return_value(result)
+
+    def _handle_properties(self, object_path, method_name, interface_name, *args):
+        props = self.objects[object_path][interface_name]
+        if method_name == "GetAll":
+            return GLib.Variant("(a{sv})", (props,))
+        elif method_name == "Get":
+            if args[0] not in props:
+                raise MockError("org.freedesktop.DBus.Error.InvalidArgs", f"No such property {args[0]}")
+            return GLib.Variant("(v)", (props[args[0]],))
+        else:
+            name, value = args
+            self.set_properties(object_path, interface_name, {name: value})
+            return None
+
+    # Called from other threads
+
+    def start(self):
+        super().start()
+        self._ready.wait()
+
+    def stop(self):
+        self.invoke(self._loop.quit)
+        self.join()
+
+    def invoke(self, func, *args):
+        """Run func in the service thread and return its result"""
+        done = threading.Event()
+        result = []
+
+        def call(*_args):
+            result.append(func(*args))
+            done.set()
+            return False
+
+        self._context.invoke_full(GLib.PRIORITY_DEFAULT, call, None)
+        done.wait()
+        return result[0]
+
+    def reset_calls(self):
+        self.invoke(self.calls.clear)
+
+    @property
+    def round_trips(self):
+        return self.invoke(lambda: sum(self.calls.values()))
+
+
+class MockError(Exception):
+    def __init__(self, name, message=""):
+        super().__init__(message)
+        self.name = name
+        self.message = message
@@ -0,0 +1,48 @@
+import os
+import re
+import subprocess
+import sys
+from unittest import TestCase, skipUnless
+
+from test.mock.service import dbus_daemon_available
+
+
+@skipUnless(dbus_daemon_available(), "dbus-daemon not available")
+class TestBenchmark(TestCase):
+    def run_benchmarks(self, *args):
+        # A process of its own, so the bus connections and singletons of other tests do not get in the way
+        home = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join([home, os.path.join(home, "module", ".libs")]))
+        result = subprocess.run(
+            [sys.executable, "-m", "test.mock.benchmark", "--adapters", "2", "--devices", "20", *args],
+            cwd=home, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, timeout=120)
+
+        self.assertEqual(result.returncode, 0, result.stdout)
+        return result.stdout
+
+    def test_run(self):
+        output = self.run_benchmarks("--storm", "2", "--transfers", "1", "--transfer-size", "200000",
+                                     "--samples", "1000", "manager", "storm", "transfer", "rate")
+        self.assertIn("20 devices", output)
+        self.assertIn("1/1 transfers", output)
+        self.assertIn("1000 samples", output)
+
+    def test_manager(self):
+        output = self.run_benchmarks("--storm", "2", "manager")
+        # Property changes during the creation of proxies must be handled
+        self.assertNotIn("Traceback", output)
+        # One GetManagedObjects for the object manager and one for the property mirror, no GetAll per proxy
+        round_trips = int(re.search(r"^manager +[\d.]+ +(\d+)", output, re.MULTILINE).group(1))
+        self.assertLessEqual(round_trips, 2, output)
+        # Device lookups are answered from the index of the manager and do not create proxies that load anything
+        self.assertIn(", 0 round trips for lookups", output)
+
+    def test_applet_menu_changes(self):
+        output = self.run_benchmarks("applet")
+        if "skipped" in output:
+            self.skipTest(output)
+
+        # Every plugin adds and updates its menu items on startup, which must not announce the menu each time
+        changes = int(re.search(r"(\d+) MenuChanged", output).group(1))
+        self.assertGreaterEqual(changes, 1)
+        self.assertLessEqual(changes, 5)
@@ -0,0 +1,39 @@
+from unittest import TestCase
+
+from _blueman import ConnInfoReadError, conn_info_reader, _fake_hci, _fake_hci_requests
+
+
+class TestConnInfoReader(TestCase):
+    def setUp(self):
+        self.addCleanup(_fake_hci, None)
+
+    def test_read(self):
+        _fake_hci([("00:11:22:33:44:55", 1, False, -20, 200, 4), ("00:11:22:33:44:66", 2, True, -30, 180, 2)])
+        reader = conn_info_reader("hci0")
+        self.addCleanup(reader.close)
+
+        self.assertEqual(reader.read([]), [])
+        self.assertEqual(reader.read(["00:11:22:33:44:55", "00:11:22:33:44:66", "00:11:22:33:44:77"]),
+                         [(-20, 200, 4), None, None])
+
+    def test_many_connections(self):
+        connections = [(f"00:11:22:33:{i // 256:02X}:{i % 256:02X}", i + 1, False, -i % 128, i % 256, i % 20)
+                       for i in range(50)]
+        _fake_hci(connections)
+        reader = conn_info_reader("hci0")
+        self.addCleanup(reader.close)
+
+        # Connections beyond the first ten are found too
+        values = reader.read([connections[-1][0], connections[0][0]])
+        self.assertEqual(values, [connections[-1][3:], connections[0][3:]])
+
+        # The connection list is read once per pass, it only grows if more devices are connected than asked for
+        requests = _fake_hci_requests()
+        reader.read([address for address, *_ in connections])
+        self.assertEqual(_fake_hci_requests() - requests, 1 + 3 * len(connections))
+
+    def test_closed(self):
+        _fake_hci([])
+        reader = conn_info_reader("hci0")
+        reader.close()
+        self.assertRaises(ConnInfoReadError, reader.read, ["00:11:22:33:44:55"])
@@ -0,0 +1,69 @@
+import struct
+from unittest import TestCase
+
+from _blueman import HCI_ACL_LINK, ConnectionComplete, DisconnectionComplete, EncryptionChange, HciMonitorError, \
+    hci_monitor, _fake_hci, _fake_hci_event
+
+
+def bdaddr(address):
+    return bytes(reversed(bytes.fromhex(address.replace(":", ""))))
+
+
+def event(code, params):
+    return struct.pack("<BBB", 0x04, code, len(params)) + params
+
+
+def conn_complete(handle, address, status=0, link_type=HCI_ACL_LINK, encrypted=False):
+    return event(0x03, struct.pack("<BH6sBB", status, handle, bdaddr(address), link_type, encrypted))
+
+
+def disconn_complete(handle, reason=0x13, status=0):
+    return event(0x05, struct.pack("<BHB", status, handle, reason))
+
+
+def encrypt_change(handle, encrypted, status=0):
+    return event(0x08, struct.pack("<BHB", status, handle, encrypted))
+
+
+class TestHciMonitor(TestCase):
+    def setUp(self):
+        _fake_hci([("00:11:22:33:44:55", 1, False, -20, 200, 4)])
+        self.addCleanup(_fake_hci, None)
+        self.monitor = hci_monitor("hci0")
+        self.addCleanup(self.monitor.close)
+
+    def test_connections(self):
+        self.assertEqual(self.monitor.connections(), [(1, "00:11:22:33:44:55", HCI_ACL_LINK)])
+        self.assertGreaterEqual(self.monitor.fileno(), 0)
+
+    def test_events(self):
+        self.assertEqual(self.monitor.read(), [])
+
+        _fake_hci_event(conn_complete(2, "00:11:22:33:44:66", encrypted=True))
+        # Unrelated packets are skipped, e.g. command complete and mode change
+        _fake_hci_event(event(0x0e, b"\x01\x03\x0c\x00"))
+        _fake_hci_event(event(0x14, struct.pack("<BHBH", 0, 2, 0x02, 800)))
+        _fake_hci_event(encrypt_change(1, False))
+        _fake_hci_event(disconn_complete(1))
+        _fake_hci_event(disconn_complete(7))
+
+        self.assertEqual(self.monitor.read(), [
+            ConnectionComplete(0, 2, "00:11:22:33:44:66", HCI_ACL_LINK, True),
+            EncryptionChange(0, 1, "00:11:22:33:44:55", False),
+            DisconnectionComplete(0, 1, "00:11:22:33:44:55", HCI_ACL_LINK, 0x13),
+            DisconnectionComplete(0, 7, None, None, 0x13),
+        ])
+        self.assertEqual(self.monitor.connections(), [(2, "00:11:22:33:44:66", HCI_ACL_LINK)])
+
+    def test_failed_connection(self):
+        _fake_hci_event(conn_complete(3, "00:11:22:33:44:77", status=0x04))
+        self.assertEqual(self.monitor.read(), [ConnectionComplete(4, 3, "00:11:22:33:44:77", HCI_ACL_LINK, False)])
+        self.assertEqual(len(self.monitor.connections()), 1)
+
+    def test_truncated(self):
+        _fake_hci_event(event(0x05, b"\x00\x01"))
+        self.assertEqual(self.monitor.read(), [])
+
+    def test_closed(self):
+        self.monitor.close()
+        self.assertRaises(HciMonitorError, self.monitor.read)
@@ -0,0 +1,21 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from blueman.plugins.applet.AdapterThroughput import AdapterThroughput, NoSuchAdapterError
+
+
+@patch("blueman.plugins.applet.AdapterThroughput.StatsPoller")
+class TestAdapterThroughput(TestCase):
+    def setUp(self):
+        self.plugin = AdapterThroughput(Mock())
+        self.plugin._load()
+        self.addCleanup(self.plugin._unload)
+
+    def test_unknown_adapter(self, _poller):
+        self.assertRaises(NoSuchAdapterError, self.plugin._get_history, "hci7")
+
+        self.plugin.on_adapter_added("/org/bluez/hci7")
+        self.assertEqual(len(self.plugin._get_history("hci7")), 3)
+
+        self.plugin.on_adapter_removed("/org/bluez/hci7")
+        self.assertRaises(NoSuchAdapterError, self.plugin._get_history, "hci7")
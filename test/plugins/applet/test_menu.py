@@ -0,0 +1,147 @@
+from unittest import TestCase
+from unittest.mock import patch, Mock
+
+from blueman.plugins.applet.Menu import Menu, MENU_PROTOCOL
+
+
+def apply_patches(menu, patches):
+    menu = list(menu)
+    for operation, index, item in patches:
+        if operation == "insert":
+            menu.insert(index, item)
+        elif operation == "update":
+            menu[index] = item
+        else:
+            del menu[index]
+    return menu
+
+
+def texts(menu):
+    return [item["text"].unpack() for item in menu]
+
+
+@patch("gi.repository.GLib.idle_add", return_value=1)
+class TestMenu(TestCase):
+    def setUp(self):
+        self.parent = Mock()
+        self.menu = Menu(self.parent)
+        self.menu._load()
+        self.addCleanup(self.menu._unload)
+        self.owner = Mock()
+
+    def emitted(self, signal="MenuChanged"):
+        return [args[1] for args, _kwargs in self.parent.DbusSvc.emit_signal.call_args_list
+                if args[0] == signal]
+
+    def add(self, text, priority=0):
+        return self.menu.add(self.owner, priority, text=text, icon_name=text.lower(), callback=lambda: None)
+
+    def assert_patches_apply(self):
+        """Apply all MenuPatched so far to an empty menu and compare it with the snapshot"""
+        menu = []
+        for number, (revision, patches) in enumerate(self.emitted("MenuPatched"), 1):
+            self.assertEqual(revision, number)
+            menu = apply_patches(menu, patches)
+
+        protocol, revision, snapshot = self.menu.get_snapshot()
+        self.assertEqual(protocol, MENU_PROTOCOL)
+        self.assertEqual(revision, len(self.emitted("MenuPatched")))
+        self.assertEqual([{key: value.unpack() for key, value in item.items()} for item in menu],
+                         [{key: value.unpack() for key, value in item.items()} for item in snapshot])
+        return menu
+
+    def test_coalesce(self, idle_add):
+        item = self.menu.add(self.owner, 0, text="Off", icon_name="off", callback=lambda: None)
+        item.set_text("On")
+        item.set_icon_name("on")
+        item.set_tooltip("Turn off")
+        item.set_sensitive(False)
+        self.menu.add(self.owner, 10, text="Exit", icon_name="exit", callback=lambda: None)
+
+        self.assertEqual(idle_add.call_count, 1)
+        self.assertEqual(self.emitted(), [])
+
+        self.menu._on_idle()
+        emitted = self.emitted()
+        self.assertEqual(len(emitted), 1)
+        self.assertEqual([item["text"].unpack() for item in emitted[0]], ["On", "Exit"])
+        self.assertEqual(emitted[0][0]["sensitive"].unpack(), False)
+
+        item.set_visible(False)
+        self.assertEqual(idle_add.call_count, 2)
+        self.menu._on_idle()
+        self.assertEqual([item["text"].unpack() for item in self.emitted()[1]], ["Exit"])
+
+    def test_unregister(self, idle_add):
+        other = Mock()
+        self.menu.add(self.owner, 0, text="Off", icon_name="off", callback=lambda: None)
+        self.menu.add(other, 10, text="Exit", icon_name="exit", callback=lambda: None)
+        self.menu._on_idle()
+
+        self.menu.unregister(self.owner)
+        self.menu.unregister(other)
+        self.assertEqual(idle_add.call_count, 2)
+        self.menu._on_idle()
+        self.assertEqual(self.emitted()[-1], [])
+
+    def test_patches(self, _idle_add):
+        items = [self.add(text, priority) for priority, text in enumerate(["A", "B", "C", "D"])]
+        self.menu.on_plugins_loaded()
+        self.menu._on_idle()
+        self.assertEqual(texts(self.assert_patches_apply()), ["A", "B", "C", "D"])
+
+        items[1].set_text("B2")
+        self.menu._on_idle()
+        self.assertEqual(self.emitted("MenuPatched")[-1][1], [("update", 1, self.menu._get_menu()[1])])
+
+        items[2].set_visible(False)
+        self.add("E", 0)
+        self.menu._on_idle()
+        self.assertEqual(texts(self.assert_patches_apply()), ["A", "E", "B2", "D"])
+        self.assertEqual([operation for operation, _index, _item in self.emitted("MenuPatched")[-1][1]],
+                         ["remove", "insert"])
+
+        items[2].set_visible(True)
+        items[0].set_visible(False)
+        items[3].set_sensitive(False)
+        self.menu._on_idle()
+        self.assertEqual(texts(self.assert_patches_apply()), ["E", "B2", "C", "D"])
+
+        self.menu.unregister(self.owner)
+        self.menu._on_idle()
+        self.assertEqual(self.assert_patches_apply(), [])
+
+    def test_no_change(self, _idle_add):
+        item = self.add("A")
+        self.menu._on_idle()
+        item.set_text("A")
+        self.menu._on_idle()
+        self.assertEqual(len(self.emitted("MenuPatched")), 1)
+        self.assertEqual(len(self.emitted()), 1)
+
+    def test_snapshot_is_announced_menu(self, _idle_add):
+        self.add("A")
+        self.menu._on_idle()
+        self.add("B", 1)
+        # Until the change is announced the snapshot matches the revision clients know
+        _protocol, revision, snapshot = self.menu.get_snapshot()
+        self.assertEqual((revision, texts(snapshot)), (1, ["A"]))
+
+    def test_countdown(self, _idle_add):
+        item = self.add("Discoverable… 60s")
+        item.set_countdown("Discoverable… %ss", 1000.0)
+        self.menu._on_idle()
+        announced = self.emitted()[-1][0]
+        self.assertEqual(announced["countdown"].unpack(), "Discoverable… %ss")
+        self.assertEqual(announced["deadline"].get_type_string(), "d")
+        self.assertEqual(announced["deadline"].unpack(), 1000.0)
+
+        # Only a change of the countdown is announced, the clients tick on their own
+        item.set_countdown("Discoverable… %ss", 1000.0)
+        self.menu._on_idle()
+        self.assertEqual(len(self.emitted("MenuPatched")), 1)
+
+        item.set_countdown(None)
+        self.menu._on_idle()
+        self.assertNotIn("countdown", self.emitted()[-1][0])
+        self.assertNotIn("deadline", self.emitted()[-1][0])
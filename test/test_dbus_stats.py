@@ -0,0 +1,30 @@
+from unittest import TestCase
+
+from blueman import DBusStats
+
+
+class TestDBusStats(TestCase):
+    def setUp(self):
+        DBusStats.reset()
+        self.addCleanup(DBusStats.reset)
+
+    def test_record(self):
+        for seconds in (0.0005, 0.003, 0.003, 4.0):
+            DBusStats.record("org.bluez.Device1", "Properties.Get", DBusStats.SYNC, seconds)
+        DBusStats.record("org.bluez.Device1", "Connect", DBusStats.ASYNC, 0.2, "blueman.plugins.applet.DBusService")
+
+        rows = {(row[1], row[2]): row for row in DBusStats.snapshot()}
+        self.assertEqual(len(rows), 2)
+
+        get = rows[("Properties.Get", __name__)]
+        self.assertEqual(get[3], DBusStats.SYNC)
+        self.assertEqual(get[4], 4)
+        self.assertAlmostEqual(get[6], 4000)
+        self.assertEqual(get[7], [1, 0, 2, 0, 0, 0, 0, 0, 0, 0, 0, 1])
+
+        connect = rows[("Connect", "blueman.plugins.applet.DBusService")]
+        self.assertEqual(connect[4], 1)
+
+    def test_format(self):
+        DBusStats.record("org.blueman.Applet", "ConnectService", DBusStats.DISPATCH, 0.01, "blueman.test")
+        self.assertIn("org.blueman.Applet.ConnectService (blueman.test)", DBusStats.format_stats())